@@ -55,6 +55,13 @@ def parse() -> Namespace:
         action=BooleanOptionalAction,
         default=False
     )
+    parser.add_argument(
+        "--reimport-changed-only",
+        help="When reimport is forced, skip resources whose fingerprint (size and modification time, or blob ETag) "
+             "didn't change since they were loaded",
+        action=BooleanOptionalAction,
+        default=False
+    )
     parser.add_argument(
         "--force-reimport",
         help="Force reimport of sources which are date-partitioned (both chunk and NOT chunk-partitioned) with in "
@@ -87,6 +94,40 @@ def parse() -> Namespace:
         action=BooleanOptionalAction,
         default=False
     )
+    parser.add_argument(
+        "--load-concurrency",
+        help="When loading data, max number of sources loaded in parallel transactions",
+        required=False,
+        default=1,
+        type=int
+    )
+    parser.add_argument(
+        "--load-batch-max-mb",
+        help="When loading data, max total size in MB of source partitions loaded in one transaction",
+        required=False,
+        type=int
+    )
+    parser.add_argument(
+        "--load-batch-max-files",
+        help="When loading data, max number of source partitions loaded in one transaction",
+        required=False,
+        type=int
+    )
+    parser.add_argument(
+        "--local-load-max-mb",
+        help="When loading data from local container, max total size in MB of files read into one transaction. "
+             "Disabled by default. Files of the next transaction are read while the current one is running, so peak "
+             "memory is about budget x (1 + 1 prefetched transaction) x `--load-concurrency`",
+        required=False,
+        type=int
+    )
+    parser.add_argument(
+        "--local-read-workers",
+        help="When loading data from local container, number of threads reading shard files in parallel",
+        required=False,
+        default=1,
+        type=int
+    )
     parser.add_argument(
         "--log-level",
         help="Set log level",
@@ -185,6 +226,86 @@ def parse() -> Namespace:
         default=3,
         type=int
     )
+    parser.add_argument(
+        "--max-parallel-steps",
+        help="Max number of workflow steps to run in parallel. Steps are scheduled according to `dependsOn`",
+        required=False,
+        default=1,
+        type=int
+    )
+    parser.add_argument(
+        "--step-state-flush-size",
+        help="Number of step state transitions buffered before they are written to RAI in a single transaction",
+        required=False,
+        default=1,
+        type=int
+    )
+    parser.add_argument(
+        "--engine-lookahead",
+        help="Number of upcoming steps to provision engines for in background while the current step runs",
+        required=False,
+        default=1,
+        type=int
+    )
+    parser.add_argument(
+        "--engine-pool-file",
+        help="Path to local JSON file of warm engine pool. Engines of step sizes are reused across runs",
+        required=False,
+        type=str
+    )
+    parser.add_argument(
+        "--engine-pool-ttl",
+        help="Idle time in minutes after which a pooled engine is deleted on cleanup of resources or engines",
+        required=False,
+        default=60,
+        type=int
+    )
+    parser.add_argument(
+        "--engine-pool-max-size",
+        help="Max number of idle engines kept in engine pool",
+        required=False,
+        default=3,
+        type=int
+    )
+    parser.add_argument(
+        "--listing-cache-file",
+        help="Path to local SQLite file to cache Azure blob listings across runs",
+        required=False,
+        type=str
+    )
+    parser.add_argument(
+        "--listing-cache-ttl",
+        help="Time in minutes after which a cached listing is refreshed. Listings of past date partitions don't expire",
+        required=False,
+        default=60,
+        type=int
+    )
+    parser.add_argument(
+        "--listing-cache-immutable-days",
+        help="Number of days after which listings of date partitions are cached without expiration",
+        required=False,
+        default=2,
+        type=int
+    )
+    parser.add_argument(
+        "--invalidate-listing-cache",
+        help="Remove all cached listings before the run, or not",
+        action=BooleanOptionalAction,
+        default=False
+    )
+    parser.add_argument(
+        "--paths-list-workers",
+        help="Number of threads listing date partitions of Azure and local sources in parallel",
+        required=False,
+        default=8,
+        type=int
+    )
+    parser.add_argument(
+        "--run-state-file",
+        help="Path to local SQLite file to mirror workflow run state. Used by recovery to skip loading state from RAI",
+        required=False,
+        type=str
+    )
     parser.add_argument(
         "--step-timeout",
         help="Parameter to set timeouts for steps",
@@ -197,6 +318,38 @@ def parse() -> Namespace:
         parser.error("`--recover-step` can't be used when selected-steps are specified.")
     if 'recover' in vars(args) and args.recover and 'recover_step' in vars(args) and args.recover_step:
         parser.error("`--recover` and `--recover-step` options are mutually exclusive. You must choose only 1 option.")
+    if 'max_parallel_steps' in vars(args) and args.max_parallel_steps < 1:
+        parser.error("`--max-parallel-steps` should be greater than 0.")
+    if 'engine_lookahead' in vars(args) and args.engine_lookahead < 0:
+        parser.error("`--engine-lookahead` should be greater than or equal to 0.")
+    if 'engine_pool_ttl' in vars(args) and args.engine_pool_ttl < 1:
+        parser.error("`--engine-pool-ttl` should be greater than 0.")
+    if 'engine_pool_max_size' in vars(args) and args.engine_pool_max_size < 0:
+        parser.error("`--engine-pool-max-size` should be greater than or equal to 0.")
+    if 'listing_cache_ttl' in vars(args) and args.listing_cache_ttl < 0:
+        parser.error("`--listing-cache-ttl` should be greater than or equal to 0.")
+    if 'listing_cache_immutable_days' in vars(args) and args.listing_cache_immutable_days < 0:
+        parser.error("`--listing-cache-immutable-days` should be greater than or equal to 0.")
+    if 'paths_list_workers' in vars(args) and args.paths_list_workers < 1:
+        parser.error("`--paths-list-workers` should be greater than 0.")
+    if 'step_state_flush_size' in vars(args) and args.step_state_flush_size < 1:
+        parser.error("`--step-state-flush-size` should be greater than 0.")
+    if 'load_concurrency' in vars(args) and args.load_concurrency < 1:
+        parser.error("`--load-concurrency` should be greater than 0.")
+    if 'load_data_jointly' in vars(args) and args.load_data_jointly and args.load_concurrency > 1:
+        parser.error("`--load-data-jointly` and `--load-concurrency` options are mutually exclusive.")
+    if 'load_batch_max_mb' in vars(args) and args.load_batch_max_mb is not None and args.load_batch_max_mb < 1:
+        parser.error("`--load-batch-max-mb` should be greater than 0.")
+    if 'load_batch_max_files' in vars(args) and args.load_batch_max_files is not None and \
+            args.load_batch_max_files < 1:
+        parser.error("`--load-batch-max-files` should be greater than 0.")
+    if 'load_data_jointly' in vars(args) and args.load_data_jointly and \
+            (args.load_batch_max_mb is not None or args.load_batch_max_files is not None):
+        parser.error("`--load-data-jointly` and `--load-batch-max-*` options are mutually exclusive.")
+    if 'local_load_max_mb' in vars(args) and args.local_load_max_mb is not None and args.local_load_max_mb < 1:
+        parser.error("`--local-load-max-mb` should be greater than 0.")
+    if 'local_read_workers' in vars(args) and args.local_read_workers < 1:
+        parser.error("`--local-read-workers` should be greater than 0.")
     if 'step_timeout' in vars(args):
         try:
             args.step_timeout_dict = parse_string_int_key_value_argument(args.step_timeout)
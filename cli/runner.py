@@ -7,6 +7,8 @@ from types import MappingProxyType
 import cli.args
 import cli.logger
 import workflow.constants
+import workflow.engine_pool
+import workflow.listing_cache
 import workflow.manager
 import workflow.common
 import workflow.utils
@@ -31,7 +33,10 @@ def start(factories: dict[str, workflow.executor.WorkflowStepFactory] = MappingP
     # init env config
     env_config = workflow.common.EnvConfig.from_env_vars(loader_config)
     # init Workflow resource manager
-    resource_manager = workflow.manager.ResourceManager.init(logger, args.engine, args.database, env_config)
+    engine_pool = workflow.engine_pool.EnginePool(args.engine_pool_file, args.engine_pool_ttl * 60,
+                                                  args.engine_pool_max_size) if args.engine_pool_file else None
+    resource_manager = workflow.manager.ResourceManager.init(logger, args.engine, args.database, env_config,
+                                                             engine_pool)
     logger.info("Using: " + ",".join(f"{k}={v}" for k, v in vars(args).items()))
     try:
         logger.info(f"Activating batch with config from '{args.batch_config}'")
@@ -44,21 +49,38 @@ def start(factories: dict[str, workflow.executor.WorkflowStepFactory] = MappingP
         if not args.recover and not args.recover_step:
             # Create db and disable IVM in case of enabled flag
             resource_manager.create_database(args.drop_db, args.disable_ivm, args.source_database)
+        if args.listing_cache_file and args.invalidate_listing_cache:
+            removed = workflow.listing_cache.ListingCache(args.listing_cache_file).invalidate()
+            logger.info(f"Removed {removed} cached blob listings")
         # Init workflow executor
+        load_batch_max_bytes = args.load_batch_max_mb * 1024 * 1024 if args.load_batch_max_mb else None
+        local_load_max_bytes = args.local_load_max_mb * 1024 * 1024 if args.local_load_max_mb else None
         parameters = {
             workflow.constants.REL_CONFIG_DIR: args.rel_config_dir,
             workflow.constants.START_DATE: args.start_date,
             workflow.constants.END_DATE: args.end_date,
             workflow.constants.FORCE_REIMPORT: args.force_reimport,
             workflow.constants.FORCE_REIMPORT_NOT_CHUNK_PARTITIONED: args.force_reimport_not_chunk_partitioned,
+            workflow.constants.REIMPORT_CHANGED_ONLY: args.reimport_changed_only,
+            workflow.constants.LISTING_CACHE_FILE: args.listing_cache_file,
+            workflow.constants.LISTING_CACHE_TTL: args.listing_cache_ttl * 60,
+            workflow.constants.LISTING_CACHE_IMMUTABLE_DAYS: args.listing_cache_immutable_days,
+            workflow.constants.PATHS_LIST_WORKERS: args.paths_list_workers,
             workflow.constants.COLLAPSE_PARTITIONS_ON_LOAD: args.collapse_partitions_on_load,
             workflow.constants.LOAD_DATA_JOINTLY: args.load_data_jointly,
+            workflow.constants.LOAD_CONCURRENCY: args.load_concurrency,
+            workflow.constants.LOAD_BATCH_MAX_BYTES: load_batch_max_bytes,
+            workflow.constants.LOAD_BATCH_MAX_FILES: args.load_batch_max_files,
+            workflow.constants.LOCAL_LOAD_MAX_BYTES: local_load_max_bytes,
+            workflow.constants.LOCAL_READ_WORKERS: args.local_read_workers,
             workflow.constants.ENABLE_INCREMENTAL_SNAPSHOTS: args.enable_incremental_snapshots
         }
         config = workflow.executor.WorkflowConfig(env_config, workflow.common.BatchConfig(args.batch_config_name,
                                                                                           batch_config_json),
                                                   args.recover, args.recover_step, args.selected_steps, parameters,
-                                                  args.step_timeout_dict)
+                                                  args.step_timeout_dict, args.max_parallel_steps,
+                                                  args.step_state_flush_size, args.run_state_file,
+                                                  args.engine_lookahead)
         executor = workflow.executor.WorkflowExecutor.init(logger, config, resource_manager, factories, models)
         end_time = time.time()
         executor.run()
@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from railib.credentials import AccessToken, ClientCredentials
+
+from workflow.auth import TokenCache
+
+
+@patch('railib.rest._write_token_cache')
+@patch('railib.rest._read_token_cache', return_value=None)
+class TestTokenCache(unittest.TestCase):
+
+    @patch('railib.rest._request_access_token')
+    def test_get_access_token_should_refresh_token_once_for_concurrent_callers(self, mock_request_access_token, *_):
+        # given
+        def request_access_token(ctx, url):
+            time.sleep(0.1)
+            return AccessToken("token", "scope", 3600)
+
+        mock_request_access_token.side_effect = request_access_token
+        cache = TokenCache()
+        ctx = _create_ctx()
+        tokens = []
+        # when
+        threads = [threading.Thread(target=lambda: tokens.append(cache.get_access_token(ctx, "url")))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # then
+        self.assertEqual(["token"] * 10, tokens)
+        mock_request_access_token.assert_called_once()
+
+    @patch('railib.rest._request_access_token')
+    def test_get_access_token_should_refresh_token_before_expiry_in_background(self, mock_request_access_token, *_):
+        # given
+        refreshed = threading.Event()
+
+        def request_access_token(ctx, url):
+            if mock_request_access_token.call_count > 1:
+                refreshed.set()
+                return AccessToken("token2", "scope", 24 * 3600)
+            return AccessToken("token1", "scope", 3600)
+
+        mock_request_access_token.side_effect = request_access_token
+        cache = TokenCache(refresh_margin=3600 - 0.1)
+        ctx = _create_ctx()
+        self.assertEqual("token1", cache.get_access_token(ctx, "url"))
+        # when
+        refreshed.wait(5)
+        # then
+        self.assertEqual("token2", cache.get_access_token(ctx, "url"))
+        self.assertEqual(2, mock_request_access_token.call_count)
+
+    @patch('railib.rest._request_access_token')
+    def test_get_access_token_should_reuse_token_cached_by_another_process(self, mock_request_access_token,
+                                                                           mock_read_token_cache, _):
+        # given
+        mock_read_token_cache.return_value = AccessToken("file_token", "scope", 3600)
+        cache = TokenCache()
+        # when
+        token = cache.get_access_token(_create_ctx(), "url")
+        # then
+        self.assertEqual("file_token", token)
+        mock_request_access_token.assert_not_called()
+
+
+def _create_ctx() -> Mock:
+    return Mock(credentials=ClientCredentials("client_id", "client_secret"))
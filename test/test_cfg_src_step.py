@@ -1,4 +1,6 @@
 import logging
+import os
+import tempfile
 import unittest
 import uuid
 from datetime import datetime
@@ -6,7 +8,7 @@ from typing import List
 from unittest.mock import Mock, patch
 
 from workflow import paths
-from workflow.common import Source, Container, ContainerType, RaiConfig, EnvConfig, FileMetadata
+from workflow.common import Source, Container, ContainerType, RaiConfig, EnvConfig, FileMetadata, LocalConfig
 from workflow.executor import ConfigureSourcesWorkflowStep, WorkflowStepState
 
 
@@ -52,6 +54,38 @@ class TestConfigureSourcesWorkflowStep(unittest.TestCase):
         ]
         self.assertEqual(expected_paths, test_src.paths)
 
+    def test_inflate_sources_should_keep_sizes_and_fingerprints(self):
+        # given
+        test_src = _create_test_source(
+            is_date_partitioned=False,
+            is_chunk_partitioned=True,
+        )
+        paths_builder = _create_path_builder_mock([
+            FileMetadata(path="test/part_1.csv", size=10, fingerprint="10-1"),
+            FileMetadata(path="test/part_2.csv"),
+        ])
+        workflow_step = _create_cfg_sources_step([test_src], {"default": paths_builder}, None, None)
+        # when
+        workflow_step._inflate_sources(self.logger, self.rai_config, self.env_config)
+        # then
+        self.assertEqual({"test/part_1.csv": 10}, test_src.sizes)
+        self.assertEqual({"test/part_1.csv": "10-1"}, test_src.fingerprints)
+        self.assertEqual("test/part_1.csv,10-1", test_src.to_fingerprints_csv())
+
+    def test_local_paths_builder_should_fingerprint_files_by_size_and_mtime(self):
+        # given
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "test"))
+            fname = os.path.join(tmp_dir, "test", "part_1.csv")
+            with open(fname, "w") as fp:
+                fp.write("a,b")
+            os.utime(fname, ns=(1000, 2000))
+            paths_builder = paths.LocalPathsBuilder(LocalConfig(tmp_dir))
+            # when
+            result = paths_builder.build(self.logger, [], "test", ["csv"], False)
+        # then
+        self.assertEqual([FileMetadata(fname, 3, "", "3-2000")], result)
+
     #
     # Date-partitioned file tests
     #
@@ -0,0 +1,60 @@
+import time
+import unittest
+
+from workflow.common import PollingPolicy, EnvConfig
+
+
+class TestPollingPolicy(unittest.TestCase):
+
+    def test_next_delay_should_be_based_on_call_start_time(self):
+        # given
+        policy = PollingPolicy(overhead_rate=0.5)
+        start_time = time.time() - 10
+        # when
+        delay = policy.next_delay(start_time)
+        # then
+        self.assertAlmostEqual(5, delay, delta=0.1)
+
+    def test_next_delay_should_be_bounded_by_min_and_max_delay(self):
+        # given
+        policy = PollingPolicy(overhead_rate=0.5, min_delay=1, max_delay=3)
+        # when
+        short_delay = policy.next_delay(time.time())
+        long_delay = policy.next_delay(time.time() - 100)
+        # then
+        self.assertEqual(1, short_delay)
+        self.assertEqual(3, long_delay)
+
+    def test_next_delay_should_apply_jitter(self):
+        # given
+        policy = PollingPolicy(overhead_rate=1, jitter=0.5)
+        start_time = time.time() - 10
+        # when
+        delays = [policy.next_delay(start_time) for _ in range(20)]
+        # then
+        self.assertTrue(all(4.9 <= delay <= 15.1 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_next_delay_should_wait_for_historical_duration(self):
+        # given
+        policy = PollingPolicy(overhead_rate=0.2, use_history=True)
+        policy.record("kind", 4)
+        policy.record("kind", 2)
+        start_time = time.time() - 1
+        # when
+        delay = policy.next_delay(start_time, "kind")
+        unknown_kind_delay = policy.next_delay(start_time, "unknown")
+        # then
+        self.assertAlmostEqual(2, delay, delta=0.1)
+        self.assertAlmostEqual(0.2, unknown_kind_delay, delta=0.1)
+
+    def test_env_config_should_read_polling_policy(self):
+        # given
+        env_vars = {"container": [], "polling": {"overhead_rate": 0.1, "max_delay": 10, "use_history": True}}
+        # when
+        env_config = EnvConfig.from_env_vars(env_vars)
+        # then
+        self.assertEqual(0.1, env_config.polling_policy.overhead_rate)
+        self.assertEqual(10, env_config.polling_policy.max_delay)
+        self.assertTrue(env_config.polling_policy.use_history)
+        self.assertEqual(0.0, env_config.polling_policy.jitter)
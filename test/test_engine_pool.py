@@ -0,0 +1,69 @@
+import concurrent.futures
+import os
+import tempfile
+import time
+import unittest
+
+from workflow.engine_pool import EnginePool
+
+
+class TestEnginePool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "engine_pool.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_acquire_should_hand_out_idle_engine_once_to_concurrent_pools(self):
+        # given
+        pool = EnginePool(self.path)
+        pool.register("engine-m", "M")
+        pool.release("engine-m")
+        # pools of concurrent runs don't share the thread lock
+        pools = [EnginePool(self.path) for _ in range(8)]
+        # when
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(pools)) as executor:
+            acquired = list(executor.map(lambda p: p.acquire("M"), pools))
+        # then
+        self.assertEqual(["engine-m"], [name for name in acquired if name])
+        self.assertEqual(["engine_pool.json", "engine_pool.json.lock"], sorted(os.listdir(self.tmp_dir.name)))
+
+    def test_acquire_should_reuse_released_engine_of_the_same_size(self):
+        # given
+        pool = EnginePool(self.path)
+        pool.register("engine-m", "M")
+        self.assertIsNone(pool.acquire("M"))
+        self.assertTrue(pool.release("engine-m"))
+        # when
+        another_run_pool = EnginePool(self.path)
+        # then
+        self.assertIsNone(another_run_pool.acquire("S"))
+        self.assertEqual("engine-m", another_run_pool.acquire("M"))
+        self.assertIsNone(another_run_pool.acquire("M"))
+
+    def test_release_should_reject_engine_when_pool_is_full(self):
+        # given
+        pool = EnginePool(self.path, max_size=1)
+        pool.register("engine-s", "S")
+        pool.register("engine-m", "M")
+        self.assertTrue(pool.release("engine-s"))
+        # when
+        released = pool.release("engine-m")
+        # then
+        self.assertFalse(released)
+        self.assertIsNone(pool.acquire("M"))
+
+    def test_evict_expired_should_remove_idle_engines_after_ttl(self):
+        # given
+        pool = EnginePool(self.path, ttl=0)
+        pool.register("engine-s", "S")
+        pool.register("engine-m", "M")
+        pool.release("engine-s")
+        time.sleep(0.01)
+        # when
+        expired = pool.evict_expired()
+        # then
+        self.assertEqual(["engine-s"], expired)
+        self.assertIsNone(pool.acquire("S"))
@@ -0,0 +1,276 @@
+import logging
+import os
+import tempfile
+import threading
+import unittest
+import uuid
+from typing import List
+from unittest.mock import Mock, patch
+
+from schema import SchemaError
+
+from workflow.common import EnvConfig, RaiConfig
+from workflow.common import BatchConfig
+from workflow.exception import StepTimeOutException
+from workflow.executor import WorkflowExecutor, WorkflowConfig, WorkflowStep, WorkflowStepState, WorkflowStepFactory, \
+    InstallModelWorkflowStepFactory
+from workflow.manager import ResourceManager
+from workflow.schema import Validator
+
+
+class TestWorkflowExecutor(unittest.TestCase):
+    logger: logging.Logger = Mock()
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_execute_steps_in_order(self, _):
+        # given
+        events = []
+        steps = [_create_step("s1", events), _create_step("s2", events), _create_step("s3", events)]
+        executor = _create_executor(steps)
+        # when
+        executor.run()
+        # then
+        self.assertEqual(["s1", "s2", "s3"], events)
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_execute_independent_steps_in_parallel(self, _):
+        # given
+        events = []
+        barrier = threading.Barrier(2, timeout=5)
+        steps = [_create_step("s1", events),
+                 _create_step("s2", events, ["s1"], barrier),
+                 _create_step("s3", events, ["s1"], barrier),
+                 _create_step("s4", events)]
+        executor = _create_executor(steps, max_parallel_steps=2)
+        # when
+        executor.run()
+        # then
+        self.assertEqual("s1", events[0])
+        self.assertEqual({"s2", "s3"}, set(events[1:3]))
+        self.assertEqual("s4", events[3])
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_not_start_dependent_steps_after_failure(self, _):
+        # given
+        events = []
+        steps = [_create_step("s1", events, fail=True), _create_step("s2", events, ["s1"]),
+                 _create_step("s3", events, [])]
+        executor = _create_executor(steps, max_parallel_steps=2)
+        # when
+        with self.assertRaises(ValueError):
+            executor.run()
+        # then
+        self.assertNotIn("s2", events)
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_treat_dependencies_on_skipped_steps_as_satisfied(self, _):
+        # given
+        events = []
+        steps = [_create_step("s1", events, state=WorkflowStepState.SUCCESS), _create_step("s2", events, ["s1"]),
+                 _create_step("s3", events, ["s1"])]
+        executor = _create_executor(steps, max_parallel_steps=2, recover=True)
+        # when
+        executor.run()
+        # then
+        self.assertEqual({"s2", "s3"}, set(events))
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_provision_engines_of_upcoming_steps(self, _):
+        # given
+        events = []
+        steps = [_create_step("s1", events, engine_size="S"), _create_step("s2", events, engine_size="M"),
+                 _create_step("s3", events, engine_size="S"), _create_step("s4", events, engine_size="L")]
+        resource_manager = Mock()
+        resource_manager.add_engine_async.side_effect = lambda size: events.append(f"provision {size}")
+        resource_manager.remove_engine.side_effect = lambda size: events.append(f"remove {size}")
+        executor = _create_executor(steps, engine_lookahead=2, resource_manager=resource_manager)
+        # when
+        executor.run()
+        # then
+        self.assertEqual(["provision S", "provision M", "provision S", "s1",
+                          "provision L", "s2", "remove M",
+                          "s3", "remove S",
+                          "s4", "remove L"], events)
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_write_step_states_per_transition_by_default(self, mock_execute_query):
+        # given
+        events = []
+        steps = [_create_step("s1", events), _create_step("s2", events)]
+        executor = _create_executor(steps)
+        # when
+        executor.run()
+        # then
+        self.assertEqual(4, mock_execute_query.call_count)
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_batch_step_states(self, mock_execute_query):
+        # given
+        events = []
+        steps = [_create_step("s1", events), _create_step("s2", events), _create_step("s3", events)]
+        executor = _create_executor(steps, step_state_flush_size=4)
+        # when
+        executor.run()
+        # then
+        self.assertEqual(2, mock_execute_query.call_count)
+        last_query = mock_execute_query.call_args_list[-1].args[3]
+        self.assertIn('"SUCCESS"', last_query)
+        self.assertNotIn('"IN_PROGRESS"', last_query)
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_flush_step_states_on_failure(self, mock_execute_query):
+        # given
+        events = []
+        steps = [_create_step("s1", events), _create_step("s2", events, fail=True), _create_step("s3", events)]
+        executor = _create_executor(steps, step_state_flush_size=100)
+        # when
+        with self.assertRaises(ValueError):
+            executor.run()
+        # then
+        mock_execute_query.assert_called_once()
+        query = mock_execute_query.call_args.args[3]
+        self.assertEqual(1, query.count('"SUCCESS"'))
+        self.assertEqual(1, query.count('"FAILED"'))
+
+    @patch('workflow.rai.execute_query')
+    def test_run_should_persist_buffered_success_before_step_timeout(self, mock_execute_query):
+        # given
+        events = []
+        steps = [_create_step("s1", events), _create_step("s2", events, barrier=threading.Barrier(2, timeout=0.5))]
+        executor = _create_executor(steps, step_state_flush_size=100)
+        executor.config.step_timeout = {"s2": 0.1}
+        # when
+        with self.assertRaises(StepTimeOutException):
+            executor.run()
+        # then
+        mock_execute_query.assert_called_once()
+        self.assertEqual(1, mock_execute_query.call_args.args[3].count('"SUCCESS"'))
+
+    @patch('workflow.rai.execute_relation_json')
+    @patch('workflow.rai.load_json')
+    @patch('workflow.rai.execute_query')
+    def test_init_should_recover_from_run_state_without_loading_state_from_rai(self, mock_execute_query,
+                                                                                mock_load_json,
+                                                                                mock_execute_relation_json):
+        # given
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run_state_file = os.path.join(tmp_dir, "run_state.db")
+            mock_execute_relation_json.return_value = {"steps": [
+                {"idt": "id1", "name": "s1", "type": "Test", "state": "INIT"},
+                {"idt": "id2", "name": "s2", "type": "Test", "state": "INIT"}
+            ]}
+            first_run = WorkflowExecutor.init(self.logger, _create_config(run_state_file=run_state_file), Mock(),
+                                              {"Test": _RecordingStepFactory()})
+            first_run.journal.record(Mock(), first_run.steps[0], WorkflowStepState.SUCCESS, 1.0)
+            mock_execute_query.reset_mock()
+            mock_load_json.reset_mock()
+            mock_execute_relation_json.reset_mock()
+            # when
+            recovery = WorkflowExecutor.init(self.logger, _create_config(recover=True, run_state_file=run_state_file),
+                                             Mock(), {"Test": _RecordingStepFactory()})
+        # then
+        mock_execute_query.assert_not_called()
+        mock_load_json.assert_not_called()
+        mock_execute_relation_json.assert_not_called()
+        self.assertEqual([WorkflowStepState.SUCCESS, WorkflowStepState.INIT], [s.state for s in recovery.steps])
+        self.assertEqual(["s2"], [s.name for s in recovery._get_steps_to_run()])
+
+    @patch('workflow.executor.build_models')
+    @patch('workflow.rai.install_models')
+    def test_install_models_steps_of_batch_configs_should_use_own_model_scopes(self, mock_install_models, _):
+        # given
+        step_json = {"idt": str(uuid.uuid4()), "name": "ConfigureModels", "type": "InstallModels", "state": "INIT",
+                     "modelFiles": ["a.rel"]}
+        steps = []
+        for batch_config_name in ["A", "B"]:
+            config = _create_config()
+            config.batch_config = BatchConfig(batch_config_name, '{"workflow": []}')
+            config.step_params = {"rel_config_dir": "rel"}
+            steps.append(InstallModelWorkflowStepFactory().get_step(self.logger, config, step_json))
+        # when
+        for step in steps:
+            step.execute(self.logger, Mock(), Mock())
+        # then
+        self.assertEqual(["A:ConfigureModels", "B:ConfigureModels"],
+                         [c.args[4] for c in mock_install_models.call_args_list])
+
+    def test_validate_should_reject_dependency_on_step_declared_later(self):
+        # given
+        config = {"workflow": [
+            {"type": "LoadData", "name": "s1", "dependsOn": ["s2"]},
+            {"type": "LoadData", "name": "s2"}
+        ]}
+        # when
+        with self.assertRaises(SchemaError):
+            Validator().validate(config)
+        # then
+        # exception
+
+    def test_validate_should_accept_dependency_on_step_declared_before(self):
+        # given
+        config = {"workflow": [
+            {"type": "LoadData", "name": "s1"},
+            {"type": "LoadData", "name": "s2", "dependsOn": ["s1"]}
+        ]}
+        # when
+        Validator().validate(config)
+        # then
+        # no exception
+
+
+class _RecordingStep(WorkflowStep):
+
+    def __init__(self, name: str, events: List[str], barrier: threading.Barrier, fail: bool,
+                 state: WorkflowStepState):
+        super().__init__(str(uuid.uuid4()), name, "Test", state, 0, None)
+        self.events = events
+        self.barrier = barrier
+        self.fail = fail
+
+    def _execute(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig):
+        if self.barrier:
+            self.barrier.wait()
+        if self.fail:
+            raise ValueError(f"{self.name} failed")
+        self.events.append(self.name)
+
+
+class _RecordingStepFactory(WorkflowStepFactory):
+
+    def _get_step(self, logger: logging.Logger, config: WorkflowConfig, idt, name, type_value, state, timing,
+                  engine_size, step: dict) -> WorkflowStep:
+        step = _RecordingStep(name, [], None, False, state)
+        step.idt = idt
+        return step
+
+
+def _create_step(name: str, events: List[str], depends_on: List[str] = None, barrier: threading.Barrier = None,
+                 fail: bool = False, state: WorkflowStepState = WorkflowStepState.INIT,
+                 engine_size: str = None) -> WorkflowStep:
+    step = _RecordingStep(name, events, barrier, fail, state)
+    step.depends_on = depends_on
+    step.engine_size = engine_size
+    return step
+
+
+def _create_executor(steps: List[WorkflowStep], max_parallel_steps: int = 1, recover: bool = False,
+                     step_state_flush_size: int = 1, engine_lookahead: int = 1,
+                     resource_manager: ResourceManager = None) -> WorkflowExecutor:
+    config = _create_config(max_parallel_steps, recover, step_state_flush_size, engine_lookahead=engine_lookahead)
+    return WorkflowExecutor(Mock(), config, resource_manager or Mock(), steps)
+
+
+def _create_config(max_parallel_steps: int = 1, recover: bool = False, step_state_flush_size: int = 1,
+                   run_state_file: str = None, engine_lookahead: int = 1) -> WorkflowConfig:
+    return WorkflowConfig(
+        env=Mock(),
+        batch_config=BatchConfig("test", '{"workflow": []}'),
+        recover=recover,
+        recover_step="",
+        selected_steps=[],
+        step_params={},
+        max_parallel_steps=max_parallel_steps,
+        step_state_flush_size=step_state_flush_size,
+        run_state_file=run_state_file,
+        engine_lookahead=engine_lookahead
+    )
@@ -5,7 +5,8 @@ from datetime import datetime
 from typing import List
 from unittest.mock import Mock, patch
 
-from workflow.common import Export, RaiConfig, FileType, EnvConfig
+from workflow import constants
+from workflow.common import Export, RaiConfig, FileType, EnvConfig, Container, ContainerType
 from workflow.executor import WorkflowStepState, ExportWorkflowStep
 
 
@@ -53,6 +54,22 @@ class TestConfigureSourcesWorkflowStep(unittest.TestCase):
         # then
         self.assertTrue(should_export)
 
+    @patch('workflow.executor.EnvConfig.get_config')
+    @patch('workflow.query.export_relations_to_azure')
+    @patch('workflow.rai.execute_query')
+    def test_export_function_should_execute_query_of_export_kind(self, mock_execute_query, mock_export_query, _):
+        # given
+        container = Container("azure", ContainerType.AZURE, {})
+        export = Export([], "relation", "relative_path", FileType.CSV, None, container)
+        mock_export_query.return_value = "export query"
+        # when
+        ExportWorkflowStep.get_export_function(container)(self.logger, self.rai_config, self.env_config, [export],
+                                                          "20220105", "%Y%m%d", container)
+        # then
+        mock_execute_query.assert_called_once()
+        self.assertEqual("export query", mock_execute_query.call_args.args[3])
+        self.assertEqual(constants.EXPORT_QUERY_KIND, mock_execute_query.call_args.kwargs["query_kind"])
+
 
 def _create_export_step(exports: List[Export], end_date: str, export_jointly: bool = True,
                         date_format: str = "%Y%m%d") -> ExportWorkflowStep:
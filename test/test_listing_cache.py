@@ -0,0 +1,80 @@
+import logging
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from workflow.common import AzureConfig, FileMetadata
+from workflow.listing_cache import ListingCache
+from workflow.paths import AzurePathsBuilder
+
+
+class TestListingCache(unittest.TestCase):
+    logger: logging.Logger = Mock()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "listing_cache.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_should_expire_only_mutable_listings(self):
+        # given
+        cache = ListingCache(self.path, ttl=0)
+        files = [FileMetadata("azure://acc/c/data_dt=20220101/part_1.csv", 10, fingerprint="etag-1")]
+        cache.put("acc/c", "data_dt=20220101", files, immutable=True)
+        cache.put("acc/c", "data_dt=20990101", files)
+        # when
+        another_run_cache = ListingCache(self.path, ttl=0)
+        # then
+        self.assertEqual(files, another_run_cache.get("acc/c", "data_dt=20220101"))
+        self.assertIsNone(another_run_cache.get("acc/c", "data_dt=20990101"))
+        self.assertIsNone(another_run_cache.get("acc/other", "data_dt=20220101"))
+
+    def test_is_immutable_day_should_keep_recent_days_mutable(self):
+        # given
+        cache = ListingCache(self.path, immutable_after_days=2)
+        # when
+        days = [(datetime.utcnow() - timedelta(days=n)).strftime("%Y%m%d") for n in range(4)]
+        # then
+        self.assertEqual([False, False, False, True], [cache.is_immutable_day(day) for day in days])
+
+    def test_get_should_bypass_cached_listings_in_refresh_mode(self):
+        # given
+        ListingCache(self.path).put("acc/c", "data_dt=20220101", [], immutable=True)
+        cache = ListingCache(self.path, refresh=True)
+        # when
+        cache.put("acc/c", "data_dt=20220102", [], immutable=True)
+        # then
+        self.assertIsNone(cache.get("acc/c", "data_dt=20220101"))
+        self.assertEqual([], ListingCache(self.path).get("acc/c", "data_dt=20220102"))
+
+    def test_invalidate_should_remove_listings_by_prefix(self):
+        # given
+        cache = ListingCache(self.path)
+        cache.put("acc/c", "src1/data_dt=20220101", [], immutable=True)
+        cache.put("acc/c", "src2/data_dt=20220101", [], immutable=True)
+        # when
+        removed = cache.invalidate("src1/")
+        # then
+        self.assertEqual(1, removed)
+        self.assertIsNone(cache.get("acc/c", "src1/data_dt=20220101"))
+        self.assertEqual([], cache.get("acc/c", "src2/data_dt=20220101"))
+
+    @patch('workflow.paths.blob.list_files_in_containers')
+    def test_azure_paths_builder_should_list_past_dates_once(self, mock_list_files):
+        # given
+        config = AzureConfig(account="acc", container="c", data_path="data", sas="sas")
+        mock_list_files.side_effect = lambda logger, cfg, prefix: [FileMetadata(f"{prefix}/part_1.csv", 10)]
+        builder = AzurePathsBuilder(config, ListingCache(self.path, ttl=0))
+        days = ["20220101", "20990101"]
+        # when
+        builder.build(self.logger, days, "src", ["csv"], True)
+        paths = builder.build(self.logger, days, "src", ["csv"], True)
+        # then
+        listed_prefixes = [c.args[2] for c in mock_list_files.call_args_list]
+        self.assertEqual(["data/src/data_dt=20220101", "data/src/data_dt=20990101", "data/src/data_dt=20990101"],
+                         listed_prefixes)
+        self.assertEqual(["20220101", "20990101"], [p.as_of_date for p in paths])
@@ -0,0 +1,178 @@
+import logging
+import unittest
+import uuid
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from railib import api
+
+from workflow import constants
+from workflow.common import RaiConfig, EnvConfig, PollingPolicy
+from workflow.exception import DataLoadException
+from workflow.executor import LoadDataWorkflowStep, WorkflowStepState
+from workflow.query import QueryWithInputs
+
+
+class TestLoadDataWorkflowStep(unittest.TestCase):
+    logger: logging.Logger = Mock()
+    rai_config: RaiConfig = Mock()
+    env_config: EnvConfig = Mock()
+
+    @patch('workflow.rai.execute_query_async')
+    def test_load_sources_concurrently_should_report_failed_sources(self, mock_execute_query):
+        # given
+        step = _create_load_data_step(load_concurrency=2)
+        query_batches = {
+            "src1": [lambda: QueryWithInputs("query1", {})],
+            "src2": [lambda: QueryWithInputs("fail", {})],
+            "src3": [lambda: QueryWithInputs("query3_1", {}), lambda: QueryWithInputs("query3_2", {})],
+        }
+
+        def execute_query(logger, rai_config, env_config, query, inputs, readonly, query_kind):
+            if query == "fail":
+                raise AssertionError("Transaction did not complete successfully")
+
+        mock_execute_query.side_effect = execute_query
+        # when
+        with self.assertRaises(DataLoadException) as ctx:
+            step._load_sources_concurrently(self.logger, self.env_config, self.rai_config, query_batches)
+        # then
+        self.assertIn("src2", str(ctx.exception))
+        self.assertNotIn("src1", str(ctx.exception))
+        executed_queries = {c.args[3] for c in mock_execute_query.call_args_list}
+        self.assertEqual({"query1", "fail", "query3_1", "query3_2"}, executed_queries)
+
+    @patch('workflow.query.load_resources')
+    def test_get_data_load_query_should_pack_partitions_by_budget(self, mock_load_resources):
+        # given
+        step = _create_load_data_step(load_batch_max_bytes=100, load_batch_max_files=2)
+        src = {
+            "source": "src",
+            "dates": [
+                {"date": "20220101", "resources": [{"uri": "a", "size": 60}, {"uri": "b", "size": 30}]},
+                {"date": "20220102", "resources": [{"uri": "c", "size": 200}, {"uri": "d"}, {"uri": "e"},
+                                                   {"uri": "f"}]},
+            ]
+        }
+        # when
+        queries = [build_query() for build_query in step._get_date_part_load_query(self.logger, Mock(), src)]
+        # then
+        self.assertEqual(4, len(queries))
+        batches = [[res["uri"] for res in c.args[2]] for c in mock_load_resources.call_args_list]
+        self.assertEqual([["a", "b"], ["c"], ["d", "e"], ["f"]], batches)
+
+    @patch('workflow.query.load_resources')
+    def test_get_data_load_query_should_split_local_multipart_source_by_max_bytes(self, mock_load_resources):
+        # given
+        step = _create_load_data_step(local_load_max_bytes=100)
+        src = {
+            "source": "src",
+            "container_type": "LOCAL",
+            "is_multi_part": "Y",
+            "resources": [{"uri": "a", "size": 60}, {"uri": "b", "size": 60}, {"uri": "c", "size": 30}]
+        }
+        # when
+        query_builders = step._get_simple_src_load_query(self.logger, Mock(), src)
+        # then
+        mock_load_resources.assert_not_called()
+        for build_query in query_builders:
+            build_query()
+        batches = [[res["uri"] for res in c.args[2]] for c in mock_load_resources.call_args_list]
+        self.assertEqual([["a"], ["b", "c"]], batches)
+
+    @patch('workflow.executor.EnvConfig.get_config')
+    @patch('workflow.rai.execute_query')
+    @patch('workflow.query.load_resources')
+    def test_load_simple_resources_should_build_queries_one_transaction_ahead(self, mock_load_resources,
+                                                                              mock_execute_query, _):
+        # given
+        step = _create_load_data_step(collapse_partitions_on_load=False)
+        src = {"source": "src", "container": "default", "container_type": "LOCAL", "file_type": "CSV",
+               "resources": [{"uri": "a"}, {"uri": "b"}, {"uri": "c"}]}
+        events = []
+        mock_load_resources.side_effect = lambda logger, config, resources, src, snapshots, read_executor: \
+            events.append(f"build {resources[0]['uri']}") or QueryWithInputs(resources[0]["uri"], {})
+        mock_execute_query.side_effect = lambda logger, rai_config, env_config, query, inputs, readonly, query_kind: \
+            events.append(f"execute {query}")
+        # when
+        step._load_simple_resources(self.logger, self.env_config, self.rai_config, [src])
+        # then
+        self.assertEqual(["execute a", "execute b", "execute c"], [e for e in events if e.startswith("execute")])
+        # only the next query is built while a transaction is running
+        self.assertLess(events.index("build b"), events.index("execute b"))
+        self.assertLess(events.index("execute a"), events.index("build c"))
+
+    @patch('workflow.executor.EnvConfig.get_config')
+    @patch('workflow.rai.time.sleep')
+    @patch('workflow.rai.api')
+    @patch('workflow.query.load_resources')
+    def test_load_simple_resources_should_poll_with_learned_load_duration(self, mock_load_resources, mock_api,
+                                                                          mock_sleep, _):
+        # given
+        step = _create_load_data_step()
+        src = {"source": "src", "container": "default", "container_type": "LOCAL", "file_type": "CSV",
+               "resources": [{"uri": "a"}]}
+        mock_load_resources.return_value = QueryWithInputs("query", {})
+        txn = api.TransactionAsyncResponse()
+        txn.transaction = {"id": "txn", "state": "RUNNING"}
+        txn.results = None
+        mock_api.is_txn_term_state.side_effect = api.is_txn_term_state
+        mock_api.exec_async.return_value = txn
+        mock_api.get_transaction.return_value = {"id": "txn", "state": "COMPLETED"}
+        mock_api.get_transaction_problems.return_value = []
+        polling_policy = PollingPolicy(use_history=True)
+        polling_policy.record(constants.LOAD_DATA_QUERY_KIND, 30)
+        env_config = Mock(fail_on_multiple_write_txn_in_flight=False, polling_policy=polling_policy)
+        # when
+        step._load_simple_resources(self.logger, env_config, self.rai_config, [src])
+        # then
+        mock_sleep.assert_called_once()
+        self.assertGreater(mock_sleep.call_args.args[0], 29)
+
+    @patch('workflow.executor.EnvConfig.get_config')
+    @patch('workflow.rai.execute_query')
+    @patch('workflow.query.load_resources')
+    def test_load_simple_resources_should_skip_source_of_unsupported_file_type(self, mock_load_resources,
+                                                                               mock_execute_query, _):
+        # given
+        step = _create_load_data_step()
+        src = {"source": "src", "container": "default", "container_type": "LOCAL", "file_type": "XLSX",
+               "resources": [{"uri": "a"}]}
+        # when
+        step._load_simple_resources(self.logger, self.env_config, self.rai_config, [src])
+        # then
+        mock_load_resources.assert_not_called()
+        mock_execute_query.assert_not_called()
+
+    def test_load_query_builder_should_fail_on_multi_part_source_of_unsupported_file_type(self):
+        # given
+        step = _create_load_data_step(collapse_partitions_on_load=False)
+        src = {"source": "src", "container_type": "LOCAL", "file_type": "JSON", "is_multi_part": "Y",
+               "resources": [{"uri": "a", "part_index": 1}]}
+        query_builders = step._get_simple_src_load_query(self.logger, Mock(), src)
+        # when
+        with self.assertRaises(ValueError) as ctx:
+            query_builders[0]()
+        # then
+        self.assertIn("Unsupported file type of multi-part source 'src': JSON", str(ctx.exception))
+
+
+def _create_load_data_step(collapse_partitions_on_load: bool = True, load_jointly: bool = False,
+                           load_concurrency: int = 1, load_batch_max_bytes: int = None,
+                           load_batch_max_files: int = None, local_load_max_bytes: int = None) -> \
+        LoadDataWorkflowStep:
+    return LoadDataWorkflowStep(
+        idt=str(uuid.uuid4()),
+        name="test",
+        type_value="LoadData",
+        state=WorkflowStepState.INIT,
+        timing=datetime.now().second,
+        engine_size="xs",
+        collapse_partitions_on_load=collapse_partitions_on_load,
+        load_jointly=load_jointly,
+        enable_incremental_snapshots=False,
+        load_concurrency=load_concurrency,
+        load_batch_max_bytes=load_batch_max_bytes,
+        load_batch_max_files=load_batch_max_files,
+        local_load_max_bytes=local_load_max_bytes
+    )
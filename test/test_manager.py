@@ -0,0 +1,200 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from workflow.common import RaiConfig
+from workflow.engine_pool import EnginePool
+from workflow.exception import ResourceCleanupException
+from workflow.manager import ResourceManager
+
+
+class TestResourceManager(unittest.TestCase):
+
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_add_engine_async_should_provision_engine_in_background(self, mock_create_engine, mock_engine_exist):
+        # given
+        provisioned = threading.Event()
+        mock_engine_exist.return_value = False
+        mock_create_engine.side_effect = lambda logger, config, size: size == "M" and provisioned.wait(5)
+        manager = _create_manager()
+        manager.add_engine("XS")
+        # when
+        future = manager.add_engine_async("M")
+        # then
+        self.assertFalse(future.done())
+        self.assertEqual("default", manager.get_rai_config("M").engine)
+        provisioned.set()
+        manager.add_engine("M")
+        self.assertTrue(future.done())
+        self.assertTrue(manager.get_rai_config("M").engine.startswith("wf-manager-M-"))
+        self.assertEqual(2, mock_create_engine.call_count)
+
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_add_engine_should_raise_provision_failure(self, mock_create_engine, mock_engine_exist):
+        # given
+        mock_engine_exist.return_value = False
+        manager = _create_manager()
+        manager.add_engine("XS")
+        mock_create_engine.side_effect = ValueError("Provision failed")
+        manager.add_engine_async("M")
+        # when
+        with self.assertRaises(ValueError):
+            manager.add_engine("M")
+        # then
+        self.assertEqual("default", manager.get_rai_config("M").engine)
+
+    @patch('workflow.rai.delete_engine')
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_remove_engine_should_return_engine_to_pool(self, mock_create_engine, mock_engine_exist,
+                                                        mock_delete_engine):
+        # given
+        mock_engine_exist.return_value = False
+        engine_pool = Mock()
+        engine_pool.evict_expired.return_value = []
+        engine_pool.acquire.return_value = "pooled-engine"
+        engine_pool.release.return_value = True
+        manager = _create_manager(engine_pool)
+        manager.add_engine("XS")
+        manager.add_engine("M")
+        # when
+        manager.remove_engine("M")
+        # then
+        engine_pool.release.assert_called_once_with("pooled-engine")
+        mock_delete_engine.assert_not_called()
+        self.assertEqual(["default", "pooled-engine"], [c.args[1].engine for c in mock_create_engine.call_args_list])
+
+    @patch('workflow.rai.delete_engine')
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_remove_engine_should_not_block_engine_management_while_deleting(self, _, mock_engine_exist,
+                                                                             mock_delete_engine):
+        # given
+        mock_engine_exist.side_effect = [False, False, True, False]
+        manager = _create_manager()
+        manager.add_engine("XS")
+        manager.add_engine("M")
+        provisions = []
+
+        def delete_engine(logger, config, polling_policy):
+            thread = threading.Thread(target=lambda: provisions.append(manager.add_engine_async("L")))
+            thread.start()
+            thread.join(5)
+
+        mock_delete_engine.side_effect = delete_engine
+        # when
+        manager.remove_engine("M")
+        # then
+        self.assertEqual(1, len(provisions))
+        self.assertEqual("default", manager.get_rai_config("M").engine)
+        mock_delete_engine.assert_called_once()
+
+    @patch('workflow.rai.delete_database')
+    @patch('workflow.rai.database_exist')
+    @patch('workflow.rai.delete_engine')
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_cleanup_resources_should_delete_resources_concurrently(self, _, mock_engine_exist, mock_delete_engine,
+                                                                    mock_database_exist, mock_delete_database):
+        # given
+        barrier = threading.Barrier(3, timeout=5)
+        mock_engine_exist.side_effect = [False, False, True, True]
+        mock_database_exist.return_value = True
+        mock_delete_engine.side_effect = lambda logger, config, polling_policy, timeout: barrier.wait()
+        mock_delete_database.side_effect = lambda logger, config: barrier.wait()
+        manager = _create_manager()
+        manager.add_engine("XS")
+        manager.add_engine("M")
+        # when
+        outcomes = manager.cleanup_resources()
+        # then
+        self.assertEqual(3, len(outcomes))
+        self.assertTrue(all(outcome == "deleted" for outcome in outcomes.values()))
+
+    @patch('workflow.rai.delete_engine')
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_cleanup_engines_should_report_failed_resources(self, _, mock_engine_exist, mock_delete_engine):
+        # given
+        mock_engine_exist.side_effect = [False, False, True, True]
+
+        def delete_engine(logger, config, polling_policy, timeout):
+            if config.engine == "default":
+                raise ValueError("Deletion failed")
+
+        mock_delete_engine.side_effect = delete_engine
+        manager = _create_manager()
+        manager.add_engine("XS")
+        manager.add_engine("M")
+        # when
+        with self.assertRaises(ResourceCleanupException) as ctx:
+            manager.cleanup_engines()
+        # then
+        self.assertIn("engine `default`", str(ctx.exception))
+        self.assertNotIn("wf-manager-M", str(ctx.exception))
+        self.assertEqual(2, mock_delete_engine.call_count)
+
+    @patch('workflow.rai.delete_engine')
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_cleanup_engines_should_shut_down_engine_provisioner(self, _, mock_engine_exist, __):
+        # given
+        mock_engine_exist.return_value = False
+        manager = _create_manager()
+        manager.add_engine("XS")
+        # when
+        manager.cleanup_engines()
+        # then
+        with self.assertRaises(RuntimeError):
+            manager.add_engine_async("M")
+
+    @patch('workflow.rai.delete_engine')
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_cleanup_engines_should_delete_expired_pool_engines(self, _, mock_engine_exist, mock_delete_engine):
+        # given
+        mock_engine_exist.side_effect = lambda logger, config: config.engine == "expired-engine"
+        engine_pool = Mock()
+        engine_pool.evict_expired.return_value = ["expired-engine"]
+        manager = _create_manager(engine_pool)
+        engine_pool.evict_expired.assert_not_called()
+        manager.add_engine("XS")
+        # when
+        outcomes = manager.cleanup_engines(timeout=60)
+        # then
+        self.assertEqual("deleted", outcomes["expired engines of engine pool"])
+        self.assertEqual(["expired-engine"], [c.args[1].engine for c in mock_delete_engine.call_args_list])
+        self.assertLessEqual(mock_delete_engine.call_args.kwargs["timeout"], 60)
+
+    @patch('workflow.rai.delete_database')
+    @patch('workflow.rai.database_exist')
+    @patch('workflow.rai.delete_engine')
+    @patch('workflow.rai.engine_exist')
+    @patch('workflow.rai.create_engine')
+    def test_cleanup_resources_should_abandon_provision_pending_at_deadline(self, mock_create_engine, mock_engine_exist,
+                                                                            mock_delete_engine, mock_database_exist,
+                                                                            mock_delete_database):
+        # given
+        provisioned = threading.Event()
+        mock_engine_exist.return_value = False
+        mock_create_engine.side_effect = lambda logger, config, size: size == "M" and provisioned.wait(5)
+        mock_database_exist.return_value = True
+        manager = _create_manager()
+        manager.add_engine("XS")
+        manager.add_engine_async("M")
+        # when
+        with self.assertRaises(ResourceCleanupException) as ctx:
+            manager.cleanup_resources(timeout=0.2)
+        provisioned.set()
+        # then
+        self.assertIn("pending `M` engine", str(ctx.exception))
+        self.assertNotIn("database `db`", str(ctx.exception))
+        mock_delete_database.assert_called_once()
+        mock_delete_engine.assert_not_called()
+
+
+def _create_manager(engine_pool: EnginePool = None) -> ResourceManager:
+    rai_config = RaiConfig(ctx=Mock(), engine="default", database="db")
+    return ResourceManager(Mock(), rai_config, Mock(), engine_pool)
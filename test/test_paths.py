@@ -0,0 +1,91 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from workflow import blob
+from workflow.common import AzureConfig, FileMetadata, LocalConfig
+from workflow.paths import AzurePathsBuilder, LocalPathsBuilder
+
+
+class TestAzurePathsBuilder(unittest.TestCase):
+    logger: logging.Logger = Mock()
+    config = AzureConfig(account="acc", container="c", data_path="data", sas="sas")
+
+    @patch('workflow.paths.blob.list_files_in_containers')
+    def test_build_should_list_month_with_many_days_under_common_prefix(self, mock_list_files):
+        # given
+        month_days = [f"202201{d:02d}" for d in range(1, AzurePathsBuilder.MONTH_LISTING_MIN_DAYS + 1)]
+        days = month_days + ["20220201"]
+        listed = {
+            "data/src/data_dt=202201": [self._file("20220101"), self._file("20220102"), self._file("20220131")],
+            "data/src/data_dt=20220201": [self._file("20220201")],
+        }
+        mock_list_files.side_effect = lambda logger, cfg, prefix: listed[prefix]
+        builder = AzurePathsBuilder(self.config, list_workers=4)
+        # when
+        paths = builder.build(self.logger, days, "src", ["csv"], True)
+        # then
+        self.assertCountEqual(listed.keys(), [c.args[2] for c in mock_list_files.call_args_list])
+        self.assertEqual(["20220101", "20220102", "20220201"], [p.as_of_date for p in paths])
+        self.assertEqual([self._file(d).path for d in ["20220101", "20220102", "20220201"]], [p.path for p in paths])
+
+    @patch.dict('workflow.blob._container_clients', clear=True)
+    @patch('workflow.blob.BlobServiceClient')
+    def test_get_container_client_should_reuse_client_of_container(self, mock_client):
+        # given
+        other_config = AzureConfig(account="acc", container="other", data_path="data", sas="sas")
+        # when
+        client = blob.get_container_client(self.config)
+        same_client = blob.get_container_client(self.config)
+        blob.get_container_client(other_config)
+        # then
+        self.assertIs(client, same_client)
+        self.assertEqual(2, mock_client.call_count)
+
+    @staticmethod
+    def _file(day: str) -> FileMetadata:
+        return FileMetadata(f"azure://acc.blob.core.windows.net/c/data/src/data_dt={day}/part_1.csv", 10)
+
+
+class TestLocalPathsBuilder(unittest.TestCase):
+    logger: logging.Logger = Mock()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_build_should_scan_day_folders_in_parallel(self):
+        # given
+        for day, fnames in {"20220101": ["part_1.csv", "part_2.json", "part_3.txt", ".part_4.csv"],
+                            "20220102": ["part_1.csv"]}.items():
+            folder = os.path.join(self.tmp_dir.name, "src", f"data_dt={day}")
+            os.makedirs(folder)
+            for fname in fnames:
+                with open(os.path.join(folder, fname), "w") as fp:
+                    fp.write("a,b")
+        builder = LocalPathsBuilder(LocalConfig(self.tmp_dir.name), list_workers=2)
+        # when
+        paths = builder.build(self.logger, ["20220101", "20220102", "20220103"], "src", ["csv", "json"], True)
+        # then
+        self.assertCountEqual([("20220101", "part_1.csv"), ("20220101", "part_2.json"), ("20220102", "part_1.csv")],
+                              [(p.as_of_date, os.path.basename(p.path)) for p in paths])
+        self.assertTrue(all(p.size == 3 for p in paths))
+
+    def test_build_should_skip_only_files_which_can_not_be_accessed(self):
+        # given
+        folder = os.path.join(self.tmp_dir.name, "src")
+        os.makedirs(folder)
+        with open(os.path.join(folder, "part_1.csv"), "w") as fp:
+            fp.write("a,b")
+        os.symlink(os.path.join(folder, "missing.csv"), os.path.join(folder, "part_2.csv"))
+        logger = Mock()
+        builder = LocalPathsBuilder(LocalConfig(self.tmp_dir.name))
+        # when
+        paths = builder.build(logger, [], "src", ["csv"], False)
+        # then
+        self.assertEqual(["part_1.csv"], [os.path.basename(p.path) for p in paths])
+        logger.warning.assert_called_once()
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import Mock
+
+from workflow import query as q
+from workflow.common import Container, ContainerType, Source
+
+
+class TestQueryBuilder(unittest.TestCase):
+
+    def test_should_join_fragments(self):
+        # given
+        builder = q.QueryBuilder("def a = 1\n")
+        # when
+        builder.add("def b = ", "2\n").add_lines(f"{i}" for i in range(3))
+        # then
+        self.assertEqual("def a = 1\ndef b = 2\n0\n1\n2\n", builder.build())
+
+    def test_should_build_azure_multipart_query_in_part_order(self):
+        # given
+        parts = [{"part_index": 2, "uri": "azure://b"}, {"part_index": 1, "uri": "azure://a"}]
+        # when
+        query = q._azure_load_multipart_query("src", q.FileType.CSV, parts, Mock(sas="sas"), False)
+        # then
+        self.assertIn("INDEX\n2\n1\n", query)
+        self.assertIn("INDEX,URI\n2,\"azure://b\"\n1,\"azure://a\"\n", query)
+
+    def test_should_pass_source_catalogs_as_inputs_of_fixed_query(self):
+        # given
+        small = [_create_source("a", ["a/part_1.csv"])]
+        large = [_create_source("a", [f"a/part_{i}.csv" for i in range(100)]), _create_source("b", ["b/part_1.csv"])]
+        # when
+        small_query = q.populate_source_configs(small)
+        large_query = q.populate_source_configs(large)
+        # then
+        self.assertEqual(small_query.query, large_query.query)
+        self.assertNotIn("a/part_1.csv", large_query.query)
+        self.assertEqual("a,default,a/part_1.csv", small_query.inputs["source_config_data"])
+        self.assertEqual("a,True,False\nb,True,False", large_query.inputs["source_partitioning_config_data"])
+
+    def test_should_pass_reimport_catalogs_as_inputs(self):
+        # given
+        sources = [_create_source("a", ["a/part_1.csv"])]
+        # when
+        query = q.discover_reimport_sources(sources, [("b", "b/part_1.csv")], False, False)
+        # then
+        self.assertNotIn("part_1.csv", query.query)
+        self.assertEqual("a,a/part_1.csv,True\n", query.inputs["new_source_config_data"])
+        self.assertEqual("b,b/part_1.csv\n", query.inputs["expired_source_config_data"])
+
+
+def _create_source(relation: str, paths) -> Source:
+    return Source(Container("default", ContainerType.LOCAL, {}), relation, relation, "csv", ["csv"], True, False, 1,
+                  0, None, paths)
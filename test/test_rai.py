@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import unittest
+from unittest.mock import Mock, patch
+
+from railib import api
+
+from workflow import rai
+from workflow import query as q
+from workflow.common import RaiConfig, EnvConfig, PollingPolicy
+
+
+class TestRai(unittest.TestCase):
+    logger: logging.Logger = Mock()
+    rai_config: RaiConfig = Mock()
+    env_config: EnvConfig = Mock(fail_on_multiple_write_txn_in_flight=False, polling_policy=PollingPolicy())
+
+    @patch('workflow.rai.asyncio.sleep')
+    @patch('workflow.rai.api')
+    def test_execute_query_async_should_poll_until_terminal_state(self, mock_api, mock_sleep):
+        # given
+        mock_api.is_txn_term_state.side_effect = api.is_txn_term_state
+        mock_api.exec_async.return_value = _create_txn_response("RUNNING")
+        mock_api.get_transaction.side_effect = [{"id": "txn", "state": "RUNNING"},
+                                                {"id": "txn", "state": "COMPLETED"}]
+        mock_api.get_transaction_problems.return_value = []
+        mock_api.get_transaction_results.return_value = ["result"]
+        # when
+        rsp = asyncio.run(rai.execute_query_async(self.logger, self.rai_config, self.env_config, "query"))
+        # then
+        self.assertEqual(2, mock_api.get_transaction.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+        self.assertEqual("COMPLETED", rsp.transaction["state"])
+        self.assertEqual(["result"], rsp.results)
+
+    @patch('workflow.rai.api')
+    def test_execute_query_async_should_return_short_path_results(self, mock_api):
+        # given
+        txn = _create_txn_response("COMPLETED")
+        txn.results = ["result"]
+        mock_api.exec_async.return_value = txn
+        # when
+        rsp = asyncio.run(rai.execute_query_async(self.logger, self.rai_config, self.env_config, "query"))
+        # then
+        self.assertEqual(["result"], rsp.results)
+        mock_api.get_transaction.assert_not_called()
+
+    @patch('workflow.rai.asyncio.sleep')
+    @patch('workflow.rai.api')
+    def test_execute_query_async_should_fail_on_aborted_transaction(self, mock_api, _):
+        # given
+        mock_api.is_txn_term_state.side_effect = api.is_txn_term_state
+        mock_api.exec_async.return_value = _create_txn_response("RUNNING")
+        mock_api.get_transaction.return_value = {"id": "txn", "state": "ABORTED"}
+        mock_api.get_transaction_problems.return_value = []
+        # when
+        with self.assertRaises(AssertionError):
+            asyncio.run(rai.execute_query_async(self.logger, self.rai_config, self.env_config, "query"))
+        # then
+        # exception
+
+    @patch('workflow.rai.time.sleep')
+    @patch('workflow.rai.api')
+    def test_execute_query_should_reuse_last_poll_response(self, mock_api, _):
+        # given
+        mock_api.is_txn_term_state.side_effect = api.is_txn_term_state
+        mock_api.exec_async.return_value = _create_txn_response("RUNNING")
+        mock_api.get_transaction.side_effect = [{"id": "txn", "state": "RUNNING"},
+                                                {"id": "txn", "state": "COMPLETED"}]
+        mock_api.get_transaction_problems.return_value = []
+        mock_api.get_transaction_results.return_value = ["result"]
+        # when
+        rsp = rai.execute_query(self.logger, self.rai_config, self.env_config, "query")
+        # then
+        self.assertEqual(2, mock_api.get_transaction.call_count)
+        self.assertEqual("COMPLETED", rsp.transaction["state"])
+        self.assertEqual(["result"], rsp.results)
+        mock_api.get_transaction_problems.assert_called_once()
+        mock_api.get_transaction_metadata.assert_not_called()
+
+    @patch('workflow.rai.time.sleep')
+    @patch('workflow.rai.api')
+    def test_execute_query_should_skip_problems_for_readonly_query_ignoring_problems(self, mock_api, _):
+        # given
+        mock_api.TransactionAsyncResponse = api.TransactionAsyncResponse
+        mock_api.is_txn_term_state.side_effect = api.is_txn_term_state
+        mock_api.exec_async.return_value = _create_txn_response("RUNNING")
+        mock_api.get_transaction.return_value = {"id": "txn", "state": "COMPLETED"}
+        mock_api.get_transaction_results.return_value = []
+        # when
+        rsp = rai.execute_query(self.logger, self.rai_config, self.env_config, "query", ignore_problems=True)
+        # then
+        self.assertIsNone(rsp.problems)
+        mock_api.get_transaction_problems.assert_not_called()
+        mock_api.get_transaction_metadata.assert_not_called()
+
+    @patch('workflow.rai.api')
+    def test_write_txn_tracker_should_list_running_transactions_once_within_ttl(self, mock_api):
+        # given
+        tracker = rai._WriteTxnTracker(ttl=60)
+        mock_api.list_transactions.return_value = [{"id": "foreign", "state": "RUNNING", "read_only": False}]
+        # when
+        first = tracker.has_foreign_running_write(self.logger, self.rai_config)
+        second = tracker.has_foreign_running_write(self.logger, self.rai_config)
+        # then
+        self.assertTrue(first)
+        self.assertTrue(second)
+        mock_api.list_transactions.assert_called_once_with(self.rai_config.ctx, engine_name=self.rai_config.engine,
+                                                           state="RUNNING")
+
+    @patch('workflow.rai.api')
+    def test_write_txn_tracker_should_ignore_own_and_readonly_transactions(self, mock_api):
+        # given
+        tracker = rai._WriteTxnTracker(ttl=0)
+        tracker.add("own")
+        mock_api.list_transactions.return_value = [{"id": "own", "state": "RUNNING", "read_only": False},
+                                                   {"id": "read", "state": "RUNNING", "read_only": True},
+                                                   {"id": "done", "state": "COMPLETED", "read_only": False}]
+        # when
+        has_foreign = tracker.has_foreign_running_write(self.logger, self.rai_config)
+        # then
+        self.assertFalse(has_foreign)
+
+    @patch('workflow.rai.api')
+    def test_write_txn_tracker_should_drop_finished_own_transaction_from_cache(self, mock_api):
+        # given
+        tracker = rai._WriteTxnTracker(ttl=60)
+        tracker.add("own")
+        mock_api.list_transactions.return_value = [{"id": "own", "state": "RUNNING", "read_only": False}]
+        tracker.has_foreign_running_write(self.logger, self.rai_config)
+        # when
+        tracker.remove("own")
+        has_foreign = tracker.has_foreign_running_write(self.logger, self.rai_config)
+        # then
+        self.assertFalse(has_foreign)
+        mock_api.list_transactions.assert_called_once()
+
+    @patch('workflow.rai.execute_query')
+    def test_install_models_should_skip_unchanged_models(self, mock_execute_query):
+        # given
+        models = {"a.rel": "def a = 1", "b.rel": "def b = 2"}
+        mock_execute_query.return_value = _create_installed_models_response(
+            [("a.rel", q.model_hash("def a = 1")), ("b.rel", q.model_hash("def b = 2"))],
+            [("step", "a.rel"), ("step", "b.rel")])
+        # when
+        rai.install_models(self.logger, self.rai_config, self.env_config, models, "step")
+        # then
+        mock_execute_query.assert_called_once_with(self.logger, self.rai_config, self.env_config, q.INSTALLED_MODELS)
+
+    @patch('workflow.rai.execute_query')
+    def test_install_models_should_install_changed_and_remove_undeclared_models(self, mock_execute_query):
+        # given
+        models = {"a.rel": "def a = 10", "b.rel": "def b = 2"}
+        mock_execute_query.return_value = _create_installed_models_response(
+            [("a.rel", q.model_hash("def a = 1")), ("b.rel", q.model_hash("def b = 2")),
+             ("c.rel", "hash"), ("d.rel", "hash")],
+            [("step", "a.rel"), ("step", "b.rel"), ("step", "c.rel"), ("step", "d.rel"), ("other", "d.rel")])
+        # when
+        rai.install_models(self.logger, self.rai_config, self.env_config, models, "step")
+        # then
+        install_query, inputs = mock_execute_query.call_args.args[3:5]
+        self.assertEqual(["def a = 10"], list(inputs.values()))
+        self.assertNotIn("insert:rel:catalog:model[\"b.rel\"]", install_query)
+        self.assertIn("def delete:rel:catalog:model[\"c.rel\"]", install_query)
+        self.assertNotIn("d.rel", install_query)
+        self.assertIn("def insert:rwm_model_scope = (\"step\", \"b.rel\")", install_query)
+
+    @patch('workflow.rai.execute_query')
+    def test_install_models_should_keep_models_of_batch_config_with_the_same_step_name(self, mock_execute_query):
+        # given
+        models = {"b.rel": "def b = 2"}
+        mock_execute_query.return_value = _create_installed_models_response(
+            [("a.rel", q.model_hash("def a = 1"))], [("A:ConfigureSources", "a.rel")])
+        # when
+        rai.install_models(self.logger, self.rai_config, self.env_config, models, "B:ConfigureSources")
+        # then
+        install_query = mock_execute_query.call_args.args[3]
+        self.assertNotIn("a.rel", install_query)
+        self.assertIn("def insert:rwm_model_scope = (\"B:ConfigureSources\", \"b.rel\")", install_query)
+
+
+def _create_installed_models_response(hashes, scopes) -> api.TransactionAsyncResponse:
+    rsp = api.TransactionAsyncResponse()
+    rsp.results = [
+        {"relationId": "/:output/:hash/String/String",
+         "table": Mock(to_pydict=Mock(return_value={"v1": [h[0] for h in hashes], "v2": [h[1] for h in hashes]}))},
+        {"relationId": "/:output/:scope/String/String",
+         "table": Mock(to_pydict=Mock(return_value={"v1": [s[0] for s in scopes], "v2": [s[1] for s in scopes]}))},
+    ]
+    return rsp
+
+
+def _create_txn_response(state: str) -> api.TransactionAsyncResponse:
+    txn = api.TransactionAsyncResponse()
+    txn.transaction = {"id": "txn", "state": state}
+    txn.results = None
+    return txn
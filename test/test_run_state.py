@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from workflow.run_state import RunStateStore
+
+
+class TestRunStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = RunStateStore(os.path.join(self.tmp_dir.name, "run_state.db"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_steps_should_return_latest_states(self):
+        # given
+        self.store.reset("config", "hash", [_create_step_json("s1"), _create_step_json("s2")])
+        # when
+        self.store.update_step("s1", "IN_PROGRESS")
+        self.store.update_step("s1", "SUCCESS", 10.5)
+        steps = self.store.load_steps("config", "hash")
+        # then
+        self.assertEqual([("s1", "SUCCESS", 10.5), ("s2", "INIT", 0)],
+                         [(step["idt"], step["state"], step["executionTime"]) for step in steps])
+
+    def test_load_steps_should_return_none_for_changed_config(self):
+        # given
+        self.store.reset("config", "hash", [_create_step_json("s1")])
+        # when
+        steps = self.store.load_steps("config", "another_hash")
+        # then
+        self.assertIsNone(steps)
+
+    def test_reset_should_clear_completed_units(self):
+        # given
+        self.store.reset("config", "hash", [_create_step_json("s1")])
+        self.store.add_completed_unit("s1", "relation1")
+        self.store.add_completed_unit("s1", "relation2")
+        self.assertEqual({"relation1", "relation2"}, self.store.get_completed_units("s1"))
+        # when
+        self.store.reset("config", "hash", [_create_step_json("s1")])
+        # then
+        self.assertEqual(set(), self.store.get_completed_units("s1"))
+
+
+def _create_step_json(idt: str) -> dict:
+    return {"idt": idt, "name": idt, "type": "Test", "state": "INIT", "executionTime": 0}
@@ -0,0 +1,64 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.error import HTTPError
+
+from railib import rest
+
+from workflow import session
+from workflow.common import HttpConfig
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        status = 409 if self.path.startswith("/conflict") else 200
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        _Handler.connections = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.ctx = rest.Context(retries=0)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_sdk_requests_should_reuse_connection(self):
+        # given
+        http_session = session.create_session(HttpConfig())
+        with patch.object(rest, "urlopen", lambda req: session._urlopen(http_session, req)):
+            # when
+            responses = [json.loads(rest.get(self.ctx, f"{self.url}/path{i}").read()) for i in range(3)]
+        # then
+        self.assertEqual([{"path": f"/path{i}"} for i in range(3)], responses)
+        self.assertEqual(1, len(_Handler.connections))
+
+    def test_sdk_requests_should_raise_http_error_for_error_status(self):
+        # given
+        http_session = session.create_session(HttpConfig())
+        with patch.object(rest, "urlopen", lambda req: session._urlopen(http_session, req)):
+            # when
+            with self.assertRaises(HTTPError) as ctx:
+                rest.get(self.ctx, f"{self.url}/conflict")
+        # then
+        self.assertEqual(409, ctx.exception.status)
+        self.assertEqual({"path": "/conflict"}, json.loads(ctx.exception.read()))
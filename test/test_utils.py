@@ -1,5 +1,10 @@
-import unittest
+import concurrent.futures
+import gzip
 import logging
+import os
+import tempfile
+import time
+import unittest
 
 import workflow.utils
 
@@ -61,6 +66,91 @@ class UtilsTest(unittest.TestCase):
         # then
         self.assertEqual([], result)
 
+    def test_should_pack_by_bytes_and_items_budget(self):
+        # given
+        sizes = [40, 40, 30, 500, 10, 10, 10]
+        # when
+        result = workflow.utils.pack_by_budget(sizes, lambda size: size, max_bytes=100, max_items=2)
+        # then
+        self.assertEqual([[40, 40], [30], [500], [10, 10], [10]], result)
+
+    def test_should_pack_all_items_in_one_batch_without_budget(self):
+        # when
+        result = workflow.utils.pack_by_budget([1, 2, 3], lambda size: size)
+        # then
+        self.assertEqual([[1, 2, 3]], result)
+
+    def test_should_read_all_files_in_order_in_parallel(self):
+        # given
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fnames = []
+            for i in range(10):
+                fname = os.path.join(tmp_dir, f"part_{i}.csv")
+                with open(fname, "w") as fp:
+                    fp.write(f"data {i}")
+                fnames.append(fname)
+            # when
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                result = workflow.utils.read_all(fnames, executor)
+        # then
+        self.assertEqual([f"data {i}" for i in range(10)], result)
+
+    def test_should_read_gzip_file_decompressed(self):
+        # given
+        data = "a,b\n" * 1000
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, "part_1.csv.gz")
+            with gzip.open(fname, "wt") as fp:
+                fp.write(data)
+            # when
+            result = workflow.utils.read(fname)
+            size = workflow.utils.get_data_size(fname)
+        # then
+        self.assertEqual(data, result)
+        self.assertEqual(len(data), size)
+
+    def test_should_prefetch_one_task_ahead(self):
+        # given
+        events = []
+
+        def task(i):
+            return lambda: events.append(f"run {i}") or i
+
+        # when
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            for result in workflow.utils.prefetch([task(i) for i in range(3)], executor):
+                time.sleep(0.05)
+                events.append(f"consume {result}")
+        # then
+        self.assertEqual(["consume 0", "consume 1", "consume 2"], [e for e in events if e.startswith("consume")])
+        self.assertLess(events.index("run 1"), events.index("consume 0"))
+        self.assertLess(events.index("consume 0"), events.index("run 2"))
+
+    def test_get_common_models_should_select_models_of_step_types(self):
+        # given
+        batch_config = '{"workflow": [{"type": "InstallModels"}, {"type": "LoadData"}]}'
+        # when
+        models = workflow.utils.get_common_models(batch_config, incremental_snapshots=True)
+        # then
+        self.assertEqual([
+            "source_configs/config.rel",
+            "source_configs/data_reload.rel",
+            "batch_config/batch_config.rel",
+            "batch_config/workflow/workflow.rel",
+            "batch_config/workflow/steps/configure_sources.rel",
+            "batch_config/workflow/steps/install_models.rel",
+            "batch_config/workflow/steps/load_data.rel",
+            "util/snapshot_diff.rel",
+        ], models)
+
+    def test_get_common_models_should_select_all_models_for_unknown_step_type(self):
+        # given
+        batch_config = '{"workflow": [{"type": "InstallModels"}, {"type": "CustomStep"}]}'
+        # when
+        models = workflow.utils.get_common_models(batch_config)
+        # then
+        self.assertEqual(workflow.constants.COMMON_MODEL, models)
+
     @classmethod
     def setUpClass(cls) -> None:
         cls.logger = logging.getLogger("utils-test")
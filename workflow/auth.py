@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+
+from railib import rest
+from railib.credentials import AccessToken, ClientCredentials
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    Thread-safe cache of RAI access tokens keyed by client id of RAI profile. Only one thread refreshes an expired
+    token while others wait for it, and tokens are refreshed in background `refresh_margin` seconds before expiry,
+    so callers don't stall on the auth endpoint.
+    """
+    refresh_margin: int
+
+    def __init__(self, refresh_margin: int = 5 * 60):
+        self.refresh_margin = refresh_margin
+        self.__tokens = {}
+        self.__key_locks = {}
+        self.__timers = {}
+        self.__lock = threading.Lock()
+
+    def get_access_token(self, ctx: rest.Context, url: str) -> str:
+        """
+        Get valid access token, request a new one if there is no valid token in the cache.
+        :param ctx:     RAI SDK context
+        :param url:     URL of the request to authenticate
+        :return: access token
+        """
+        creds = ctx.credentials
+        assert isinstance(creds, ClientCredentials)
+        key = creds.client_id
+        token = self.__tokens.get(key)
+        if token is None or token.is_expired():
+            with self.__get_key_lock(key):
+                # the token could be refreshed by another thread while waiting for the lock
+                token = self.__tokens.get(key)
+                if token is None or token.is_expired():
+                    token = self.__refresh(ctx, url, key)
+        creds.access_token = token
+        return token.access_token
+
+    def __refresh(self, ctx: rest.Context, url: str, key: str) -> AccessToken:
+        creds = ctx.credentials
+        # a token could be refreshed by another process
+        token = rest._read_token_cache(creds)
+        if token is None or self.__expires_soon(token):
+            logger.debug(f"Requesting access token for `{key}`")
+            token = rest._request_access_token(ctx, url)
+            creds.access_token = token
+            rest._write_token_cache(creds)
+        self.__tokens[key] = token
+        self.__schedule_refresh(ctx, url, key, token)
+        return token
+
+    def __background_refresh(self, ctx: rest.Context, url: str, key: str) -> None:
+        try:
+            with self.__get_key_lock(key):
+                self.__refresh(ctx, url, key)
+        except Exception as e:
+            # the token is refreshed on demand when it expires
+            logger.warning(f"Failed to refresh access token for `{key}` in background: {e}")
+
+    def __schedule_refresh(self, ctx: rest.Context, url: str, key: str, token: AccessToken) -> None:
+        delay = token.created_on + token.expires_in - self.refresh_margin - time.time()
+        with self.__lock:
+            if key in self.__timers:
+                self.__timers.pop(key).cancel()
+            if delay > 0:
+                timer = threading.Timer(delay, self.__background_refresh, (ctx, url, key))
+                timer.daemon = True
+                timer.start()
+                self.__timers[key] = timer
+
+    def __expires_soon(self, token: AccessToken) -> bool:
+        return time.time() >= token.created_on + token.expires_in - self.refresh_margin
+
+    def __get_key_lock(self, key: str) -> threading.Lock:
+        with self.__lock:
+            return self.__key_locks.setdefault(key, threading.Lock())
+
+
+token_cache = TokenCache()
+
+
+def install_token_cache() -> None:
+    """
+    Make RAI SDK take access tokens from the shared token cache.
+    :return:
+    """
+    rest._get_access_token = token_cache.get_access_token
@@ -1,15 +1,17 @@
 import logging
+import threading
 from typing import List
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobServiceClient, ContainerClient
 
 from workflow.common import FileFormat, AzureConfig, FileMetadata
 from workflow.constants import BLOB_PAGE_SIZE
 
+_lock = threading.Lock()
+_container_clients = {}
+
 
 def list_files_in_containers(logger: logging.Logger, config: AzureConfig, path_prefix) -> List[FileMetadata]:
-    blob_service_client = BlobServiceClient(account_url=f"https://{config.account}.blob.core.windows.net",
-                                            credential=config.sas)
-    container_client = blob_service_client.get_container_client(config.container)
+    container_client = get_container_client(config)
     logger = logger.getChild("blob")
 
     # Get a list of blobs in the folder
@@ -21,7 +23,29 @@ def list_files_in_containers(logger: logging.Logger, config: AzureConfig, path_p
             if FileFormat.is_supported(blob_name):
                 paths.append(
                     FileMetadata(f"azure://{config.account}.blob.core.windows.net/{config.container}/{blob_name}",
-                                 blob.size))
+                                 blob.size, fingerprint=_fingerprint(blob)))
             else:
                 logger.debug(f"Skip unsupported file from blob: {blob_name}")
     return paths
+
+
+def get_container_client(config: AzureConfig) -> ContainerClient:
+    """
+    Get container client shared by all threads. Clients are created once per container config, so listings reuse
+    the connection pool of the client instead of opening new connections.
+    :param config:  Azure container config
+    :return: container client
+    """
+    key = (config.account, config.container, config.sas)
+    with _lock:
+        if key not in _container_clients:
+            blob_service_client = BlobServiceClient(account_url=f"https://{config.account}.blob.core.windows.net",
+                                                    credential=config.sas)
+            _container_clients[key] = blob_service_client.get_container_client(config.container)
+        return _container_clients[key]
+
+
+def _fingerprint(blob) -> str:
+    etag = blob.etag.strip('"') if blob.etag else ""
+    last_modified = blob.last_modified.isoformat() if blob.last_modified else ""
+    return f"{etag}-{last_modified}"
@@ -1,13 +1,17 @@
 import dataclasses
+import random
+import threading
+import time
 from enum import Enum, EnumMeta
-from typing import List, Any
+from typing import List, Any, Optional, Dict
 
 from railib import api
 
 from workflow.constants import ACCOUNT_PARAM, CONTAINER_PARAM, DATA_PATH_PARAM, AZURE_SAS, CONTAINER, CONTAINER_TYPE, \
     CONTAINER_NAME, USER_PARAM, PASSWORD_PARAM, SNOWFLAKE_ROLE, SNOWFLAKE_WAREHOUSE, DATABASE_PARAM, SCHEMA_PARAM, \
     FAIL_ON_MULTIPLE_WRITE_TXN_IN_FLIGHT, RAI_SDK_HTTP_RETRIES, RAI_PROFILE, RAI_PROFILE_PATH, \
-    SEMANTIC_SEARCH_BASE_URL, RAI_CLOUD_ACCOUNT
+    SEMANTIC_SEARCH_BASE_URL, RAI_CLOUD_ACCOUNT, POLLING, POLLING_OVERHEAD_RATE, POLLING_MIN_DELAY, \
+    POLLING_MAX_DELAY, POLLING_JITTER, POLLING_USE_HISTORY, HTTP, HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_BACKOFF_FACTOR
 
 
 class MetaEnum(EnumMeta):
@@ -71,6 +75,8 @@ class FileMetadata:
     path: str
     size: int = None
     as_of_date: str = ""
+    # identifies content of the file, changes when the file is rewritten
+    fingerprint: str = None
 
 
 @dataclasses.dataclass
@@ -145,10 +151,18 @@ class Source:
     offset_by_number_of_days: int
     snapshot_validity_days: int
     paths: List[str] = dataclasses.field(default_factory=list)
+    sizes: Dict[str, int] = dataclasses.field(default_factory=dict)
+    fingerprints: Dict[str, str] = dataclasses.field(default_factory=dict)
 
     def to_paths_csv(self) -> str:
         return "\n".join([f"{self.relation},{self.container.name},{p}" for p in self.paths])
 
+    def to_sizes_csv(self) -> str:
+        return "\n".join([f"{p},{self.sizes[p]}" for p in self.paths if p in self.sizes])
+
+    def to_fingerprints_csv(self) -> str:
+        return "\n".join([f"{p},{self.fingerprints[p]}" for p in self.paths if p in self.fingerprints])
+
     def to_chunk_partitioned_paths_csv(self) -> str:
         return "\n".join([f"{self.relation},{path},{self.is_chunk_partitioned}" for path in self.paths])
 
@@ -158,6 +172,9 @@ class Source:
     def to_container_type_csv(self) -> str:
         return f"{self.relation},{self.container.type.name}"
 
+    def to_partitioning_csv(self) -> str:
+        return f"{self.relation},{self.is_chunk_partitioned},{self.is_date_partitioned}"
+
     def is_size_supported(self) -> bool:
         return self.container.type == ContainerType.LOCAL or self.container.type == ContainerType.AZURE
 
@@ -169,6 +186,82 @@ class RaiConfig:
     database: str
 
 
+@dataclasses.dataclass
+class PollingPolicy:
+    """
+    Delay strategy for polling of RAI transactions and resources. The base delay is the time elapsed since the start
+    of the polled call multiplied by `overhead_rate`. If `use_history` is enabled, the first polls of a known query kind
+    are scheduled for the moment its previous transactions finished on average.
+    """
+    overhead_rate: float = 0.2
+    min_delay: float = 0.0
+    max_delay: float = 120  # 2 minutes
+    jitter: float = 0.0
+    use_history: bool = False
+    _durations: dict[str, float] = dataclasses.field(default_factory=dict, repr=False, compare=False)
+    _lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def next_delay(self, start_time: float, query_kind: str = None) -> float:
+        """
+        Calculate delay before the next poll.
+        :param start_time:  start time of the polled call
+        :param query_kind:  kind of the polled query, used to look up historical duration
+        :return: delay in seconds
+        """
+        elapsed = time.time() - start_time
+        delay = elapsed * self.overhead_rate
+        expected_duration = self.expected_duration(query_kind)
+        if expected_duration is not None and elapsed < expected_duration:
+            delay = expected_duration - elapsed
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def expected_duration(self, query_kind: str = None) -> Optional[float]:
+        if not (self.use_history and query_kind):
+            return None
+        with self._lock:
+            return self._durations.get(query_kind)
+
+    def record(self, query_kind: str, duration: float) -> None:
+        """
+        Record duration of a finished call. Historical duration is an exponential moving average.
+        :param query_kind:  kind of the polled query
+        :param duration:    duration in seconds
+        :return:
+        """
+        if not (self.use_history and query_kind):
+            return
+        with self._lock:
+            previous = self._durations.get(query_kind)
+            self._durations[query_kind] = duration if previous is None else 0.5 * previous + 0.5 * duration
+
+    @staticmethod
+    def from_env_vars(env_vars: dict[str, Any]):
+        return PollingPolicy(
+            overhead_rate=env_vars.get(POLLING_OVERHEAD_RATE, 0.2),
+            min_delay=env_vars.get(POLLING_MIN_DELAY, 0.0),
+            max_delay=env_vars.get(POLLING_MAX_DELAY, 120),
+            jitter=env_vars.get(POLLING_JITTER, 0.0),
+            use_history=env_vars.get(POLLING_USE_HISTORY, False)
+        )
+
+
+@dataclasses.dataclass
+class HttpConfig:
+    pool_size: int = 10
+    retries: int = 3
+    backoff_factor: float = 0.5
+
+    @staticmethod
+    def from_env_vars(env_vars: dict[str, Any]):
+        return HttpConfig(
+            pool_size=env_vars.get(HTTP_POOL_SIZE, 10),
+            retries=env_vars.get(HTTP_RETRIES, 3),
+            backoff_factor=env_vars.get(HTTP_BACKOFF_FACTOR, 0.5)
+        )
+
+
 @dataclasses.dataclass
 class EnvConfig:
     containers: dict[str, Container]
@@ -178,6 +271,8 @@ class EnvConfig:
     rai_profile_path: str = "~/.rai/config"
     semantic_search_base_url: str = ""
     rai_cloud_account: str = ""
+    polling_policy: PollingPolicy = dataclasses.field(default_factory=PollingPolicy)
+    http: HttpConfig = dataclasses.field(default_factory=HttpConfig)
 
     __EXTRACTORS = {
         ContainerType.AZURE: lambda env_vars: ConfigExtractor.azure_from_env_vars(env_vars),
@@ -206,7 +301,9 @@ class EnvConfig:
         return EnvConfig(containers, env_vars.get(FAIL_ON_MULTIPLE_WRITE_TXN_IN_FLIGHT, False),
                          env_vars.get(RAI_SDK_HTTP_RETRIES, 3), env_vars.get(RAI_PROFILE, "default"),
                          env_vars.get(RAI_PROFILE_PATH, "~/.rai/config"), env_vars.get(SEMANTIC_SEARCH_BASE_URL, ""),
-                         env_vars.get(RAI_CLOUD_ACCOUNT, ""))
+                         env_vars.get(RAI_CLOUD_ACCOUNT, ""),
+                         PollingPolicy.from_env_vars(env_vars.get(POLLING, {})),
+                         HttpConfig.from_env_vars(env_vars.get(HTTP, {})))
 
 
 @dataclasses.dataclass
@@ -18,6 +18,11 @@ COMMON_MODEL_RELATIVE_PATH = "/../rel"
 
 CONFIG_BASE_RELATION = "batch:config"
 
+STEP_STATE_QUERY_KIND = "step_state"
+LOAD_DATA_QUERY_KIND = "load_data"
+MATERIALIZE_QUERY_KIND = "materialize"
+EXPORT_QUERY_KIND = "export"
+
 DATE_FORMAT = "%Y%m%d"
 
 DATE_PREFIX = "data_dt="  # TODO use pattern?
@@ -37,6 +42,28 @@ MATERIALIZE = 'Materialize'
 EXPORT = 'Export'
 EXECUTE_COMMAND = 'ExecuteCommand'
 
+# Common models required by any workflow
+CORE_COMMON_MODEL = [
+    "batch_config/batch_config.rel",
+    "batch_config/workflow/workflow.rel",
+]
+SOURCE_COMMON_MODEL = [
+    "source_configs/config.rel",
+    "source_configs/data_reload.rel",
+    "batch_config/workflow/steps/configure_sources.rel",
+]
+# Common models required by step types, all common models are installed if a workflow has a step of unknown type
+STEP_TYPE_COMMON_MODEL = {
+    CONFIGURE_SOURCES: SOURCE_COMMON_MODEL,
+    INSTALL_MODELS: ["batch_config/workflow/steps/install_models.rel"],
+    LOAD_DATA: SOURCE_COMMON_MODEL + ["batch_config/workflow/steps/load_data.rel"],
+    INVOKE_SOLVER: ["batch_config/workflow/steps/invoke_solver.rel"],
+    MATERIALIZE: ["batch_config/workflow/steps/materialize.rel"],
+    EXPORT: SOURCE_COMMON_MODEL + ["batch_config/workflow/steps/export.rel"],
+    EXECUTE_COMMAND: ["batch_config/workflow/steps/execute_command.rel"],
+}
+INCREMENTAL_SNAPSHOTS_COMMON_MODEL = ["util/snapshot_diff.rel"]
+
 # RAI constants
 IMPORT_CONFIG_REL = "import_config"
 
@@ -45,6 +72,10 @@ RESOURCES_TO_DELETE_REL = "resources_data_to_delete_json"
 WORKFLOW_JSON_REL = "workflow_json"
 BATCH_CONFIG_REL = "batch:config"
 DECLARED_DATE_PARTITIONED_SOURCE_REL = "declared_date_partitioned_source:json"
+MODEL_HASH_REL = "rwm_model_hash"
+MODEL_SCOPE_REL = "rwm_model_scope"
+
+COMMON_MODEL_SCOPE = "rwm_common"
 
 FILE_LOAD_RELATION = {
     "CSV": "load_csv",
@@ -61,6 +92,18 @@ RAI_SDK_HTTP_RETRIES = "rai_sdk_http_retries"
 FAIL_ON_MULTIPLE_WRITE_TXN_IN_FLIGHT = "fail_on_multiple_write_txn_in_flight"
 SEMANTIC_SEARCH_BASE_URL = "sematic_search_base_url"
 RAI_CLOUD_ACCOUNT = "rai_cloud_account"
+POLLING = "polling"
+HTTP = "http"
+# Polling params
+POLLING_OVERHEAD_RATE = "overhead_rate"
+POLLING_MIN_DELAY = "min_delay"
+POLLING_MAX_DELAY = "max_delay"
+POLLING_JITTER = "jitter"
+POLLING_USE_HISTORY = "use_history"
+# HTTP params
+HTTP_POOL_SIZE = "pool_size"
+HTTP_RETRIES = "retries"
+HTTP_BACKOFF_FACTOR = "backoff_factor"
 # Generic container params
 ACCOUNT_PARAM = "account"
 USER_PARAM = "user"
@@ -80,8 +123,18 @@ START_DATE = "start_date"
 END_DATE = "end_date"
 FORCE_REIMPORT = "force_reimport"
 FORCE_REIMPORT_NOT_CHUNK_PARTITIONED = "force_reimport_not_chunk_partitioned"
+REIMPORT_CHANGED_ONLY = "reimport_changed_only"
+LISTING_CACHE_FILE = "listing_cache_file"
+LISTING_CACHE_TTL = "listing_cache_ttl"
+LISTING_CACHE_IMMUTABLE_DAYS = "listing_cache_immutable_days"
+PATHS_LIST_WORKERS = "paths_list_workers"
 COLLAPSE_PARTITIONS_ON_LOAD = "collapse_partitions_on_load"
 LOAD_DATA_JOINTLY = "load_data_jointly"
+LOAD_CONCURRENCY = "load_concurrency"
+LOAD_BATCH_MAX_BYTES = "load_batch_max_bytes"
+LOAD_BATCH_MAX_FILES = "load_batch_max_files"
+LOCAL_LOAD_MAX_BYTES = "local_load_max_bytes"
+LOCAL_READ_WORKERS = "local_read_workers"
 ENABLE_INCREMENTAL_SNAPSHOTS = "enable_incremental_snapshots"
 
 # Snowflake constants
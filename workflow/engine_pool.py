@@ -0,0 +1,125 @@
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+
+class EnginePool:
+    """
+    Pool of warm RAI engines persisted to a local JSON state file, so engines released by a run can be reused by
+    the next runs instead of creating a new engine. Idle engines expire after `ttl` seconds, at most `max_size` idle
+    engines are kept in the pool.
+    """
+    path: str
+    ttl: int
+    max_size: int
+
+    def __init__(self, path: str, ttl: int = 60 * 60, max_size: int = 3):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.__lock = threading.Lock()
+
+    def acquire(self, size: str) -> Optional[str]:
+        """
+        Take an idle not expired engine of given size from the pool.
+        :param size:    RAI engine size
+        :return: engine name or `None` if the pool doesn't have such engine
+        """
+        with self.__locked():
+            engines = self.__read()
+            now = time.time()
+            for name, engine in engines.items():
+                if engine["size"] == size and self.__is_idle(engine) and now - engine["last_used"] < self.ttl:
+                    engine["owner"] = os.getpid()
+                    engine["last_used"] = now
+                    self.__write(engines)
+                    return name
+            return None
+
+    def register(self, name: str, size: str) -> None:
+        """
+        Add a new engine to the pool as used by the current process.
+        :param name:    RAI engine name
+        :param size:    RAI engine size
+        :return:
+        """
+        with self.__locked():
+            engines = self.__read()
+            engines[name] = {"size": size, "owner": os.getpid(), "last_used": time.time()}
+            self.__write(engines)
+
+    def release(self, name: str) -> bool:
+        """
+        Return engine to the pool.
+        :param name:    RAI engine name
+        :return: `True` if the engine is kept in the pool, `False` if the pool is full and the engine should be deleted
+        """
+        with self.__locked():
+            engines = self.__read()
+            idle = [n for n, engine in engines.items() if n != name and self.__is_idle(engine)]
+            if name not in engines or len(idle) >= self.max_size:
+                engines.pop(name, None)
+                self.__write(engines)
+                return False
+            engines[name]["owner"] = None
+            engines[name]["last_used"] = time.time()
+            self.__write(engines)
+            return True
+
+    def evict_expired(self) -> List[str]:
+        """
+        Remove idle engines which exceeded TTL from the pool.
+        :return: names of evicted engines to delete
+        """
+        with self.__locked():
+            engines = self.__read()
+            now = time.time()
+            expired = [name for name, engine in engines.items()
+                       if self.__is_idle(engine) and now - engine["last_used"] >= self.ttl]
+            if expired:
+                for name in expired:
+                    del engines[name]
+                self.__write(engines)
+            return expired
+
+    @contextmanager
+    def __locked(self):
+        # the pool file is shared by concurrent runs, so read-modify-write is also serialized across processes
+        with self.__lock, open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def __is_idle(engine: dict) -> bool:
+        owner = engine.get("owner")
+        if owner is None:
+            return True
+        # the engine of a crashed run is considered idle
+        try:
+            os.kill(owner, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    def __read(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as fp:
+            return json.load(fp).get("engines", {})
+
+    def __write(self, engines: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                        prefix=f"{os.path.basename(self.path)}.", suffix=".tmp")
+        with os.fdopen(fd, "w") as fp:
+            json.dump({"engines": engines}, fp, indent=2)
+        os.replace(tmp_path, self.path)
@@ -33,6 +33,20 @@ class CommandExecutionException(Exception):
         super().__init__(f"Cli command:\n{command}\nfailed with exit status '{status}'")
 
 
+class DataLoadException(Exception):
+    """Exception raised when loading of some sources failed"""
+
+    def __init__(self, sources):
+        super().__init__(f"Failed to load sources: {sources}")
+
+
+class ResourceCleanupException(Exception):
+    """Exception raised when deletion of some RAI resources failed or timed out"""
+
+    def __init__(self, resources):
+        super().__init__(f"Failed to clean up resources: {resources}")
+
+
 class RestClientException(Exception):
     """Exception raised in case of errors in RestClient"""
 
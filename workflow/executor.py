@@ -1,14 +1,17 @@
 import asyncio
 import concurrent.futures
 import dataclasses
+import hashlib
 import logging
 import subprocess
+import threading
 import time
 from datetime import datetime
 from enum import Enum
+from functools import partial
 from itertools import groupby
 from types import MappingProxyType
-from typing import List
+from typing import List, Callable
 
 from more_itertools import peekable
 
@@ -16,10 +19,14 @@ from workflow import query as q, paths, rai, constants
 from workflow import snow
 from workflow.common import EnvConfig, RaiConfig, Source, BatchConfig, Export, FileType, ContainerType, Container, \
     FileMetadata
-from workflow.exception import StepTimeOutException, CommandExecutionException
+from workflow.exception import StepTimeOutException, CommandExecutionException, DataLoadException
+from workflow.listing_cache import ListingCache
 from workflow.manager import ResourceManager
+from workflow.query import QueryWithInputs
+from workflow.run_state import RunStateStore
 from workflow.utils import save_csv_output, format_duration, build_models, extract_date_range, build_relation_path, \
-    get_common_model_relative_path, get_or_create_eventloop
+    get_common_model_relative_path, get_common_models, get_or_create_eventloop, pack_by_budget, prefetch, is_gzip, \
+    get_data_size
 
 
 class WorkflowStepState(str, Enum):
@@ -38,6 +45,10 @@ class WorkflowConfig:
     selected_steps: List[str]
     step_params: dict
     step_timeout: dict[str, int] = None
+    max_parallel_steps: int = 1
+    step_state_flush_size: int = 1
+    run_state_file: str = None
+    engine_lookahead: int = 1
 
 
 class WorkflowStep:
@@ -47,6 +58,9 @@ class WorkflowStep:
     state: WorkflowStepState
     timing: int
     engine_size: str
+    depends_on: List[str]
+    run_state: RunStateStore
+    batch_config_name: str
 
     def __init__(self, idt: str, name: str, type_value: str, state: WorkflowStepState, timing: int, engine_size: str):
         self.idt = idt
@@ -55,6 +69,9 @@ class WorkflowStep:
         self.state = state
         self.timing = timing
         self.engine_size = engine_size
+        self.depends_on = None
+        self.run_state = None
+        self.batch_config_name = None
 
     def execute(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig):
         logger.info(f"Executing {self.get_name()} step...")
@@ -67,6 +84,22 @@ class WorkflowStep:
     def _execute(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig):
         raise NotImplementedError("This class is abstract")
 
+    def _get_model_scope(self) -> str:
+        """
+        Scope of models installed by the step. Batch configs sharing the database may have steps with the same name.
+        """
+        return f"{self.batch_config_name}:{self.name}"
+
+    def _is_unit_completed(self, unit: str) -> bool:
+        """
+        Check if a sub-unit of the step (e.g. materialized relation) was completed by the previous run.
+        """
+        return self.run_state is not None and unit in self.run_state.get_completed_units(self.idt)
+
+    def _complete_unit(self, unit: str) -> None:
+        if self.run_state is not None:
+            self.run_state.add_completed_unit(self.idt, unit)
+
 
 class WorkflowStepFactory:
 
@@ -79,7 +112,10 @@ class WorkflowStepFactory:
         timing = step.get("executionTime", 0)
 
         self._validate_params(config, step)
-        return self._get_step(logger, config, idt, name, type_value, state, timing, engine_size, step)
+        workflow_step = self._get_step(logger, config, idt, name, type_value, state, timing, engine_size, step)
+        workflow_step.depends_on = step.get("dependsOn")
+        workflow_step.batch_config_name = config.batch_config.name
+        return workflow_step
 
     def _get_step(self, logger: logging.Logger, config: WorkflowConfig, idt, name, type_value, state, timing,
                   engine_size, step: dict) -> WorkflowStep:
@@ -108,7 +144,8 @@ class InstallModelsStep(WorkflowStep):
         self.model_files = model_files
 
     def _execute(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig):
-        rai.install_models(logger, rai_config, env_config, build_models(self.model_files, self.rel_config_dir))
+        rai.install_models(logger, rai_config, env_config, build_models(self.model_files, self.rel_config_dir),
+                           self._get_model_scope())
 
 
 class InstallModelWorkflowStepFactory(WorkflowStepFactory):
@@ -132,10 +169,11 @@ class ConfigureSourcesWorkflowStep(WorkflowStep):
     force_reimport: bool
     force_reimport_not_chunk_partitioned: bool
     enable_incremental_snapshots: bool
+    reimport_changed_only: bool
 
     def __init__(self, idt, name, type_value, state, timing, engine_size, config_files, rel_config_dir, sources,
                  paths_builders, start_date, end_date, force_reimport, force_reimport_not_chunk_partitioned,
-                 enable_incremental_snapshots):
+                 enable_incremental_snapshots, reimport_changed_only=False):
         super().__init__(idt, name, type_value, state, timing, engine_size)
         self.config_files = config_files
         self.rel_config_dir = rel_config_dir
@@ -146,9 +184,11 @@ class ConfigureSourcesWorkflowStep(WorkflowStep):
         self.force_reimport = force_reimport
         self.force_reimport_not_chunk_partitioned = force_reimport_not_chunk_partitioned
         self.enable_incremental_snapshots = enable_incremental_snapshots
+        self.reimport_changed_only = reimport_changed_only
 
     def _execute(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig):
-        rai.install_models(logger, rai_config, env_config, build_models(self.config_files, self.rel_config_dir))
+        rai.install_models(logger, rai_config, env_config, build_models(self.config_files, self.rel_config_dir),
+                           self._get_model_scope())
 
         self._inflate_sources(logger, rai_config, env_config)
         # calculate expired sources
@@ -167,12 +207,12 @@ class ConfigureSourcesWorkflowStep(WorkflowStep):
         expired_sources = self._calculate_expired_sources(logger, declared_sources)
 
         # mark declared sources for reimport
-        rai.execute_query(logger, rai_config, env_config,
-                          q.discover_reimport_sources(self.sources, expired_sources, self.force_reimport,
-                                                      self.force_reimport_not_chunk_partitioned),
-                          readonly=False)
+        query_model = q.discover_reimport_sources(self.sources, expired_sources, self.force_reimport,
+                                                  self.force_reimport_not_chunk_partitioned, self.reimport_changed_only)
+        rai.execute_query(logger, rai_config, env_config, query_model.query, query_model.inputs, readonly=False)
         # populate declared sources
-        rai.execute_query(logger, rai_config, env_config, q.populate_source_configs(self.sources), readonly=False)
+        query_model = q.populate_source_configs(self.sources)
+        rai.execute_query(logger, rai_config, env_config, query_model.query, query_model.inputs, readonly=False)
 
     def _inflate_sources(self, logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig):
         for src in self.sources:
@@ -214,6 +254,8 @@ class ConfigureSourcesWorkflowStep(WorkflowStep):
                     inflated_paths.append(date_paths[0])
 
             src.paths = [p.path for p in inflated_paths]
+            src.sizes = {p.path: p.size for p in inflated_paths if p.size is not None}
+            src.fingerprints = {p.path: p.fingerprint for p in inflated_paths if p.fingerprint}
 
     def _get_date_range(self, logger, src):
         days = []
@@ -297,15 +339,26 @@ class ConfigureSourcesWorkflowStepFactory(WorkflowStepFactory):
         force_reimport_not_chunk_partitioned = config.step_params.get(constants.FORCE_REIMPORT_NOT_CHUNK_PARTITIONED,
                                                                       False)
         enable_incremental_snapshots = config.step_params[constants.ENABLE_INCREMENTAL_SNAPSHOTS]
+        reimport_changed_only = config.step_params.get(constants.REIMPORT_CHANGED_ONLY, False)
+        listing_cache_file = config.step_params.get(constants.LISTING_CACHE_FILE)
+        listing_cache = None
+        if listing_cache_file:
+            # forced reimport must see files rewritten in place, so cached listings are refreshed
+            listing_cache = ListingCache(listing_cache_file,
+                                         config.step_params.get(constants.LISTING_CACHE_TTL, 60 * 60),
+                                         config.step_params.get(constants.LISTING_CACHE_IMMUTABLE_DAYS, 2),
+                                         force_reimport or force_reimport_not_chunk_partitioned)
+        list_workers = config.step_params.get(constants.PATHS_LIST_WORKERS, 1)
         paths_builders = {}
         for src in sources:
             container = src.container
             if container.name not in paths_builders:
-                paths_builders[container.name] = paths.PathsBuilderFactory.get_path_builder(container)
+                paths_builders[container.name] = paths.PathsBuilderFactory.get_path_builder(container, listing_cache,
+                                                                                           list_workers)
         return ConfigureSourcesWorkflowStep(idt, name, type_value, state, timing, engine_size, step["configFiles"],
                                             rel_config_dir, sources, paths_builders, start_date, end_date,
                                             force_reimport, force_reimport_not_chunk_partitioned,
-                                            enable_incremental_snapshots)
+                                            enable_incremental_snapshots, reimport_changed_only)
 
     @staticmethod
     def _parse_sources(step: dict, env_config: EnvConfig) -> List[Source]:
@@ -343,13 +396,24 @@ class LoadDataWorkflowStep(WorkflowStep):
     collapse_partitions_on_load: bool
     load_jointly: bool
     enable_incremental_snapshots: bool
+    load_concurrency: int
+    load_batch_max_bytes: int
+    load_batch_max_files: int
+    local_load_max_bytes: int
+    local_read_workers: int
 
     def __init__(self, idt, name, type_value, state, timing, engine_size, collapse_partitions_on_load, load_jointly,
-                 enable_incremental_snapshots):
+                 enable_incremental_snapshots, load_concurrency=1, load_batch_max_bytes=None, load_batch_max_files=None,
+                 local_load_max_bytes=None, local_read_workers=1):
         super().__init__(idt, name, type_value, state, timing, engine_size)
         self.collapse_partitions_on_load = collapse_partitions_on_load
         self.load_jointly = load_jointly
         self.enable_incremental_snapshots = enable_incremental_snapshots
+        self.load_concurrency = load_concurrency
+        self.load_batch_max_bytes = load_batch_max_bytes
+        self.load_batch_max_files = load_batch_max_files
+        self.local_load_max_bytes = local_load_max_bytes
+        self.local_read_workers = local_read_workers
 
     def _execute(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig):
         rai.execute_query(logger, rai_config, env_config, q.DELETE_REFRESHED_SOURCES_DATA, readonly=False)
@@ -395,44 +459,106 @@ class LoadDataWorkflowStep(WorkflowStep):
 
     def _load_simple_resources(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig,
                                simple_resources) -> None:
-        # prepare queries for simple resources
-        query_batches = []
-        for src in simple_resources:
-            # now add all the items returned by _get_data_load_query` to the `query_batches` list
-            query_batches.extend(self._get_data_load_query(logger, env_config, src))
-
-        # execute queries for simple resources, if `load_jointly` is set to True then execute all queries in one txn
-        if self.load_jointly:
-            logger.info("Loading all CSV/JSON(L) sources jointly")
-            query = ""
-            inputs = {}
-            for query_with_input in query_batches:
-                query += query_with_input.query
-                inputs.update(query_with_input.inputs)
-            rai.execute_query(logger, rai_config, env_config, query, inputs, readonly=False)
-        else:
-            for query_with_input in query_batches:
-                rai.execute_query(logger, rai_config, env_config, query_with_input.query, query_with_input.inputs,
-                                  readonly=False)
+        # shards of local sources are read in parallel on `local_read_workers` threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.local_read_workers,
+                                                   thread_name_prefix=f"{self.name}-read") as read_executor:
+            # prepare queries for simple resources grouped by source, queries are built (and local files are read)
+            # lazily to keep memory bounded
+            query_batches = {}
+            for src in simple_resources:
+                # now add all the items returned by _get_data_load_query` to the `query_batches` of the source
+                query_batches[src["source"]] = self._get_data_load_query(logger, env_config, src, read_executor)
+
+            # execute queries for simple resources, if `load_jointly` is set to True then execute all queries in one
+            # txn
+            if self.load_jointly:
+                logger.info("Loading all CSV/JSON(L) sources jointly")
+                query = ""
+                inputs = {}
+                for source_queries in query_batches.values():
+                    for build_query in source_queries:
+                        query_with_input = build_query()
+                        query += query_with_input.query
+                        inputs.update(query_with_input.inputs)
+                rai.execute_query(logger, rai_config, env_config, query, inputs, readonly=False,
+                                  query_kind=constants.LOAD_DATA_QUERY_KIND)
+            elif self.load_concurrency > 1:
+                self._load_sources_concurrently(logger, env_config, rai_config, query_batches)
+            else:
+                # the next query is built while the current transaction is running
+                with concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                           thread_name_prefix=f"{self.name}-prefetch") as executor:
+                    builders = [build_query for source_queries in query_batches.values()
+                                for build_query in source_queries]
+                    for query_with_input in prefetch(builders, executor):
+                        rai.execute_query(logger, rai_config, env_config, query_with_input.query,
+                                          query_with_input.inputs, readonly=False,
+                                          query_kind=constants.LOAD_DATA_QUERY_KIND)
+
+    def _load_sources_concurrently(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig,
+                                   query_batches: dict[str, list]) -> None:
+        """
+        Load sources in parallel transactions from a single event loop, at most `load_concurrency` in flight. Failure
+        of a source doesn't abort loading of other sources, all failed sources are reported at the end.
+        """
+        logger.info(f"Loading {len(query_batches)} CSV/JSON(L) sources with concurrency {self.load_concurrency}")
+        if env_config.fail_on_multiple_write_txn_in_flight:
+            logger.warning("Concurrent loads submit multiple write transactions, "
+                           "`fail_on_multiple_write_txn_in_flight` check may fail")
+
+        async def load_source(semaphore: asyncio.Semaphore, source: str, source_queries: list):
+            async with semaphore:
+                for build_query in source_queries:
+                    # local files are read off the event loop thread
+                    query_with_input = await asyncio.get_running_loop().run_in_executor(None, build_query)
+                    await rai.execute_query_async(logger, rai_config, env_config, query_with_input.query,
+                                                  query_with_input.inputs, readonly=False,
+                                                  query_kind=constants.LOAD_DATA_QUERY_KIND)
+                logger.info(f"Source '{source}' loaded")
+
+        async def load_sources():
+            semaphore = asyncio.Semaphore(self.load_concurrency)
+            return await asyncio.gather(*[load_source(semaphore, source, source_queries)
+                                          for source, source_queries in query_batches.items()],
+                                        return_exceptions=True)
 
-    def _get_data_load_query(self, logger: logging.Logger, env_config: EnvConfig, src) -> list:
+        loop = get_or_create_eventloop()
+        results = loop.run_until_complete(load_sources())
+        failed_sources = []
+        for source, result in zip(query_batches.keys(), results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to load source '{source}': {result}")
+                failed_sources.append(source)
+        if failed_sources:
+            raise DataLoadException(failed_sources)
+
+    def _get_data_load_query(self, logger: logging.Logger, env_config: EnvConfig, src,
+                             read_executor: concurrent.futures.Executor = None) -> list:
         try:
             container = env_config.get_container(src["container"])
             config = EnvConfig.get_config(container)
+            # queries are built lazily when the step loads data, so unsupported sources are detected upfront
+            file_type, container_type = q.get_load_source_types(src)
+            logger.debug(f"Source '{src['source']}' is loaded as {file_type.name} from {container_type.name} container")
             if 'is_date_partitioned' in src and src['is_date_partitioned'] == 'Y':
-                return self._get_date_part_load_query(logger, config, src)
+                return self._get_date_part_load_query(logger, config, src, read_executor)
             else:
-                return self._get_simple_src_load_query(logger, config, src)
+                return self._get_simple_src_load_query(logger, config, src, read_executor)
         except KeyError as e:
             logger.error(f"Unsupported file type: {src['file_type']}. Skip the source: {src}", e)
         except ValueError as e:
             logger.error(f"Unsupported source type. Skip the source: {src}", e)
         return []  # return empty list if source is not supported
 
-    def _get_date_part_load_query(self, logger: logging.Logger, config, src):
+    def _get_date_part_load_query(self, logger: logging.Logger, config, src,
+                                  read_executor: concurrent.futures.Executor = None):
         source_name = src["source"]
         logger.info(f"Loading source '{source_name}' partitioned by date")
-        if self.collapse_partitions_on_load:
+        if self._is_load_batch_budgeted():
+            resources = [res for d in src["dates"] for res in d["resources"]]
+            return self._get_load_queries(logger, config, src, self._pack_by_load_budget(logger, src, resources),
+                                          read_executor)
+        elif self.collapse_partitions_on_load:
             srcs = src["dates"]
             first_date = srcs[0]["date"]
             last_date = srcs[-1]["date"]
@@ -443,30 +569,69 @@ class LoadDataWorkflowStep(WorkflowStep):
             resources = []
             for d in srcs:
                 resources += d["resources"]
-            return [q.load_resources(logger, config, resources, src, self.enable_incremental_snapshots)]
+            return self._get_load_queries(logger, config, src, [resources], read_executor)
         else:
             logger.info(f"Loading '{source_name}' one date partition at a time")
-            batch = []
+            batches = []
             for d in src["dates"]:
                 logger.info(f"Loading partition for date {d['date']}")
 
                 for res in d["resources"]:
-                    batch.append(
-                        q.load_resources(logger, config, [res], src, self.enable_incremental_snapshots))
-            return batch
+                    batches.append([res])
+            return self._get_load_queries(logger, config, src, batches, read_executor)
 
-    def _get_simple_src_load_query(self, logger: logging.Logger, config, src):
+    def _get_simple_src_load_query(self, logger: logging.Logger, config, src,
+                                   read_executor: concurrent.futures.Executor = None):
         source_name = src["source"]
         logger.info(f"Loading source '{source_name}' not partitioned by date")
-        if self.collapse_partitions_on_load:
+        if self._is_load_batch_budgeted():
+            return self._get_load_queries(logger, config, src,
+                                          self._pack_by_load_budget(logger, src, src["resources"]), read_executor)
+        elif self.collapse_partitions_on_load:
             logger.info(f"Loading '{source_name}' all chunk partitions simultaneously")
-            return [q.load_resources(logger, config, src["resources"], src, self.enable_incremental_snapshots)]
+            return self._get_load_queries(logger, config, src, [src["resources"]], read_executor)
         else:
             logger.info(f"Loading '{source_name}' one chunk partition at a time")
-            batch = []
-            for res in src["resources"]:
-                batch.append(q.load_resources(logger, config, [res], src, self.enable_incremental_snapshots))
-            return batch
+            return self._get_load_queries(logger, config, src, [[res] for res in src["resources"]], read_executor)
+
+    def _is_load_batch_budgeted(self) -> bool:
+        return self.load_batch_max_bytes is not None or self.load_batch_max_files is not None
+
+    def _pack_by_load_budget(self, logger: logging.Logger, src, resources) -> List[list]:
+        """
+        Pack resources of the source into transactions up to the byte and file budgets. Resources without known size
+        count only against the file budget.
+        """
+        batches = pack_by_budget(resources, lambda res: res.get("size", 0), self.load_batch_max_bytes,
+                                 self.load_batch_max_files)
+        logger.info(f"Loading '{src['source']}' {len(resources)} partitions in {len(batches)} transactions")
+        return batches
+
+    def _get_load_queries(self, logger: logging.Logger, config, src, batches: List[list],
+                          read_executor: concurrent.futures.Executor = None) -> List[Callable[[], QueryWithInputs]]:
+        """
+        Get builders of load queries for batches of resources, one transaction per batch. Batches of local multi-part
+        sources are split further so that the files read into query inputs of a transaction don't exceed
+        `local_load_max_bytes`, except for snapshot sources which have to be diffed in one transaction.
+        """
+        if self.local_load_max_bytes and ContainerType.LOCAL == ContainerType.from_source(src) and \
+                src.get("is_multi_part") == "Y" and \
+                not (self.enable_incremental_snapshots and src.get("is_snapshot", False)):
+            bounded_batches = []
+            for batch in batches:
+                bounded_batches += pack_by_budget(batch, self._local_resource_size, self.local_load_max_bytes)
+            if len(bounded_batches) > len(batches):
+                logger.info(f"Loading '{src['source']}' local files in {len(bounded_batches)} transactions to keep "
+                            f"query inputs within {self.local_load_max_bytes} bytes")
+            batches = bounded_batches
+        return [partial(q.load_resources, logger, config, batch, src, self.enable_incremental_snapshots, read_executor)
+                for batch in batches]
+
+    @staticmethod
+    def _local_resource_size(res) -> int:
+        if res.get("size") is not None and not is_gzip(res["uri"]):
+            return res["size"]
+        return get_data_size(res["uri"])
 
     @staticmethod
     def _resource_is_async(src):
@@ -490,8 +655,14 @@ class LoadDataWorkflowStepFactory(WorkflowStepFactory):
         collapse_partitions_on_load = config.step_params[constants.COLLAPSE_PARTITIONS_ON_LOAD]
         load_jointly = config.step_params[constants.LOAD_DATA_JOINTLY]
         enable_incremental_snapshots = config.step_params[constants.ENABLE_INCREMENTAL_SNAPSHOTS]
+        load_concurrency = config.step_params.get(constants.LOAD_CONCURRENCY, 1)
+        load_batch_max_bytes = config.step_params.get(constants.LOAD_BATCH_MAX_BYTES)
+        load_batch_max_files = config.step_params.get(constants.LOAD_BATCH_MAX_FILES)
+        local_load_max_bytes = config.step_params.get(constants.LOCAL_LOAD_MAX_BYTES)
+        local_read_workers = config.step_params.get(constants.LOCAL_READ_WORKERS, 1)
         return LoadDataWorkflowStep(idt, name, type_value, state, timing, engine_size, collapse_partitions_on_load,
-                                    load_jointly, enable_incremental_snapshots)
+                                    load_jointly, enable_incremental_snapshots, load_concurrency, load_batch_max_bytes,
+                                    load_batch_max_files, local_load_max_bytes, local_read_workers)
 
 
 class MaterializeWorkflowStep(WorkflowStep):
@@ -505,10 +676,16 @@ class MaterializeWorkflowStep(WorkflowStep):
 
     def _execute(self, logger: logging.Logger, env_config: EnvConfig, rai_config: RaiConfig):
         if self.materialize_jointly:
-            rai.execute_query(logger, rai_config, env_config, q.materialize(self.relations), readonly=False)
+            rai.execute_query(logger, rai_config, env_config, q.materialize(self.relations), readonly=False,
+                              query_kind=constants.MATERIALIZE_QUERY_KIND)
         else:
             for relation in self.relations:
-                rai.execute_query(logger, rai_config, env_config, q.materialize([relation]), readonly=False)
+                if self._is_unit_completed(relation):
+                    logger.info(f"Recovery... Skipping the materialized relation {relation}")
+                    continue
+                rai.execute_query(logger, rai_config, env_config, q.materialize([relation]), readonly=False,
+                                  query_kind=constants.MATERIALIZE_QUERY_KIND)
+                self._complete_unit(relation)
 
 
 class MaterializeWorkflowStepFactory(WorkflowStepFactory):
@@ -528,12 +705,14 @@ class ExportWorkflowStep(WorkflowStep):
     EXPORT_FUNCTION = {
         ContainerType.LOCAL:
             lambda logger, rai_config, env_config, exports, end_date, date_format, container: save_csv_output(
-                rai.execute_query_csv(logger, rai_config, env_config, q.export_relations_local(logger, exports)),
+                rai.execute_query_csv(logger, rai_config, env_config, q.export_relations_local(logger, exports),
+                                      query_kind=constants.EXPORT_QUERY_KIND),
                 EnvConfig.get_config(container)),
         ContainerType.AZURE:
             lambda logger, rai_config, env_config, exports, end_date, date_format, container: rai.execute_query(
                 logger, rai_config, env_config,
-                q.export_relations_to_azure(logger, EnvConfig.get_config(container), exports, end_date, date_format))
+                q.export_relations_to_azure(logger, EnvConfig.get_config(container), exports, end_date, date_format),
+                query_kind=constants.EXPORT_QUERY_KIND)
     }
 
     def __init__(self, idt, name, type_value, state, timing, engine_size, exports, export_jointly, date_format,
@@ -557,9 +736,13 @@ class ExportWorkflowStep(WorkflowStep):
                                                                   self.end_date, self.date_format, container)
         else:
             for export in exports:
+                if self._is_unit_completed(export.relation):
+                    logger.info(f"Recovery... Skipping the exported relation {export.relation}")
+                    continue
                 container = export.container
                 ExportWorkflowStep.get_export_function(container)(logger, rai_config, env_config, [export],
                                                                   self.end_date, self.date_format, container)
+                self._complete_unit(export.relation)
 
     @staticmethod
     def get_export_function(container: Container):
@@ -664,23 +847,134 @@ DEFAULT_FACTORIES = MappingProxyType(
 )
 
 
+class StepStateJournal:
+    """
+    Journal of workflow step state transitions. Transitions are buffered locally and written to RAI in a single write
+    transaction once `flush_size` transitions are recorded. Only the latest state of a step is written since only
+    the final state matters for recovery.
+    """
+    logger: logging.Logger
+    env_config: EnvConfig
+    flush_size: int
+
+    run_state: RunStateStore
+
+    def __init__(self, logger: logging.Logger, env_config: EnvConfig, flush_size: int = 1,
+                 run_state: RunStateStore = None):
+        self.logger = logger
+        self.env_config = env_config
+        self.flush_size = flush_size
+        self.run_state = run_state
+        self.__states = {}
+        self.__execution_times = {}
+        self.__recorded = 0
+        # steps can be executed in parallel, flushes must not interleave to keep transitions order
+        self.__lock = threading.Lock()
+
+    def record(self, rai_config: RaiConfig, step: WorkflowStep, state: WorkflowStepState,
+               execution_time: float = None, flush: bool = False) -> None:
+        """
+        Record step state transition.
+        :param rai_config:      RAI config used for flush
+        :param step:            workflow step
+        :param state:           new step state
+        :param execution_time:  step execution time
+        :param flush:           flush the journal regardless of the number of buffered transitions
+        :return:
+        """
+        with self.__lock:
+            if self.run_state is not None:
+                self.run_state.update_step(step.idt, state.name, execution_time)
+            self.__states[step.idt] = state
+            if execution_time is not None:
+                self.__execution_times[step.idt] = execution_time
+            self.__recorded += 1
+            if flush or self.__recorded >= self.flush_size:
+                self.__flush(rai_config)
+
+    def resync(self, steps: List[WorkflowStep]) -> None:
+        """
+        Buffer states of successful steps, so they are written to RAI with the next flush. Used when step states
+        were restored from the local run state, which can be ahead of RAI.
+        :param steps:   workflow steps
+        :return:
+        """
+        with self.__lock:
+            for step in steps:
+                if step.state == WorkflowStepState.SUCCESS:
+                    self.__states[step.idt] = step.state
+                    self.__execution_times[step.idt] = step.timing
+
+    def flush(self, rai_config: RaiConfig) -> None:
+        """
+        Write all buffered transitions to RAI.
+        :param rai_config:  RAI config
+        :return:
+        """
+        with self.__lock:
+            self.__flush(rai_config)
+
+    def __flush(self, rai_config: RaiConfig) -> None:
+        if not self.__states:
+            return
+        queries = [q.update_step_state(idt, state.name) for idt, state in self.__states.items()]
+        queries += [q.update_execution_time(idt, execution_time) for idt, execution_time in
+                    self.__execution_times.items()]
+        self.logger.info(f"Flush {len(self.__states)} step state(s) to RAI")
+        # failures of intermediate state updates aren't critical for recovery
+        ignore_problems = WorkflowStepState.SUCCESS not in self.__states.values()
+        rai.execute_query(self.logger, rai_config, self.env_config, "\n".join(queries), readonly=False,
+                          ignore_problems=ignore_problems, query_kind=constants.STEP_STATE_QUERY_KIND)
+        self.__states.clear()
+        self.__execution_times.clear()
+        self.__recorded = 0
+
+
 class WorkflowExecutor:
     logger: logging.Logger
     config: WorkflowConfig
     resource_manager: ResourceManager
     steps: List[WorkflowStep]
+    journal: StepStateJournal
+    provisioned_steps: set[str]
 
-    def __init__(self, logger: logging.Logger, config: WorkflowConfig, resource_manager: ResourceManager, steps):
+    def __init__(self, logger: logging.Logger, config: WorkflowConfig, resource_manager: ResourceManager, steps,
+                 run_state: RunStateStore = None):
         self.logger = logger
         self.config = config
         self.resource_manager = resource_manager
         self.steps = steps
+        self.journal = StepStateJournal(logger, config.env, config.step_state_flush_size, run_state)
+        self.provisioned_steps = set()
+        for step in steps:
+            step.run_state = run_state
 
     def run(self):
-        recover_step_reached = False
+        steps = self._get_steps_to_run()
         rai_config = self.resource_manager.get_rai_config()
-        steps_iter = peekable(self.steps)
-        for step in steps_iter:
+        try:
+            if self.config.max_parallel_steps > 1:
+                self._run_in_parallel(steps)
+            else:
+                self._run_sequentially(steps)
+        except StepTimeOutException as e:
+            # Skip step state flush since write txn can be stuck and RWM will raise ConcurrentWriteAttemptException
+            self._release_provisioned_engines()
+            raise e
+        except Exception as e:
+            self._release_provisioned_engines()
+            # persist states of steps finished before the failure to skip them on recovery
+            try:
+                self.journal.flush(rai_config)
+            except Exception as flush_error:
+                self.logger.error(f"Failed to flush step states: {flush_error}")
+            raise e
+        self.journal.flush(rai_config)
+
+    def _get_steps_to_run(self) -> List[WorkflowStep]:
+        steps = []
+        recover_step_reached = False
+        for step in self.steps:
             if self.config.selected_steps:
                 if step.name not in self.config.selected_steps:
                     self.logger.info(f"Step {step.name} (id='{step.idt}') is not selected. Skipping...")
@@ -697,42 +991,148 @@ class WorkflowExecutor:
                 elif self.config.recover and step.state == WorkflowStepState.SUCCESS:
                     self.logger.info(f"Recovery... Skipping the successful step {step.name} (id='{step.idt}')")
                     continue
+            steps.append(step)
+        return steps
 
-            start_time = time.time()
-            self._update_step_state(step, rai_config, WorkflowStepState.IN_PROGRESS)
+    def _run_sequentially(self, steps: List[WorkflowStep]) -> None:
+        rai_config = self.resource_manager.get_rai_config()
+        lookahead = self.config.engine_lookahead
+        steps_iter = peekable(steps)
+        for step in steps_iter:
+            # keep the engine if one of the upcoming steps needs it, at least the next step is considered
+            upcoming_steps = steps_iter[:max(lookahead, 1)]
+            self._provision_engines([step] + upcoming_steps[:lookahead])
+            self._run_step(step, rai_config, lambda failed: failed or all(
+                s.engine_size != step.engine_size for s in upcoming_steps))
+
+    def _run_in_parallel(self, steps: List[WorkflowStep]) -> None:
+        """
+        Run steps as a DAG: a step is started as soon as all its dependencies are finished. Steps without `dependsOn`
+        wait for all preceding steps. Dependencies on skipped steps are considered satisfied.
+        """
+        rai_config = self.resource_manager.get_rai_config()
+        limit = self.config.max_parallel_steps
+        dependencies = self._resolve_dependencies(steps)
+        pending = list(steps)
+        finished = set()
+        # steps which haven't finished yet, used to decide if an engine of given size is still needed
+        unfinished = {step.name: step for step in steps}
+        lock = threading.Lock()
+        futures = {}
+        error = None
+
+        def release_engine(step: WorkflowStep) -> bool:
+            with lock:
+                unfinished.pop(step.name, None)
+                return all(s.engine_size != step.engine_size for s in unfinished.values())
+
+        self.logger.info(f"Running {len(steps)} steps with up to {limit} steps in parallel")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=limit) as executor:
+            while pending or futures:
+                if error is None:
+                    for step in [s for s in pending if dependencies[s.name] <= finished]:
+                        if len(futures) >= limit:
+                            break
+                        pending.remove(step)
+                        futures[executor.submit(self._run_step, step, rai_config,
+                                                lambda failed, s=step: release_engine(s))] = step
+                    self._provision_engines(pending[:self.config.engine_lookahead])
+                if not futures:
+                    break
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    step = futures.pop(future)
+                    try:
+                        future.result()
+                        finished.add(step.name)
+                    except Exception as e:
+                        self.logger.error(f"{step.get_name()} failed. Waiting for running steps to finish...")
+                        if error is None:
+                            error = e
+        if error is not None:
+            for step in pending:
+                self.logger.info(f"Step {step.name} (id='{step.idt}') wasn't started due to failure")
+            raise error
+        if pending:
+            raise ValueError(f"Can't resolve dependencies for steps: {[step.name for step in pending]}")
+
+    def _provision_engines(self, steps: List[WorkflowStep]) -> None:
+        """
+        Start provisioning of step engines in background, so a step waits only for its own engine readiness.
+        :param steps:   steps to provision engines for
+        :return:
+        """
+        for step in steps:
+            if step.engine_size and step.name not in self.provisioned_steps:
+                self.provisioned_steps.add(step.name)
+                self.resource_manager.add_engine_async(step.engine_size)
+
+    def _release_provisioned_engines(self) -> None:
+        """
+        Remove engines provisioned ahead for steps which weren't executed.
+        """
+        sizes = {step.engine_size for step in self.steps if step.name in self.provisioned_steps}
+        for size in sizes:
             try:
-                if step.engine_size:
-                    self.resource_manager.add_engine(step.engine_size)
-                    self.execute_step(step, self.resource_manager.get_rai_config(step.engine_size))
-                    next_step = steps_iter.peek(None)
-                    if next_step and next_step.engine_size != step.engine_size:
-                        self.resource_manager.remove_engine(step.engine_size)
-                else:
-                    self.execute_step(step, rai_config)
-
-                end_time = time.time()
-                execution_time = end_time - start_time
-                query = "\n".join([q.update_step_state(step.idt, WorkflowStepState.SUCCESS.name),
-                                   q.update_execution_time(step.idt, execution_time)])
-                self.logger.info(f"Update {step.get_name()}'s timings and state to '{WorkflowStepState.SUCCESS.name}'")
-                rai.execute_query(self.logger, rai_config, self.config.env, query, readonly=False)
-            except StepTimeOutException as e:
-                # Skip step state update since write txn can be stuck and RWM will raise ConcurrentWriteAttemptException
-                if step.engine_size:
-                    self.resource_manager.remove_engine(step.engine_size)
-                raise e
+                self.resource_manager.remove_engine(size)
             except Exception as e:
-                self._update_step_state(step, rai_config, WorkflowStepState.FAILED)
-                if step.engine_size:
-                    self.resource_manager.remove_engine(step.engine_size)
-                raise e
-
-            self.logger.info(f"{step.get_name()} finished in {format_duration(execution_time)}")
+                self.logger.error(f"Failed to remove `{size}` engine: {e}")
 
-    def _update_step_state(self, step: WorkflowStep, rai_config: RaiConfig, state: WorkflowStepState) -> None:
-        self.logger.info(f"Update {step.get_name()}'s state to '{state.name}'")
-        rai.execute_query(self.logger, rai_config, self.config.env, q.update_step_state(step.idt, state.name),
-                          readonly=False, ignore_problems=True)
+    @staticmethod
+    def _resolve_dependencies(steps: List[WorkflowStep]) -> dict[str, set[str]]:
+        names = {step.name for step in steps}
+        dependencies = {}
+        preceding = set()
+        for step in steps:
+            if step.depends_on is None:
+                dependencies[step.name] = set(preceding)
+            else:
+                dependencies[step.name] = {name for name in step.depends_on if name in names}
+            preceding.add(step.name)
+        return dependencies
+
+    def _run_step(self, step: WorkflowStep, rai_config: RaiConfig, release_engine: Callable[[bool], bool]) -> None:
+        """
+        Execute step and update its state.
+        :param step:            workflow step
+        :param rai_config:      RAI config
+        :param release_engine:  callback to decide if the step engine should be removed. Accepts `failed` flag
+        :return:
+        """
+        start_time = time.time()
+        if step.run_state is not None and not self.config.recover:
+            # only `--recover` continues the step from its completed sub-units
+            step.run_state.clear_completed_units(step.idt)
+        self.logger.info(f"Update {step.get_name()}'s state to '{WorkflowStepState.IN_PROGRESS.name}'")
+        self.journal.record(rai_config, step, WorkflowStepState.IN_PROGRESS)
+        try:
+            if step.engine_size:
+                self.resource_manager.add_engine(step.engine_size)
+                self.execute_step(step, self.resource_manager.get_rai_config(step.engine_size))
+                if release_engine(False):
+                    self.resource_manager.remove_engine(step.engine_size)
+            else:
+                self.execute_step(step, rai_config)
+
+            end_time = time.time()
+            execution_time = end_time - start_time
+            self.logger.info(f"Update {step.get_name()}'s timings and state to '{WorkflowStepState.SUCCESS.name}'")
+            # a timed out step skips state flush, so successful steps are persisted right away if timeouts are set
+            self.journal.record(rai_config, step, WorkflowStepState.SUCCESS, execution_time,
+                                flush=bool(self.config.step_timeout))
+        except StepTimeOutException as e:
+            # Skip step state update since write txn can be stuck and RWM will raise ConcurrentWriteAttemptException
+            if step.engine_size and release_engine(True):
+                self.resource_manager.remove_engine(step.engine_size)
+            raise e
+        except Exception as e:
+            self.logger.info(f"Update {step.get_name()}'s state to '{WorkflowStepState.FAILED.name}'")
+            self.journal.record(rai_config, step, WorkflowStepState.FAILED, flush=True)
+            if step.engine_size and release_engine(True):
+                self.resource_manager.remove_engine(step.engine_size)
+            raise e
+
+        self.logger.info(f"{step.get_name()} finished in {format_duration(execution_time)}")
 
     def print_timings(self) -> None:
         rai_config = self.resource_manager.get_rai_config()
@@ -771,13 +1171,30 @@ class WorkflowExecutor:
              models: dict[str, str] = MappingProxyType({})):
         logger = logger.getChild("workflow")
         rai_config = resource_manager.get_rai_config()
+        extended_factories = {**DEFAULT_FACTORIES, **factories}
+        run_state = RunStateStore(config.run_state_file) if config.run_state_file else None
+        config_hash = hashlib.sha256(config.batch_config.content.encode()).hexdigest()
+
+        if run_state and (config.recover or config.recover_step):
+            steps_json = run_state.load_steps(config.batch_config.name, config_hash)
+            if steps_json:
+                logger.info(f"Recovery... Use run state from `{config.run_state_file}`")
+                steps = WorkflowExecutor._build_steps(logger, config, extended_factories, steps_json)
+                executor = WorkflowExecutor(logger, config, resource_manager, steps, run_state)
+                executor.journal.resync(steps)
+                return executor
+            logger.info(f"Run state from `{config.run_state_file}` doesn't match batch config. Use RAI state")
 
         if not config.recover and not config.recover_step:
             # Install common model for workflow manager
-            core_models = build_models(constants.COMMON_MODEL, get_common_model_relative_path(__file__))
+            common_models = get_common_models(config.batch_config.content,
+                                              config.step_params.get(constants.ENABLE_INCREMENTAL_SNAPSHOTS, False))
+            core_models = build_models(common_models, get_common_model_relative_path(__file__))
             extended_models = {**core_models, **models}
             logger.info("Installing RWM common models...")
-            rai.install_models(logger, rai_config, config.env, extended_models)
+            # batch configs sharing the database may use different common models
+            rai.install_models(logger, rai_config, config.env, extended_models,
+                               f"{constants.COMMON_MODEL_SCOPE}:{config.batch_config.name}")
 
         # Load batch config
         batch_config_relation = build_relation_path(constants.CONFIG_BASE_RELATION, config.batch_config.name)
@@ -792,18 +1209,25 @@ class WorkflowExecutor:
             rai.execute_query(logger, rai_config, config.env, q.init_workflow_steps(config.batch_config.name),
                               readonly=False)
 
-        extended_factories = {**DEFAULT_FACTORIES, **factories}
         workflow_info = rai.execute_relation_json(logger, rai_config, config.env,
                                                   build_relation_path(constants.WORKFLOW_JSON_REL,
                                                                       config.batch_config.name), ignore_problems=True)
         steps_json = workflow_info["steps"]
         if not steps_json:
             raise ValueError(f"Config `{config.batch_config.name}` doesn't have workflow steps")
+        if run_state:
+            run_state.reset(config.batch_config.name, config_hash, steps_json)
+        steps = WorkflowExecutor._build_steps(logger, config, extended_factories, steps_json)
+        return WorkflowExecutor(logger, config, resource_manager, steps, run_state)
+
+    @staticmethod
+    def _build_steps(logger: logging.Logger, config: WorkflowConfig, factories: dict[str, WorkflowStepFactory],
+                     steps_json: List[dict]) -> List[WorkflowStep]:
         steps = []
         for step in steps_json:
             step_type = step["type"]
-            if step_type not in extended_factories:
+            if step_type not in factories:
                 logger.warning(f"Step '{step_type}' is not supported")
             else:
-                steps.append(extended_factories.get(step_type).get_step(logger, config, step))
-        return WorkflowExecutor(logger, config, resource_manager, steps)
+                steps.append(factories.get(step_type).get_step(logger, config, step))
+        return steps
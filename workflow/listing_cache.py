@@ -0,0 +1,90 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from workflow.common import FileMetadata
+from workflow.constants import DATE_FORMAT
+
+
+class ListingCache:
+    """
+    Local SQLite cache of blob listings keyed by container and path prefix. Listings of immutable prefixes (date
+    partitions older than `immutable_after_days` days) never expire, other listings expire after `ttl` seconds. Cached
+    listings aren't read in `refresh` mode, fresh listings are saved to the cache.
+    """
+    path: str
+    ttl: int
+    immutable_after_days: int
+    refresh: bool
+
+    def __init__(self, path: str, ttl: int = 60 * 60, immutable_after_days: int = 2, refresh: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.immutable_after_days = immutable_after_days
+        self.refresh = refresh
+        # sources are listed from parallel steps, writes are serialized to avoid `database is locked` errors
+        self.__lock = threading.Lock()
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS listing (container TEXT, prefix TEXT, listed_at REAL, "
+                         "immutable INTEGER, files_json TEXT, PRIMARY KEY (container, prefix))")
+
+    def get(self, container: str, prefix: str) -> Optional[List[FileMetadata]]:
+        """
+        Get cached listing of the prefix.
+        :param container:   container URL
+        :param prefix:      path prefix
+        :return: files or `None` if the prefix isn't cached or its listing expired
+        """
+        if self.refresh:
+            return None
+        with closing(self.__connect()) as conn:
+            row = conn.execute("SELECT listed_at, immutable, files_json FROM listing WHERE container = ? AND "
+                               "prefix = ?", (container, prefix)).fetchone()
+        if row is None:
+            return None
+        listed_at, immutable, files_json = row
+        if not immutable and time.time() - listed_at >= self.ttl:
+            return None
+        return [FileMetadata(path, size, fingerprint=fingerprint) for path, size, fingerprint in json.loads(files_json)]
+
+    def put(self, container: str, prefix: str, files: List[FileMetadata], immutable: bool = False) -> None:
+        """
+        Save listing of the prefix.
+        :param container:   container URL
+        :param prefix:      path prefix
+        :param files:       listed files
+        :param immutable:   listing of the prefix never changes
+        :return:
+        """
+        files_json = json.dumps([[f.path, f.size, f.fingerprint] for f in files])
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO listing VALUES (?, ?, ?, ?, ?)",
+                         (container, prefix, time.time(), int(immutable), files_json))
+
+    def is_immutable_day(self, day: str) -> bool:
+        """
+        Check if listing of the date partition doesn't change anymore. Files may still land late or be rewritten within
+        `immutable_after_days` days.
+        :param day: date partition in `DATE_FORMAT`
+        :return: `True` if the day is older than `immutable_after_days` days (UTC)
+        """
+        return day < (datetime.utcnow() - timedelta(days=self.immutable_after_days)).strftime(DATE_FORMAT)
+
+    def invalidate(self, prefix: str = None) -> int:
+        """
+        Remove cached listings.
+        :param prefix:  remove only listings of prefixes starting with the prefix if it's given
+        :return: number of removed listings
+        """
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            if prefix:
+                return conn.execute("DELETE FROM listing WHERE substr(prefix, 1, ?) = ?",
+                                    (len(prefix), prefix)).rowcount
+            return conn.execute("DELETE FROM listing").rowcount
+
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
@@ -1,9 +1,15 @@
+import concurrent.futures
 import dataclasses
 import copy
+import threading
+import time
 import uuid
 import logging
+from typing import Callable
 
 from workflow.common import RaiConfig, EnvConfig
+from workflow.engine_pool import EnginePool
+from workflow.exception import ResourceCleanupException
 from workflow import query as q, rai
 
 
@@ -19,12 +25,21 @@ class ResourceManager:
     __rai_config: RaiConfig
     __env_config: EnvConfig
     __engines: dict[str, EngineMetaInfo]
+    __pending: dict[str, concurrent.futures.Future]
+    __lock: threading.RLock
+    __engine_pool: EnginePool
 
-    def __init__(self, logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig):
+    def __init__(self, logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig,
+                 engine_pool: EnginePool = None):
         self.__logger = logger
         self.__rai_config = rai_config
         self.__engines = {}
+        self.__pending = {}
         self.__env_config = env_config
+        self.__engine_pool = engine_pool
+        # steps can be executed in parallel, so engine management must be serialized
+        self.__lock = threading.RLock()
+        self.__provisioner = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="engine-provisioner")
 
     def get_rai_config(self, size: str = None) -> RaiConfig:
         config = copy.copy(self.__rai_config)
@@ -35,23 +50,25 @@ class ResourceManager:
                 self.__logger.debug(f"Can't find `{size}` engine in managed engines. Use default engine")
         return config
 
-    def cleanup_resources(self) -> None:
+    def cleanup_resources(self, timeout: int = 10 * 60) -> dict[str, str]:
         """
-        Delete RAI DB and engine from RAI Config and managed engines.
-        :return:
+        Delete RAI DB and engine from RAI Config and managed engines. Deletions are issued concurrently and awaited
+        with a single deadline, which also bounds waiting for pending engine provisions.
+        :param timeout: teardown timeout in seconds
+        :return: outcome per resource
         """
-        self.delete_database()
-        self.cleanup_engines()
+        deadline = time.time() + timeout
+        return self.__cleanup({f"database `{self.__rai_config.database}`": self.delete_database}, deadline)
 
-    def cleanup_engines(self) -> None:
+    def cleanup_engines(self, timeout: int = 10 * 60) -> dict[str, str]:
         """
-        Delete RAI engines from RAI Config and managed engines.
-        :return:
+        Delete RAI engines from RAI Config and managed engines. Deletions are issued concurrently and awaited with
+        a single deadline, which also bounds waiting for pending engine provisions.
+        :param timeout: teardown timeout in seconds
+        :return: outcome per resource
         """
-        for size in self.__engines:
-            config = self.get_rai_config(size)
-            if rai.engine_exist(self.__logger, config):
-                rai.delete_engine(self.__logger, config)
+        deadline = time.time() + timeout
+        return self.__cleanup({}, deadline)
 
     def create_database(self, delete_db: bool = False, disable_ivm: bool = False, source_db=None) -> None:
         """
@@ -83,22 +100,43 @@ class ResourceManager:
     def add_engine(self, size: str = "XS") -> None:
         """
         Create RAI engine of given size if it doesn't exist and add engine to managed engines.
-        The first engine in managed engines should be set as default.
+        The first engine in managed engines should be set as default. Waits for pending provision of the engine.
         :param size:    RAI engine size
         :return:
         """
-        self.__logger.info(f"Trying to add engine with `{size}` size to manager")
-        config = self.get_rai_config(size)
-        if self.__engines:
+        self.add_engine_async(size).result()
+
+    def add_engine_async(self, size: str = "XS") -> concurrent.futures.Future:
+        """
+        Start creation of RAI engine of given size in background and add engine to managed engines once it's created.
+        :param size:    RAI engine size
+        :return: future which is completed when the engine is ready
+        """
+        with self.__lock:
+            if size in self.__pending:
+                return self.__pending[size]
+            self.__logger.info(f"Trying to add engine with `{size}` size to manager")
+            config = self.get_rai_config(size)
             if size in self.__engines:
                 self.__logger.info(f"`{size}` already managed: `{self.__engines[size]}`. Ignore creation")
-            else:
-                config.engine = self.__generate_engine_name(size)
-                self.__create_engine(config, size)
-                self.__engines[size] = EngineMetaInfo(config.engine, size, False)
-        else:
+                future = concurrent.futures.Future()
+                future.set_result(None)
+                return future
+            is_default = not self.__engines and not self.__pending
+            if not is_default:
+                config.engine = self.__get_engine_name(size)
+            future = self.__provisioner.submit(self.__add_engine, config, size, is_default)
+            self.__pending[size] = future
+            return future
+
+    def __add_engine(self, config: RaiConfig, size: str, is_default: bool) -> None:
+        try:
             self.__create_engine(config, size)
-            self.__engines = {size: EngineMetaInfo(config.engine, size, True)}
+            with self.__lock:
+                self.__engines[size] = EngineMetaInfo(config.engine, size, is_default)
+        finally:
+            with self.__lock:
+                del self.__pending[size]
 
     def remove_engine(self, size: str = "XS") -> None:
         """
@@ -108,19 +146,23 @@ class ResourceManager:
         :param size:    RAI engine size
         :return:
         """
-        self.__logger.info(f"Trying to remove engine with `{size}` size from manager")
-        if size not in self.__engines:
-            self.__logger.info(f"`{size}` isn't managed. Ignore deletion")
-        else:
+        self.__await_pending(size)
+        with self.__lock:
+            self.__logger.info(f"Trying to remove engine with `{size}` size from manager")
+            if size not in self.__engines:
+                self.__logger.info(f"`{size}` isn't managed. Ignore deletion")
+                return
             if self.__engines[size].is_default:
                 self.__logger.warning(f"Can't remove default `{size}` engine from managed engines")
+                return
+            config = self.get_rai_config(size)
+            del self.__engines[size]
+        # engine deletion is slow, so other steps shouldn't wait for it to manage their engines
+        if not self.__release_to_pool(config.engine):
+            if rai.engine_exist(self.__logger, config):
+                rai.delete_engine(self.__logger, config, self.__env_config.polling_policy)
             else:
-                config = self.get_rai_config(size)
-                if rai.engine_exist(self.__logger, config):
-                    rai.delete_engine(self.__logger, config)
-                else:
-                    self.__logger.warning(f"Can't find `{config.engine}` engine. Ignore deletion")
-                del self.__engines[size]
+                self.__logger.warning(f"Can't find `{config.engine}` engine. Ignore deletion")
 
     def provision_engine(self, size: str) -> None:
         """
@@ -128,22 +170,103 @@ class ResourceManager:
         :param size:    RAI engine size
         :return:
         """
-        self.__logger.info(f"Trying to provision engine with `{size}` size and add to manager")
-        config = self.get_rai_config(size)
-        if self.__engines:
-            if size in self.__engines:
-                self.__logger.info(
-                    f"`{size}` already managed: `{self.__engines[size]}`. Provision engine {config.engine}")
+        self.__await_pending(size)
+        with self.__lock:
+            self.__logger.info(f"Trying to provision engine with `{size}` size and add to manager")
+            config = self.get_rai_config(size)
+            if self.__engines:
+                if size in self.__engines:
+                    self.__logger.info(
+                        f"`{size}` already managed: `{self.__engines[size]}`. Provision engine {config.engine}")
+                    self.__recreate_engine(config, size)
+                else:
+                    config.engine = self.__get_engine_name(size)
+                    self.__logger.info(f"Provision engine `{config.engine}`")
+                    self.__create_engine(config, size)
+                    self.__engines[size] = EngineMetaInfo(config.engine, size, False)
+            else:
+                self.__logger.info(f"Provision engine `{config.engine}` as default")
                 self.__recreate_engine(config, size)
+                self.__engines = {size: EngineMetaInfo(config.engine, size, True)}
+
+    def __engine_cleanup_tasks(self, deadline: float) -> dict[str, Callable[[], None]]:
+        with self.__lock:
+            engines = list(self.__engines.values())
+        tasks = {}
+        for engine in engines:
+            config = self.get_rai_config(engine.size)
+            if not engine.is_default and self.__release_to_pool(config.engine):
+                continue
+            tasks[f"engine `{config.engine}`"] = lambda c=config: self.__delete_engine(c, deadline)
+        if self.__engine_pool:
+            tasks["expired engines of engine pool"] = lambda: self.__delete_expired_pool_engines(deadline)
+        return tasks
+
+    def __delete_engine(self, config: RaiConfig, deadline: float) -> None:
+        if rai.engine_exist(self.__logger, config):
+            rai.delete_engine(self.__logger, config, self.__env_config.polling_policy,
+                              timeout=max(deadline - time.time(), 0))
+
+    def __cleanup(self, tasks: dict[str, Callable[[], None]], deadline: float) -> dict[str, str]:
+        """
+        Run resource deletions concurrently and wait for them until deadline. Managed engines are deleted once
+        pending engine provisions are resolved, provisions which are still pending at deadline are abandoned.
+        :param tasks:       deletion per resource besides managed engines
+        :param deadline:    deadline timestamp
+        :return: outcome per resource
+        """
+        executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="cleanup")
+        futures = {executor.submit(task): resource for resource, task in tasks.items()}
+        abandoned_sizes = self.__await_pending_provisions(deadline)
+        # pending provisions are resolved or abandoned by now and no engine is provisioned after cleanup
+        self.__provisioner.shutdown(wait=False, cancel_futures=True)
+        for resource, task in self.__engine_cleanup_tasks(deadline).items():
+            futures[executor.submit(task)] = resource
+        _, not_done = concurrent.futures.wait(futures, timeout=max(deadline - time.time(), 0))
+        executor.shutdown(wait=False)
+        outcomes = {f"pending `{size}` engine": "abandoned" for size in abandoned_sizes}
+        for future, resource in futures.items():
+            if future in not_done:
+                outcomes[resource] = "timed out"
+            elif future.exception():
+                outcomes[resource] = f"failed: {future.exception()}"
             else:
-                config.engine = self.__generate_engine_name(size)
-                self.__logger.info(f"Provision engine `{config.engine}`")
-                self.__create_engine(config, size)
-                self.__engines[size] = EngineMetaInfo(config.engine, size, False)
-        else:
-            self.__logger.info(f"Provision engine `{config.engine}` as default")
-            self.__recreate_engine(config, size)
-            self.__engines = {size: EngineMetaInfo(config.engine, size, True)}
+                outcomes[resource] = "deleted"
+        for resource, outcome in outcomes.items():
+            if outcome == "deleted":
+                self.__logger.info(f"Cleanup of {resource}: {outcome}")
+            else:
+                self.__logger.error(f"Cleanup of {resource}: {outcome}")
+        failed_resources = [resource for resource, outcome in outcomes.items() if outcome != "deleted"]
+        if failed_resources:
+            raise ResourceCleanupException(failed_resources)
+        return outcomes
+
+    def __await_pending_provisions(self, deadline: float) -> list[str]:
+        """
+        Wait for all pending engine provisions until deadline. Provision failure is ignored.
+        :param deadline:    deadline timestamp
+        :return: sizes of engines which are still provisioned at deadline
+        """
+        with self.__lock:
+            pending = dict(self.__pending)
+        if not pending:
+            return []
+        self.__logger.info(f"Waiting for pending provision of {list(pending)} engines")
+        _, not_done = concurrent.futures.wait(pending.values(), timeout=max(deadline - time.time(), 0))
+        return [size for size, future in pending.items() if future in not_done]
+
+    def __await_pending(self, size: str) -> None:
+        """
+        Wait for pending provision of the engine of given size. Provision failure is ignored.
+        :param size:    RAI engine size
+        :return:
+        """
+        with self.__lock:
+            future = self.__pending.get(size)
+        if future:
+            self.__logger.info(f"Waiting for pending provision of `{size}` engine")
+            concurrent.futures.wait([future])
 
     def __recreate_engine(self, config, size: str) -> None:
         """
@@ -153,7 +276,7 @@ class ResourceManager:
         :return:
         """
         if rai.engine_exist(self.__logger, config):
-            rai.delete_engine(self.__logger, config)
+            rai.delete_engine(self.__logger, config, self.__env_config.polling_policy)
         rai.create_engine(self.__logger, config, size)
 
     def __create_engine(self, config, size: str) -> None:
@@ -165,6 +288,50 @@ class ResourceManager:
         if not rai.engine_exist(self.__logger, config):
             rai.create_engine(self.__logger, config, size)
 
+    def __get_engine_name(self, size: str) -> str:
+        """
+        Get name of a non default engine. Take a warm engine from engine pool if it's possible.
+        :param size:    RAI engine size
+        :return:
+        """
+        if not self.__engine_pool:
+            return self.__generate_engine_name(size)
+        name = self.__engine_pool.acquire(size)
+        if name:
+            self.__logger.info(f"Reuse `{name}` engine from engine pool")
+        else:
+            name = self.__generate_engine_name(size)
+            self.__engine_pool.register(name, size)
+        return name
+
+    def __release_to_pool(self, engine: str) -> bool:
+        """
+        Return engine to engine pool.
+        :param engine:  RAI engine name
+        :return: `True` if engine is kept in the pool and shouldn't be deleted
+        """
+        if self.__engine_pool and self.__engine_pool.release(engine):
+            self.__logger.info(f"Return `{engine}` engine to engine pool")
+            return True
+        return False
+
+    def __delete_expired_pool_engines(self, deadline: float) -> None:
+        """
+        Delete engines which stayed idle in engine pool longer than pool TTL.
+        :param deadline:    deadline timestamp
+        :return:
+        """
+        for engine in self.__engine_pool.evict_expired():
+            config = copy.copy(self.__rai_config)
+            config.engine = engine
+            try:
+                if rai.engine_exist(self.__logger, config):
+                    self.__logger.info(f"Engine `{engine}` expired in engine pool")
+                    rai.delete_engine(self.__logger, config, self.__env_config.polling_policy,
+                                      timeout=max(deadline - time.time(), 0))
+            except Exception as e:
+                self.__logger.warning(f"Failed to delete expired `{engine}` engine: {e}")
+
     @staticmethod
     def __generate_engine_name(size: str) -> str:
         """
@@ -175,7 +342,7 @@ class ResourceManager:
         return f"wf-manager-{size}-{uuid.uuid4()}"
 
     @staticmethod
-    def init(logger: logging.Logger, engine, database, env_config: EnvConfig):
+    def init(logger: logging.Logger, engine, database, env_config: EnvConfig, engine_pool: EnginePool = None):
         logger = logger.getChild("workflow_resource_manager")
         rai_config = rai.get_config(engine, database, env_config)
-        return ResourceManager(logger, rai_config, env_config)
+        return ResourceManager(logger, rai_config, env_config, engine_pool)
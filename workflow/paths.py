@@ -1,11 +1,13 @@
-import glob
+import concurrent.futures
 import logging
 import os.path
-import pathlib
-from typing import List
+from functools import partial
+from itertools import repeat
+from typing import Dict, List, Optional
 
 from workflow import blob, constants
 from workflow.common import EnvConfig, AzureConfig, LocalConfig, SnowflakeConfig, Container, ContainerType, FileMetadata
+from workflow.listing_cache import ListingCache
 
 
 class PathsBuilder:
@@ -26,39 +28,75 @@ class PathsBuilder:
 
 class LocalPathsBuilder(PathsBuilder):
     config: LocalConfig
+    list_workers: int
 
-    def __init__(self, config):
+    def __init__(self, config, list_workers: int = 1):
         self.config = config
+        self.list_workers = list_workers
 
     def _build(self, logger: logging.Logger, days: List[str], relative_path, extensions: List[str],
                is_date_partitioned: bool) -> List[FileMetadata]:
         paths = []
         files_path = f"{self.config.data_path}/{relative_path}"
         if is_date_partitioned:
-            for day in days:
-                folder_path = f"{files_path}/{constants.DATE_PREFIX}{day}"
-                day_paths = [FileMetadata(os.path.abspath(path), os.path.getsize(path), day) for path in
-                             self._get_folder_paths(folder_path, extensions)]
-                paths.extend(day_paths)
+            folders = [f"{files_path}/{constants.DATE_PREFIX}{day}" for day in days]
+            if self.list_workers > 1 and len(days) > 1:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=self.list_workers,
+                                                           thread_name_prefix="local-list") as executor:
+                    day_paths = list(executor.map(self._scan_folder, repeat(logger), folders, repeat(extensions),
+                                                  days))
+            else:
+                day_paths = list(map(self._scan_folder, repeat(logger), folders, repeat(extensions), days))
+            for paths_of_day in day_paths:
+                paths.extend(paths_of_day)
         else:
-            paths = [FileMetadata(os.path.abspath(path), os.path.getsize(path)) for path in
-                     self._get_folder_paths(files_path, extensions)]
+            paths = self._scan_folder(logger, files_path, extensions)
         return paths
 
     @staticmethod
-    def _get_folder_paths(folder_path: str, extensions: List[str]):
+    def _scan_folder(logger: logging.Logger, folder_path: str, extensions: List[str],
+                     day: str = "") -> List[FileMetadata]:
+        """
+        List files of the folder with given extensions in a single pass over the folder entries.
+        :param logger:      logger
+        :param folder_path: folder to list
+        :param extensions:  file extensions to match
+        :param day:         date partition of the folder
+        :return: metadata of matched files
+        """
+        suffixes = tuple(f".{ext}" for ext in extensions)
+        try:
+            entries = os.scandir(folder_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return []
         paths = []
-        if pathlib.Path(folder_path).is_dir():
-            for ext in extensions:
-                paths.extend(glob.glob(f"{folder_path}/*.{ext}"))
+        with entries:
+            for entry in entries:
+                # hidden files are skipped the same way as `glob` does
+                if entry.name.startswith(".") or not entry.name.endswith(suffixes):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # a broken symlink or a file removed during the scan
+                    logger.warning(f"Skip file which can't be accessed: {entry.path}")
+                    continue
+                paths.append(FileMetadata(os.path.abspath(entry.path), stat.st_size, day,
+                                          f"{stat.st_size}-{stat.st_mtime_ns}"))
         return paths
 
 
 class AzurePathsBuilder(PathsBuilder):
+    # a month with at least this number of requested days is listed once under the common prefix of its partitions
+    MONTH_LISTING_MIN_DAYS = 8
     config: AzureConfig
+    listing_cache: ListingCache
+    list_workers: int
 
-    def __init__(self, config: AzureConfig):
+    def __init__(self, config: AzureConfig, listing_cache: ListingCache = None, list_workers: int = 1):
         self.config = config
+        self.listing_cache = listing_cache
+        self.list_workers = list_workers
 
     def _build(self, logger: logging.Logger, days: List[str], relative_path, extensions: List[str],
                is_date_partitioned: bool) -> List[FileMetadata]:
@@ -69,17 +107,80 @@ class AzurePathsBuilder(PathsBuilder):
 
         paths = []
         if is_date_partitioned:
+            day_paths = self._list_days(logger, files_path, days)
             for day in days:
                 logger.debug(f"Day from range: {day}")
-                day_paths = blob.list_files_in_containers(logger, self.config,
-                                                          f"{files_path}/{constants.DATE_PREFIX}{day}")
-                for path in day_paths:
+                for path in day_paths[day]:
                     path.as_of_date = day
-                paths += day_paths
+                paths += day_paths[day]
         else:
-            paths = blob.list_files_in_containers(logger, self.config, files_path)
+            paths = self._get_cached_listing(logger, files_path)
+            if paths is None:
+                paths = blob.list_files_in_containers(logger, self.config, files_path)
+                self._cache_listing(files_path, paths)
+        return paths
+
+    def _list_days(self, logger: logging.Logger, files_path: str, days: List[str]) -> Dict[str, List[FileMetadata]]:
+        day_paths = {}
+        months = {}
+        for day in days:
+            cached_paths = self._get_cached_listing(logger, self._get_day_prefix(files_path, day))
+            if cached_paths is None:
+                months.setdefault(day[:6], []).append(day)
+            else:
+                day_paths[day] = cached_paths
+        tasks = []
+        for month, month_days in months.items():
+            if len(month_days) >= self.MONTH_LISTING_MIN_DAYS:
+                tasks.append(partial(self._list_month, logger, files_path, month, month_days))
+            else:
+                tasks += [partial(self._list_day, logger, files_path, day) for day in month_days]
+        if tasks:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.list_workers,
+                                                       thread_name_prefix="blob-list") as executor:
+                listed_days = {}
+                for listed in executor.map(lambda task: task(), tasks):
+                    listed_days.update(listed)
+            for day, paths in listed_days.items():
+                self._cache_listing(self._get_day_prefix(files_path, day), paths, day)
+            day_paths.update(listed_days)
+        return day_paths
+
+    def _list_day(self, logger: logging.Logger, files_path: str, day: str) -> Dict[str, List[FileMetadata]]:
+        return {day: blob.list_files_in_containers(logger, self.config, self._get_day_prefix(files_path, day))}
+
+    def _list_month(self, logger: logging.Logger, files_path: str, month: str,
+                    days: List[str]) -> Dict[str, List[FileMetadata]]:
+        day_paths = {day: [] for day in days}
+        date_prefix = f"{files_path}/{constants.DATE_PREFIX}"
+        for path in blob.list_files_in_containers(logger, self.config, f"{date_prefix}{month}"):
+            day = path.path.split(date_prefix, 1)[1][:len(month) + 2]
+            # partitions of the month which aren't requested are skipped
+            if day in day_paths:
+                day_paths[day].append(path)
+        return day_paths
+
+    def _get_cached_listing(self, logger: logging.Logger, path_prefix: str) -> Optional[List[FileMetadata]]:
+        if self.listing_cache is None:
+            return None
+        paths = self.listing_cache.get(self._get_cache_container(), path_prefix)
+        if paths is not None:
+            logger.debug(f"Using cached listing of blob path prefix: {path_prefix}")
         return paths
 
+    def _cache_listing(self, path_prefix: str, paths: List[FileMetadata], day: str = None) -> None:
+        if self.listing_cache is not None:
+            # listings of old enough date partitions are cached without expiration
+            immutable = day is not None and self.listing_cache.is_immutable_day(day)
+            self.listing_cache.put(self._get_cache_container(), path_prefix, paths, immutable)
+
+    def _get_cache_container(self) -> str:
+        return f"{self.config.account}/{self.config.container}"
+
+    @staticmethod
+    def _get_day_prefix(files_path: str, day: str) -> str:
+        return f"{files_path}/{constants.DATE_PREFIX}{day}"
+
 
 class SnowflakePathsBuilder(PathsBuilder):
     config: SnowflakeConfig
@@ -94,11 +195,15 @@ class SnowflakePathsBuilder(PathsBuilder):
 
 class PathsBuilderFactory:
     __CONTAINER_TYPE_TO_BUILDER = {
-        ContainerType.LOCAL: lambda container: LocalPathsBuilder(EnvConfig.get_config(container)),
-        ContainerType.AZURE: lambda container: AzurePathsBuilder(EnvConfig.get_config(container)),
-        ContainerType.SNOWFLAKE: lambda container: SnowflakePathsBuilder(EnvConfig.get_config(container)),
+        ContainerType.LOCAL: lambda container, listing_cache, list_workers: LocalPathsBuilder(
+            EnvConfig.get_config(container), list_workers),
+        ContainerType.AZURE: lambda container, listing_cache, list_workers: AzurePathsBuilder(
+            EnvConfig.get_config(container), listing_cache, list_workers),
+        ContainerType.SNOWFLAKE: lambda container, listing_cache, list_workers: SnowflakePathsBuilder(
+            EnvConfig.get_config(container)),
     }
 
     @staticmethod
-    def get_path_builder(container: Container) -> PathsBuilder:
-        return PathsBuilderFactory.__CONTAINER_TYPE_TO_BUILDER[container.type](container)
+    def get_path_builder(container: Container, listing_cache: ListingCache = None,
+                         list_workers: int = 1) -> PathsBuilder:
+        return PathsBuilderFactory.__CONTAINER_TYPE_TO_BUILDER[container.type](container, listing_cache, list_workers)
@@ -1,12 +1,16 @@
+import concurrent.futures
+import hashlib
 import logging
+import os
 import sys
 import random
 import dataclasses
-from typing import List, Iterable
+from typing import List, Iterable, Tuple
 
 from workflow import utils
 from workflow.common import FileType, Export, Source, ContainerType, AzureConfig
-from workflow.constants import IMPORT_CONFIG_REL, FILE_LOAD_RELATION, PARTITIONED_EXPORT_POSTFIX
+from workflow.constants import IMPORT_CONFIG_REL, FILE_LOAD_RELATION, PARTITIONED_EXPORT_POSTFIX, MODEL_HASH_REL, \
+    MODEL_SCOPE_REL
 
 # Static queries
 DISABLE_IVM = "def insert:rel:config:disable_ivm = true"
@@ -23,6 +27,13 @@ DELETE_REFRESHED_SOURCES_DATA = """
     def delete:resources_data_to_delete = resources_data_to_delete
 """
 
+INSTALLED_MODELS = f"""
+    bound {MODEL_HASH_REL} = String, String
+    bound {MODEL_SCOPE_REL} = String, String
+    def output:hash = {MODEL_HASH_REL}
+    def output:scope = {MODEL_SCOPE_REL}
+"""
+
 
 @dataclasses.dataclass
 class QueryWithInputs:
@@ -30,43 +41,77 @@ class QueryWithInputs:
     inputs: dict
 
 
+class QueryBuilder:
+    """
+    Rel query assembled from fragments. Fragments are joined once on `build`, so a query is built in linear time of
+    its size regardless of the number of fragments. Large literal sections can be streamed from an iterable.
+    """
+
+    def __init__(self, *fragments: str):
+        self.__fragments = []
+        self.add(*fragments)
+
+    def add(self, *fragments: str) -> 'QueryBuilder':
+        self.__fragments.extend(fragments)
+        return self
+
+    def add_lines(self, lines: Iterable[str]) -> 'QueryBuilder':
+        for line in lines:
+            self.add(line, "\n")
+        return self
+
+    def build(self) -> str:
+        return "".join(self.__fragments)
+
+
 def load_json(relation: str, data) -> QueryWithInputs:
     return QueryWithInputs(f"def config:data = data\n" f"def insert:{relation} = load_json[config]", {"data": data})
 
 
-def install_model(models: dict) -> QueryWithInputs:
+def install_model(models: dict, removed_models: Iterable[str] = (), scope: str = None,
+                  scope_models: Iterable[str] = None) -> QueryWithInputs:
+    """
+    Build query installing models with their content hashes and removing models.
+    :param models:          models to install
+    :param removed_models:  names of models to remove
+    :param scope:           scope which declares models, e.g. a step installing models
+    :param scope_models:    names of all models of the scope to save if scope is given
+    :return: query with models as inputs
+    """
     queries_inputs = {}
     rand_uint = random.randint(0, sys.maxsize)
 
     index = 0
-    query = ""
+    query = QueryBuilder()
     for name in models:
         input_name = f"input_{str(rand_uint)}_{index}"
-        query += f"def delete:rel:catalog:model[\"{name}\"] = rel:catalog:model[\"{name}\"]\n" \
-                 f"def insert:rel:catalog:model[\"{name}\"] = {input_name}\n"
+        query.add(f"def delete:rel:catalog:model[\"{name}\"] = rel:catalog:model[\"{name}\"]\n",
+                  f"def insert:rel:catalog:model[\"{name}\"] = {input_name}\n",
+                  f"def delete:{MODEL_HASH_REL}[\"{name}\"] = {MODEL_HASH_REL}[\"{name}\"]\n",
+                  f"def insert:{MODEL_HASH_REL} = (\"{name}\", \"{model_hash(models[name])}\")\n")
         queries_inputs[input_name] = models[name]
         index += 1
+    for name in removed_models:
+        query.add(f"def delete:rel:catalog:model[\"{name}\"] = rel:catalog:model[\"{name}\"]\n",
+                  f"def delete:{MODEL_HASH_REL}[\"{name}\"] = {MODEL_HASH_REL}[\"{name}\"]\n")
+    if scope is not None:
+        query.add(f"def delete:{MODEL_SCOPE_REL}[\"{scope}\"] = {MODEL_SCOPE_REL}[\"{scope}\"]\n")
+        query.add_lines(f"def insert:{MODEL_SCOPE_REL} = (\"{scope}\", \"{name}\")" for name in scope_models)
 
-    return QueryWithInputs(query, queries_inputs)
+    return QueryWithInputs(query.build(), queries_inputs)
 
 
-def populate_source_configs(sources: List[Source]) -> str:
-    source_config_csv = "\n".join([source.to_paths_csv() for source in sources])
-    data_formats_csv = "\n".join([source.to_formats_csv() for source in sources])
-    container_types_csv = "\n".join([source.to_container_type_csv() for source in sources])
+def model_hash(model: str) -> str:
+    return hashlib.sha256(model.encode()).hexdigest()
 
-    chunk_partitioned_sources = list(filter(lambda source: source.is_chunk_partitioned, sources))
-    simple_sources = list(
-        filter(lambda source: not source.is_chunk_partitioned and not source.is_date_partitioned, sources))
-    date_partitioned_sources = list(filter(lambda source: source.is_date_partitioned, sources))
 
-    return f"""
-        def delete:source_declares_resource(r, c, p) {{
+_POPULATE_SOURCE_CONFIGS_QUERY = """
+        def delete:source_declares_resource(r, c, p) {
             declared_sources_to_delete(r, p) and
             source_declares_resource(r, c, p)
-        }}
+        }
         
-        def resource_config[:data] = \"\"\"{source_config_csv}\"\"\"
+        def resource_config[:data] = source_config_data
         def resource_config[:syntax, :header_row] = -1
         def resource_config[:syntax, :header] = (1, :Relation); (2, :Container); (3, :Path)
         def resource_config[:schema, :Relation] = "string"
@@ -80,7 +125,7 @@ def populate_source_configs(sources: List[Source]) -> str:
                 source_config_csv(:Path, i, p)
             )
 
-        def input_format_config[:data] = \"\"\"{data_formats_csv}\"\"\"
+        def input_format_config[:data] = input_format_config_data
         def input_format_config[:syntax, :header_row] = -1
         def input_format_config[:syntax, :header] = (1, :Relation); (2, :InputFormatCode)
         def input_format_config[:schema, :Relation] = "string"
@@ -89,7 +134,7 @@ def populate_source_configs(sources: List[Source]) -> str:
         def insert:source_has_input_format(r, p) =
             exists(i : input_format_config_csv(:Relation, i, r) and input_format_config_csv(:InputFormatCode, i, p))
         
-        def container_type_config[:data] = \"\"\"{container_types_csv}\"\"\"
+        def container_type_config[:data] = container_type_config_data
         def container_type_config[:syntax, :header_row] = -1
         def container_type_config[:syntax, :header] = (1, :Relation); (2, :ContainerType)
         def container_type_config[:schema, :Relation] = "string"
@@ -98,30 +143,96 @@ def populate_source_configs(sources: List[Source]) -> str:
         def insert:source_has_container_type(r, t) =
             exists(i : container_type_config_csv(:Relation, i, r) and container_type_config_csv(:ContainerType, i, t))
 
-        {f"def insert:simple_source_relation = {_to_rel_literal_relation([source.relation for source in simple_sources])}" if len(simple_sources) > 0 else ""}
-        {f"def insert:chunk_partitioned_source_relation = {_to_rel_literal_relation([source.relation for source in chunk_partitioned_sources])}" if len(chunk_partitioned_sources) > 0 else ""}
-        {f"def insert:date_partitioned_source_relation = {_to_rel_literal_relation([source.relation for source in date_partitioned_sources])}" if len(date_partitioned_sources) > 0 else ""}
+        def resource_size_config[:data] = resource_size_config_data
+        def resource_size_config[:syntax, :header_row] = -1
+        def resource_size_config[:syntax, :header] = (1, :Path); (2, :Size)
+        def resource_size_config[:schema, :Path] = "string"
+        def resource_size_config[:schema, :Size] = "int"
+        def resource_size_config_csv = load_csv[resource_size_config]
+        def delete:source_resource_size(p, n) {
+            source_resource_size(p, n) and
+            (declared_sources_to_delete(_, p) and not resource_size_config_csv(:Path, _, p) or
+             exists(i : resource_size_config_csv(:Path, i, p) and not resource_size_config_csv(:Size, i, n)))
+        }
+        def insert:source_resource_size(p, n) =
+            exists(i : resource_size_config_csv(:Path, i, p) and resource_size_config_csv(:Size, i, n))
+
+        def resource_fingerprint_config[:data] = resource_fingerprint_config_data
+        def resource_fingerprint_config[:syntax, :header_row] = -1
+        def resource_fingerprint_config[:syntax, :header] = (1, :Path); (2, :Fingerprint)
+        def resource_fingerprint_config[:schema, :Path] = "string"
+        def resource_fingerprint_config[:schema, :Fingerprint] = "string"
+        def resource_fingerprint_config_csv = load_csv[resource_fingerprint_config]
+        def delete:source_resource_fingerprint(p, f) {
+            source_resource_fingerprint(p, f) and
+            (declared_sources_to_delete(_, p) and not resource_fingerprint_config_csv(:Path, _, p) or
+             exists(i : resource_fingerprint_config_csv(:Path, i, p) and
+                        not resource_fingerprint_config_csv(:Fingerprint, i, f)))
+        }
+        def insert:source_resource_fingerprint(p, f) =
+            exists(i : resource_fingerprint_config_csv(:Path, i, p) and
+                       resource_fingerprint_config_csv(:Fingerprint, i, f))
+
+        def source_partitioning_config[:data] = source_partitioning_config_data
+        def source_partitioning_config[:syntax, :header_row] = -1
+        def source_partitioning_config[:syntax, :header] = (1, :Relation); (2, :ChunkPartitioned); (3, :DatePartitioned)
+        def source_partitioning_config[:schema, :Relation] = "string"
+        def source_partitioning_config[:schema, :ChunkPartitioned] = "string"
+        def source_partitioning_config[:schema, :DatePartitioned] = "string"
+        def source_partitioning_config_csv = load_csv[source_partitioning_config]
+        def insert:simple_source_relation(r) =
+            exists(i : source_partitioning_config_csv(:Relation, i, r) and
+                       source_partitioning_config_csv(:ChunkPartitioned, i, "False") and
+                       source_partitioning_config_csv(:DatePartitioned, i, "False"))
+        def insert:chunk_partitioned_source_relation(r) =
+            exists(i : source_partitioning_config_csv(:Relation, i, r) and
+                       source_partitioning_config_csv(:ChunkPartitioned, i, "True"))
+        def insert:date_partitioned_source_relation(r) =
+            exists(i : source_partitioning_config_csv(:Relation, i, r) and
+                       source_partitioning_config_csv(:DatePartitioned, i, "True"))
     """
 
 
+def populate_source_configs(sources: List[Source]) -> QueryWithInputs:
+    # catalogs are passed as transaction inputs, so the query text doesn't depend on sources and is compiled once
+    inputs = {
+        "source_config_data": "\n".join([source.to_paths_csv() for source in sources]),
+        "input_format_config_data": "\n".join([source.to_formats_csv() for source in sources]),
+        "container_type_config_data": "\n".join([source.to_container_type_csv() for source in sources]),
+        "source_partitioning_config_data": "\n".join([source.to_partitioning_csv() for source in sources]),
+        "resource_size_config_data": "\n".join([source.to_sizes_csv() for source in sources if source.sizes]),
+        "resource_fingerprint_config_data": "\n".join(
+            [source.to_fingerprints_csv() for source in sources if source.fingerprints]),
+    }
+    return QueryWithInputs(_POPULATE_SOURCE_CONFIGS_QUERY, inputs)
+
+
 def discover_reimport_sources(sources: List[Source], expired_sources: List[tuple[str, str]], force_reimport: bool,
-                              force_reimport_not_chunk_partitioned: bool) -> str:
-    date_partitioned_src_cfg_csv = ""
-    expired_sources_src_cfg_csv = ""
-    for src in sources:
-        date_partitioned_src_cfg_csv += f"{src.to_chunk_partitioned_paths_csv()}\n"
-    for src in expired_sources:
-        expired_sources_src_cfg_csv += f"{src[0]},{src[1]}\n"
-    return f"""
+                              force_reimport_not_chunk_partitioned: bool, reimport_changed_only: bool = False) -> \
+        QueryWithInputs:
+    # catalogs are passed as transaction inputs, the query text depends only on reimport flags
+    inputs = {
+        "new_fingerprint_config_data": QueryBuilder().add_lines(
+            src.to_fingerprints_csv() for src in sources if src.fingerprints).build(),
+        "new_source_config_data": QueryBuilder().add_lines(
+            src.to_chunk_partitioned_paths_csv() for src in sources).build(),
+        "expired_source_config_data": QueryBuilder().add_lines(f"{src[0]},{src[1]}" for src in expired_sources).build(),
+    }
+    query = f"""
         def force_reimport = {"true" if force_reimport else "false"}
         def force_reimport_not_chunk_partitioned = {"true" if force_reimport_not_chunk_partitioned else "false"}
+        def reimport_changed_only = {"true" if reimport_changed_only else "false"}
+
+        def fingerprint_config = new_fingerprint_config
+        def fingerprint_config[:data] = new_fingerprint_config_data
+        def new_fingerprint_config_csv = load_csv[fingerprint_config]
 
         def resource_config = new_source_config
-        def resource_config[:data] = \"\"\"{date_partitioned_src_cfg_csv}\"\"\"
+        def resource_config[:data] = new_source_config_data
         def new_source_config_csv = load_csv[resource_config]
         
         def expired_resource_config = expired_source_config
-        def expired_resource_config[:data] = \"\"\"{expired_sources_src_cfg_csv}\"\"\"
+        def expired_resource_config[:data] = expired_source_config_data
         def expired_source_config_csv = load_csv[expired_resource_config]
         
         def insert:declared_sources_to_delete = resource_to_invalidate
@@ -129,36 +240,48 @@ def discover_reimport_sources(sources: List[Source], expired_sources: List[tuple
         
         def insert:resources_data_to_delete = resources_to_delete
     """
+    return QueryWithInputs(query, inputs)
 
 
-def load_resources(logger: logging.Logger, config: AzureConfig, resources, src, snapshot_diff_enabled: bool = False) ->\
-        QueryWithInputs:
+def get_load_source_types(src) -> Tuple[FileType, ContainerType]:
+    """
+    Get file type and container type of the source to load.
+    :param src: source to load
+    :return: file type and container type
+    :raises KeyError: if the file type isn't supported
+    :raises ValueError: if the container type isn't supported
+    """
+    return FileType[src["file_type"]], ContainerType.from_source(src)
+
+
+def load_resources(logger: logging.Logger, config: AzureConfig, resources, src, snapshot_diff_enabled: bool = False,
+                   read_executor: concurrent.futures.Executor = None) -> QueryWithInputs:
     rel_name = src["source"]
 
-    file_stype_str = src["file_type"]
-    file_type = FileType[file_stype_str]
-    src_type = ContainerType.from_source(src)
+    file_type, src_type = get_load_source_types(src)
     reload_as_snapshot = snapshot_diff_enabled and src.get("is_snapshot", False)
 
     if 'is_multi_part' in src and src['is_multi_part'] == 'Y':
         if file_type == FileType.CSV or file_type == FileType.JSONL:
             if src_type == ContainerType.LOCAL:
                 logger.info(f"Loading {len(resources)} shards from local files")
-                return _local_load_multipart_query(rel_name, file_type, resources, reload_as_snapshot)
+                return _local_load_multipart_query(logger, rel_name, file_type, resources, reload_as_snapshot,
+                                                   read_executor)
             elif src_type == ContainerType.AZURE:
                 logger.info(f"Loading {len(resources)} shards from Azure files")
                 return QueryWithInputs(
                     _azure_load_multipart_query(rel_name, file_type, resources, config, reload_as_snapshot), {})
         else:
-            logger.error(f"Unknown file type {file_stype_str}")
+            raise ValueError(f"Unsupported file type of multi-part source '{rel_name}': {file_type.name}")
     else:
         if src_type == ContainerType.LOCAL:
             logger.info("Loading from local file")
-            return _local_load_simple_query(rel_name, resources[0]["uri"], file_type, reload_as_snapshot)
+            return _local_load_simple_query(logger, rel_name, resources[0]["uri"], file_type, reload_as_snapshot)
         elif src_type == ContainerType.AZURE:
             logger.info("Loading from Azure file")
             return QueryWithInputs(
                 _azure_load_simple_query(rel_name, resources[0]["uri"], file_type, config, reload_as_snapshot), {})
+    raise ValueError(f"Unsupported container type of source '{rel_name}': {src_type.name}")
 
 
 def get_snapshot_expiration_date(snapshot_binding: str, date_format: str) -> str:
@@ -176,42 +299,42 @@ def get_snapshot_expiration_date(snapshot_binding: str, date_format: str) -> str
 
 
 def discover_partitioned_exports(exports: List[Export]) -> str:
-    query = ""
+    query = QueryBuilder()
     for export in exports:
-        query += f"""
+        query.add(f"""
         def output:{export.relation} = export_config:{export.relation}:partition_size = _
-        """
-    return query
+        """)
+    return query.build()
 
 
 def export_relations_local(logger: logging.Logger, exports: List[Export]) -> str:
-    query = ""
+    query = QueryBuilder()
     for export in exports:
         if export.file_type == FileType.CSV:
             if export.meta_key:
-                query += _export_meta_relation_as_csv_local(export)
+                query.add(_export_meta_relation_as_csv_local(export))
             else:
-                query += _export_relation_as_csv_local(export.relation)
+                query.add(_export_relation_as_csv_local(export.relation))
         else:
             logger.warning(f"Unsupported export type: {export.file_type}")
-    return query
+    return query.build()
 
 
 def export_relations_to_azure(logger: logging.Logger, config: AzureConfig, exports: List[Export], end_date: str,
                               date_format: str) -> str:
-    query = f"""
+    query = QueryBuilder(f"""
     def _credentials_config:integration:provider = "azure"
     def _credentials_config:integration:credentials:azure_sas_token = raw"{config.sas}"
-    """
+    """)
     for export in exports:
         if export.file_type == FileType.CSV:
             if export.meta_key:
-                query += _export_meta_relation_as_csv_to_azure(config, export, end_date, date_format)
+                query.add(_export_meta_relation_as_csv_to_azure(config, export, end_date, date_format))
             else:
-                query += _export_relation_as_csv_to_azure(config, export, end_date, date_format)
+                query.add(_export_relation_as_csv_to_azure(config, export, end_date, date_format))
         else:
             logger.warning(f"Unsupported export type: {export.file_type}")
-    return query
+    return query.build()
 
 
 def init_workflow_steps(batch_config_name: str) -> str:
@@ -259,10 +382,7 @@ def update_execution_time(idt: str, execution_time: float) -> str:
 
 
 def materialize(relations: List[str]) -> str:
-    query = ""
-    for relation in relations:
-        query += f"def output:{relation} = count[{relation}]\n"
-    return query
+    return QueryBuilder().add_lines(f"def output:{relation} = count[{relation}]" for relation in relations).build()
 
 
 def output_json(relation: str) -> str:
@@ -273,10 +393,12 @@ def output_relation(relation: str) -> str:
     return f"def output = {relation}"
 
 
-def _local_load_simple_query(rel_name: str, uri: str, file_type: FileType, reload_as_snapshot: bool) -> QueryWithInputs:
+def _local_load_simple_query(logger: logging.Logger, rel_name: str, uri: str, file_type: FileType,
+                             reload_as_snapshot: bool) -> QueryWithInputs:
     try:
         raw_data_rel_name = f"{rel_name}_data"
         data = utils.read(uri)
+        _log_compression_ratio(logger, [uri], [data])
         query = f"def {IMPORT_CONFIG_REL}:{rel_name}:data = {raw_data_rel_name}\n" \
                 f"{_simple_insert_query(rel_name, file_type, reload_as_snapshot)}\n"
         return QueryWithInputs(query, {raw_data_rel_name: data})
@@ -292,54 +414,57 @@ def _azure_load_simple_query(rel_name: str, uri: str, file_type: FileType, confi
            f"{_simple_insert_query(rel_name, file_type, reload_as_snapshot)}"
 
 
-def _local_load_multipart_query(rel_name: str, file_type: FileType, parts, reload_as_snapshot: bool) -> QueryWithInputs:
+def _local_load_multipart_query(logger: logging.Logger, rel_name: str, file_type: FileType, parts,
+                                reload_as_snapshot: bool, read_executor: concurrent.futures.Executor = None) -> \
+        QueryWithInputs:
     raw_data_rel_name = f"{rel_name}_data"
 
-    raw_text = ""
-    part_indexes = ""
+    raw_text = QueryBuilder()
+    part_indexes = QueryBuilder()
     inputs = {}
-    for part in parts:
-        try:
-            part_idx = part["part_index"]
-            data = utils.read(part["uri"])
-            inputs[_indexed_literal(raw_data_rel_name, part_idx)] = data
-            raw_text += _load_from_indexed_literal(raw_data_rel_name, part_idx)
-            part_indexes += f"{part_idx}\n"
-        except OSError as e:
-            raise e
+    # shards are read in parallel if executor is given, contents are assembled in the order of parts
+    uris = [part["uri"] for part in parts]
+    shards = utils.read_all(uris, read_executor)
+    _log_compression_ratio(logger, uris, shards)
+    for part, data in zip(parts, shards):
+        part_idx = part["part_index"]
+        inputs[_indexed_literal(raw_data_rel_name, part_idx)] = data
+        raw_text.add(_load_from_indexed_literal(raw_data_rel_name, part_idx))
+        part_indexes.add(f"{part_idx}\n")
 
     insert_text = _multi_part_insert_query(rel_name, file_type, reload_as_snapshot)
     load_config = _multi_part_load_config_query(rel_name, file_type,
                                                 _local_multipart_config_integration(raw_data_rel_name))
 
-    query = f"{_part_index_relation(rel_name, part_indexes)}\n" \
-            f"{raw_text}\n" \
-            f"{load_config}\n" \
-            f"{insert_text}\n"
+    query = QueryBuilder(_part_index_relation(rel_name, part_indexes.build()), "\n", raw_text.build(), "\n",
+                         load_config, "\n", insert_text, "\n")
+
+    return QueryWithInputs(query.build(), inputs)
 
-    return QueryWithInputs(query, inputs)
+
+def _log_compression_ratio(logger: logging.Logger, uris: List[str], contents: List[str]) -> None:
+    compressed = [(uri, data) for uri, data in zip(uris, contents) if utils.is_gzip(uri)]
+    if compressed:
+        compressed_size = sum(os.path.getsize(uri) for uri, _ in compressed)
+        data_size = sum(len(data) for _, data in compressed)
+        logger.info(f"Decompressed {len(compressed)} gzip files: {compressed_size} bytes to {data_size} characters, "
+                    f"compression ratio {data_size / max(compressed_size, 1):.1f}")
 
 
 def _azure_load_multipart_query(rel_name: str, file_type: FileType, parts, config: AzureConfig,
                                 reload_as_snapshot: bool) -> str:
     path_rel_name = f"{rel_name}_path"
 
-    part_indexes = ""
-    part_uri_map = ""
-    for part in parts:
-        part_idx = part["part_index"]
-        part_uri = part["uri"]
-        part_indexes += f"{part_idx}\n"
-        part_uri_map += f"{part_idx},\"{part_uri}\"\n"
+    part_indexes = QueryBuilder().add_lines(str(part["part_index"]) for part in parts)
+    part_uri_map = QueryBuilder().add_lines(f"{part['part_index']},\"{part['uri']}\"" for part in parts)
 
     insert_text = _multi_part_insert_query(rel_name, file_type, reload_as_snapshot)
     load_config = _multi_part_load_config_query(rel_name, file_type,
                                                 _azure_multipart_config_integration(path_rel_name, config))
 
-    return f"{_part_index_relation(rel_name, part_indexes)}\n" \
-           f"{_path_rel_name_relation(path_rel_name, part_uri_map)}\n" \
-           f"{load_config}\n" \
-           f"{insert_text}\n"
+    return QueryBuilder(_part_index_relation(rel_name, part_indexes.build()), "\n",
+                        _path_rel_name_relation(path_rel_name, part_uri_map.build()), "\n",
+                        load_config, "\n", insert_text, "\n").build()
 
 
 def _multi_part_load_config_query(rel_name: str, file_type: FileType, config_integration: str) -> str:
@@ -500,10 +625,6 @@ def _compose_export_path(config: AzureConfig, export: Export, end_date: str, dat
         return f"{account_url}/{config.container}/{config.data_path}/{export.relative_path}/{date_path}"
 
 
-def _to_rel_literal_relation(xs: Iterable[str]) -> str:
-    return "{ " + " ; ".join([f"\"{x}\"" for x in xs]) + " }"
-
-
 def _to_rel_meta_key_as_seq(export: Export) -> str:
     key_values = range(0, len(export.meta_key))
     return ", ".join([f"_v{i}" for i in key_values])
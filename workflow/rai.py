@@ -1,25 +1,77 @@
+import asyncio
+import concurrent.futures
 import logging
 import re
 import json
+import threading
 import time
-from typing import Dict, List
+from functools import partial
+from typing import Dict, List, Callable, Optional
 from urllib.error import HTTPError
 from railib import api, config, rest
 
-from workflow import query as q
-from workflow.common import RaiConfig, EnvConfig
+from workflow import query as q, session, auth
+from workflow.common import RaiConfig, EnvConfig, PollingPolicy
 from workflow.utils import call_with_overhead
 from workflow.exception import ConcurrentWriteAttemptException, RetryException
 
+# shared by all threads to fetch parts of completed transactions concurrently
+_completion_executor = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="rai-txn-completion")
+
+
+class _WriteTxnTracker:
+    """
+    Tracks write transactions submitted by this process and caches RUNNING transactions listed per engine for `ttl`
+    seconds, so concurrent writes of the process neither relist transactions nor treat each other as foreign writes.
+    """
+    ttl: float
+
+    def __init__(self, ttl: float = 2):
+        self.ttl = ttl
+        self.__own_txns = set()
+        self.__running = {}
+        self.__lock = threading.Lock()
+
+    def add(self, txn_id: str) -> None:
+        with self.__lock:
+            self.__own_txns.add(txn_id)
+
+    def remove(self, txn_id: str) -> None:
+        with self.__lock:
+            self.__own_txns.discard(txn_id)
+            # a finished transaction can still be in the cached listing
+            for _, running in self.__running.values():
+                running.discard(txn_id)
+
+    def has_foreign_running_write(self, logger: logging.Logger, rai_config: RaiConfig) -> bool:
+        now = time.time()
+        with self.__lock:
+            cached = self.__running.get(rai_config.engine)
+        if cached is None or now - cached[0] >= self.ttl:
+            txns = list_transactions(logger, rai_config, state="RUNNING")
+            # the state filter is applied on the client side as well in case the server ignores it
+            running = {txn["id"] for txn in txns if txn["state"] == "RUNNING" and txn["read_only"] is False}
+            cached = (now, running)
+            with self.__lock:
+                self.__running[rai_config.engine] = cached
+        with self.__lock:
+            return bool(cached[1] - self.__own_txns)
+
+
+_write_txn_tracker = _WriteTxnTracker()
+
 
 def get_config(engine: str, database: str, env_config: EnvConfig) -> RaiConfig:
     """
-    Create RAI config for given parameters
+    Create RAI config for given parameters. RAI SDK requests are routed through the shared pooled HTTP session and
+    authenticated with tokens from the shared token cache.
     :param engine:          RAI engine
     :param database:        RAI database
     :param env_config:      EvnConfig
     :return: RAI config
     """
+    session.install_rai_sdk_adapter(env_config.http)
+    auth.install_token_cache()
     ctx = api.Context(**config.read(fname=env_config.rai_profile_path, profile=env_config.rai_profile),
                       retries=env_config.rai_sdk_http_retries)
     return RaiConfig(ctx=ctx, engine=engine, database=database)
@@ -33,7 +85,7 @@ def get_access_token(logger: logging.Logger, rai_config: RaiConfig) -> str:
     :return: RAI Cloud access token
     """
     logger.debug("Requesting access token")
-    return rest._get_access_token(rai_config.ctx, api._mkurl(rai_config.ctx, "/"))
+    return auth.token_cache.get_access_token(rai_config.ctx, api._mkurl(rai_config.ctx, "/"))
 
 
 def load_json(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, relation: str,
@@ -66,21 +118,26 @@ def create_engine(logger: logging.Logger, rai_config: RaiConfig, size: str = "XS
     api.create_engine_wait(rai_config.ctx, rai_config.engine, size)
 
 
-def delete_engine(logger: logging.Logger, rai_config: RaiConfig) -> None:
+def delete_engine(logger: logging.Logger, rai_config: RaiConfig, polling_policy: PollingPolicy = None,
+                  timeout: float = 10 * 60) -> None:
     """
     Delete RAI engine specified in RAI config.
-    :param logger:      logger
-    :param rai_config:  RAI config
+    :param logger:          logger
+    :param rai_config:      RAI config
+    :param polling_policy:  policy to poll for engine deletion
+    :param timeout:         timeout in seconds to wait for engine deletion
     :return:
     """
     logger.info(f"Deleting engine `{rai_config.engine}`")
+    polling_policy = polling_policy or PollingPolicy()
+    start_time = time.time()
     api.delete_engine(rai_config.ctx, rai_config.engine)
     # make sure that engine was deleted
-    api.poll_with_specified_overhead(
-        lambda: not engine_exist(logger, rai_config),
-        overhead_rate=0.2,
-        timeout=10 * 60,
-    )
+    max_time = start_time + timeout
+    while engine_exist(logger, rai_config):
+        if time.time() >= max_time:
+            raise RetryException(f"Engine `{rai_config.engine}` wasn't deleted in {timeout:.0f} seconds")
+        time.sleep(min(polling_policy.next_delay(start_time), max(max_time - time.time(), 0)))
 
 
 def engine_exist(logger: logging.Logger, rai_config: RaiConfig) -> bool:
@@ -139,23 +196,30 @@ def database_exist(logger: logging.Logger, rai_config: RaiConfig) -> bool:
     return bool(api.get_database(rai_config.ctx, rai_config.database))
 
 
-def install_models(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, models: dict) -> None:
+def install_models(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, models: dict,
+                   scope: str = None) -> None:
     """
-    Install Rel model into RAI DB specified in RAI config.
+    Install Rel model into RAI DB specified in RAI config. Models are compared by content hash with installed models,
+    only added or changed models are written.
     :param logger:      logger
     :param rai_config:  RAI config
     :param env_config:  Env config
     :param models:      RAI models to install
+    :param scope:       scope declaring the models. Models declared by the scope before and missed in `models` are
+                        removed unless another scope declares them
     :return:
     """
     logger.info("Installing models")
 
-    query_model = q.install_model(models)
-    execute_query(logger, rai_config, env_config, query_model.query, query_model.inputs, False, False)
+    rsp = execute_query(logger, rai_config, env_config, q.INSTALLED_MODELS)
+    query_model = _get_install_models_query(logger, rsp, models, scope)
+    if query_model:
+        execute_query(logger, rai_config, env_config, query_model.query, query_model.inputs, False, False)
 
 
 def execute_query(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, query: str, inputs: dict = None,
-                  readonly: bool = True, ignore_problems: bool = False) -> api.TransactionAsyncResponse:
+                  readonly: bool = True, ignore_problems: bool = False, fetch_metadata: bool = False,
+                  query_kind: str = None) -> api.TransactionAsyncResponse:
     """
     Execute Rel query using DB and engine from RAI config.
     :param logger:          logger
@@ -164,14 +228,16 @@ def execute_query(logger: logging.Logger, rai_config: RaiConfig, env_config: Env
     :param query:           Rel query
     :param inputs:          Rel query inputs
     :param readonly:        Parameter to specify transaction type: Read/Write.
-    :param ignore_problems: Ignore SDK problems if any
+    :param ignore_problems: Ignore SDK problems if any. Problems of readonly queries are not fetched in this case
+    :param fetch_metadata:  Fetch transaction metadata, it's not fetched by default since the workflow doesn't use it
+    :param query_kind:      Kind of the query, polling policy may use historical duration of the kind
     :return: SDK response
     """
     try:
         if env_config.fail_on_multiple_write_txn_in_flight and not readonly:
             _check_running_write_txn(logger, rai_config)
         logger.info(f"Execute query: database={rai_config.database} engine={rai_config.engine} readonly={readonly}")
-        start_time = int(time.time())
+        start_time = time.time()
         txn = api.exec_async(rai_config.ctx, rai_config.database, rai_config.engine, query, readonly, inputs)
         logger.info(f"Execute query: transaction id - {txn.transaction['id']}")
 
@@ -179,20 +245,28 @@ def execute_query(logger: logging.Logger, rai_config: RaiConfig, env_config: Env
         if not (txn.results is None):
             return txn
 
-        logger.info(f"Execute query: polling for transaction with id - {txn.transaction['id']}")
+        txn_id = txn.transaction["id"]
+        logger.info(f"Execute query: polling for transaction with id - {txn_id}")
+        transaction = txn.transaction
+        polls = 0
+        if not readonly:
+            _write_txn_tracker.add(txn_id)
+        try:
+            while not api.is_txn_term_state(transaction["state"]):
+                time.sleep(env_config.polling_policy.next_delay(start_time, query_kind))
+                transaction = api.get_transaction(rai_config.ctx, txn_id)
+                polls += 1
+        finally:
+            _write_txn_tracker.remove(txn_id)
+        _record_polling(logger, env_config, txn_id, query_kind, start_time, polls)
+
+        # the last poll response is reused as the transaction, the rest is fetched concurrently
         rsp = api.TransactionAsyncResponse()
-        txn = api.get_transaction(rai_config.ctx, txn.transaction["id"])
-
-        api.poll_with_specified_overhead(
-            lambda: api.is_txn_term_state(api.get_transaction(rai_config.ctx, txn["id"])["state"]),
-            overhead_rate=0.2,
-            start_time=start_time
-        )
-
-        rsp.transaction = api.get_transaction(rai_config.ctx, txn["id"])
-        rsp.metadata = api.get_transaction_metadata(rai_config.ctx, txn["id"])
-        rsp.problems = api.get_transaction_problems(rai_config.ctx, txn["id"])
-        rsp.results = api.get_transaction_results(rai_config.ctx, txn["id"])
+        rsp.transaction = transaction
+        futures = {part: _completion_executor.submit(fetch) for part, fetch in
+                   _completion_fetches(rai_config, txn_id, readonly, ignore_problems, fetch_metadata).items()}
+        for part, future in futures.items():
+            setattr(rsp, part, future.result())
 
         _assert_problems(logger, rsp, ignore_problems)
         return rsp
@@ -216,7 +290,7 @@ def execute_relation_json(logger: logging.Logger, rai_config: RaiConfig, env_con
 
 
 def execute_query_csv(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, query: str,
-                      ignore_problems: bool = False) -> Dict:
+                      ignore_problems: bool = False, query_kind: str = None) -> Dict:
     """
     Execute query and parse the output as CSV.
     :param logger:          logger
@@ -224,9 +298,10 @@ def execute_query_csv(logger: logging.Logger, rai_config: RaiConfig, env_config:
     :param env_config:      Env config
     :param query:           Rel query
     :param ignore_problems: Ignore SDK problems if any
+    :param query_kind:      Kind of the query, polling policy may use historical duration of the kind
     :return: parsed CSV output
     """
-    rsp = execute_query(logger, rai_config, env_config, query, ignore_problems=ignore_problems)
+    rsp = execute_query(logger, rai_config, env_config, query, ignore_problems=ignore_problems, query_kind=query_kind)
     return _parse_csv_string(rsp)
 
 
@@ -258,10 +333,7 @@ def execute_query_take_single(logger: logging.Logger, rai_config: RaiConfig, env
     :param ignore_problems: Ignore SDK problems if any
     """
     rsp = execute_query(logger, rai_config, env_config, query, readonly=readonly, ignore_problems=ignore_problems)
-    if not rsp.results:
-        logger.debug(f"Query returned no results: {query}")
-        return None
-    return rsp.results[0]['table'].to_pydict()["v1"][0]
+    return _take_single(logger, rsp, query)
 
 
 def execute_query_take_tuples(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, query: str,
@@ -276,22 +348,216 @@ def execute_query_take_tuples(logger: logging.Logger, rai_config: RaiConfig, env
     :param ignore_problems: Ignore SDK problems if any
     """
     rsp = execute_query(logger, rai_config, env_config, query, readonly=readonly, ignore_problems=ignore_problems)
-    if not rsp.results:
-        logger.debug(f"Query returned no results: {query}")
-        return {}
-    return _parse_as_dict(rsp)
+    return _take_tuples(logger, rsp, query)
 
 
-def list_transactions(logger: logging.Logger, rai_config: RaiConfig) -> List:
+async def load_json_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, relation: str,
+                          json_data: str) -> None:
     """
-    List all transactions for the engine
+    Async variant of `load_json`.
+    :param logger:      logger
+    :param rai_config:  RAI config
+    :param env_config:  Env config
+    :param relation:    relation for insert
+    :param json_data:   json data string
+    :return:
+    """
+    logger.info(f"Loading json as '{relation}'")
+    logger.debug(f"Json content: '{json_data}'")
+    query_model = q.load_json(relation, json_data)
+    await execute_query_async(logger, rai_config, env_config, query_model.query, query_model.inputs, readonly=False)
+
+
+async def install_models_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig,
+                               models: dict, scope: str = None) -> None:
+    """
+    Async variant of `install_models`.
+    :param logger:      logger
+    :param rai_config:  RAI config
+    :param env_config:  Env config
+    :param models:      RAI models to install
+    :param scope:       scope declaring the models
+    :return:
+    """
+    logger.info("Installing models")
+
+    rsp = await execute_query_async(logger, rai_config, env_config, q.INSTALLED_MODELS)
+    query_model = _get_install_models_query(logger, rsp, models, scope)
+    if query_model:
+        await execute_query_async(logger, rai_config, env_config, query_model.query, query_model.inputs, False, False)
+
+
+async def execute_query_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, query: str,
+                              inputs: dict = None, readonly: bool = True, ignore_problems: bool = False,
+                              fetch_metadata: bool = False, query_kind: str = None) -> api.TransactionAsyncResponse:
+    """
+    Async variant of `execute_query`. SDK HTTP calls run in the default executor of the running event loop while
+    polling awaits `asyncio.sleep`, so many transactions can be in flight from a single thread.
+    :param logger:          logger
+    :param rai_config:      RAI config
+    :param env_config:      Env config
+    :param query:           Rel query
+    :param inputs:          Rel query inputs
+    :param readonly:        Parameter to specify transaction type: Read/Write.
+    :param ignore_problems: Ignore SDK problems if any. Problems of readonly queries are not fetched in this case
+    :param fetch_metadata:  Fetch transaction metadata, it's not fetched by default since the workflow doesn't use it
+    :param query_kind:      Kind of the query, polling policy may use historical duration of the kind
+    :return: SDK response
+    """
+    loop = asyncio.get_running_loop()
+    if env_config.fail_on_multiple_write_txn_in_flight and not readonly:
+        await loop.run_in_executor(None, _check_running_write_txn, logger, rai_config)
+    logger.info(f"Execute query: database={rai_config.database} engine={rai_config.engine} readonly={readonly}")
+    start_time = time.time()
+    txn = await loop.run_in_executor(None, partial(api.exec_async, rai_config.ctx, rai_config.database,
+                                                   rai_config.engine, query, readonly, inputs))
+    txn_id = txn.transaction["id"]
+    logger.info(f"Execute query: transaction id - {txn_id}")
+
+    # in case of if short-path, return results directly, no need to poll for state
+    if not (txn.results is None):
+        return txn
+
+    logger.info(f"Execute query: polling for transaction with id - {txn_id}")
+    transaction = txn.transaction
+    polls = 0
+    if not readonly:
+        _write_txn_tracker.add(txn_id)
+    try:
+        while not api.is_txn_term_state(transaction["state"]):
+            await asyncio.sleep(env_config.polling_policy.next_delay(start_time, query_kind))
+            transaction = await loop.run_in_executor(None, api.get_transaction, rai_config.ctx, txn_id)
+            polls += 1
+    finally:
+        _write_txn_tracker.remove(txn_id)
+    _record_polling(logger, env_config, txn_id, query_kind, start_time, polls)
+
+    rsp = api.TransactionAsyncResponse()
+    rsp.transaction = transaction
+    fetches = _completion_fetches(rai_config, txn_id, readonly, ignore_problems, fetch_metadata)
+    parts = await asyncio.gather(*[loop.run_in_executor(None, fetch) for fetch in fetches.values()])
+    for part, value in zip(fetches.keys(), parts):
+        setattr(rsp, part, value)
+
+    _assert_problems(logger, rsp, ignore_problems)
+    return rsp
+
+
+async def execute_relation_json_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig,
+                                      relation: str, ignore_problems: bool = False) -> Dict:
+    """
+    Async variant of `execute_relation_json`.
+    :param logger:          logger
+    :param rai_config:      RAI config
+    :param env_config:      Env config
+    :param relation:        Rel relations
+    :param ignore_problems: Ignore SDK problems if any
+    :return: parsed json string
+    """
+    rsp = await execute_query_async(logger, rai_config, env_config, q.output_json(relation),
+                                    ignore_problems=ignore_problems)
+    return _parse_json_string(rsp)
+
+
+async def execute_query_csv_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig, query: str,
+                                  ignore_problems: bool = False) -> Dict:
+    """
+    Async variant of `execute_query_csv`.
+    :param logger:          logger
+    :param rai_config:      RAI config
+    :param env_config:      Env config
+    :param query:           Rel query
+    :param ignore_problems: Ignore SDK problems if any
+    :return: parsed CSV output
+    """
+    rsp = await execute_query_async(logger, rai_config, env_config, query, ignore_problems=ignore_problems)
+    return _parse_csv_string(rsp)
+
+
+async def execute_relation_string_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig,
+                                        relation: str, ignore_problems: bool = False) -> str:
+    """
+    Async variant of `execute_relation_string`.
+    :param logger:          logger
+    :param rai_config:      RAI config
+    :param env_config:      Env config
+    :param relation:        Rel relations
+    :param ignore_problems: Ignore SDK problems if any
+    :return: parsed json string
+    """
+    rsp = await execute_query_async(logger, rai_config, env_config, q.output_relation(relation),
+                                    ignore_problems=ignore_problems)
+    return _parse_string(rsp)
+
+
+async def execute_query_take_single_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig,
+                                          query: str, readonly: bool = True, ignore_problems: bool = False) -> any:
+    """
+    Async variant of `execute_query_take_single`.
+    :param logger:          logger
+    :param rai_config:      RAI config
+    :param env_config:      Env config
+    :param query:           Rel query
+    :param readonly:        Parameter to specify transaction type: Read/Write
+    :param ignore_problems: Ignore SDK problems if any
+    """
+    rsp = await execute_query_async(logger, rai_config, env_config, query, readonly=readonly,
+                                    ignore_problems=ignore_problems)
+    return _take_single(logger, rsp, query)
+
+
+async def execute_query_take_tuples_async(logger: logging.Logger, rai_config: RaiConfig, env_config: EnvConfig,
+                                          query: str, readonly: bool = True, ignore_problems: bool = False) -> any:
+    """
+    Async variant of `execute_query_take_tuples`.
+    :param logger:          logger
+    :param rai_config:      RAI config
+    :param env_config:      Env config
+    :param query:           Rel query
+    :param readonly:        Parameter to specify transaction type: Read/Write
+    :param ignore_problems: Ignore SDK problems if any
+    """
+    rsp = await execute_query_async(logger, rai_config, env_config, query, readonly=readonly,
+                                    ignore_problems=ignore_problems)
+    return _take_tuples(logger, rsp, query)
+
+
+def list_transactions(logger: logging.Logger, rai_config: RaiConfig, state: str = None) -> List:
+    """
+    List transactions for the engine
+    :param logger:      logger
+    :param rai_config:  RAI config
+    :param state:       List only transactions in the state if it's given
+    :return: transactions
     """
     logger.debug(f"List transactions for {rai_config.engine}")
+    if state:
+        return api.list_transactions(rai_config.ctx, engine_name=rai_config.engine, state=state)
     return api.list_transactions(rai_config.ctx, engine_name=rai_config.engine)
 
 
+def _record_polling(logger: logging.Logger, env_config: EnvConfig, txn_id: str, query_kind: str, start_time: float,
+                    polls: int) -> None:
+    duration = time.time() - start_time
+    logger.info(f"Execute query: transaction with id - {txn_id} finished in {duration:.2f}s after {polls} poll(s)")
+    env_config.polling_policy.record(query_kind, duration)
+
+
+def _completion_fetches(rai_config: RaiConfig, txn_id: str, readonly: bool, ignore_problems: bool,
+                        fetch_metadata: bool) -> Dict[str, Callable]:
+    """
+    Build fetches of the completed transaction parts, keyed by `api.TransactionAsyncResponse` attribute.
+    """
+    fetches = {"results": partial(api.get_transaction_results, rai_config.ctx, txn_id)}
+    if not (readonly and ignore_problems):
+        fetches["problems"] = partial(api.get_transaction_problems, rai_config.ctx, txn_id)
+    if fetch_metadata:
+        fetches["metadata"] = partial(api.get_transaction_metadata, rai_config.ctx, txn_id)
+    return fetches
+
+
 def _assert_problems(logger: logging.Logger, rsp: api.TransactionAsyncResponse, ignore_problems: bool):
-    problems_has_error = _handle_problems(logger, rsp.problems)
+    problems_has_error = _handle_problems(logger, rsp.problems or [])
     txn_state = rsp.transaction.get('state')
     if txn_state != 'COMPLETED' or (problems_has_error and not ignore_problems):
         # todo: create a hierarchy of exceptions
@@ -311,6 +577,48 @@ def _handle_problems(logger: logging.Logger, problems: list) -> bool:
     return problems_has_error
 
 
+def _get_install_models_query(logger: logging.Logger, rsp: api.TransactionAsyncResponse, models: dict,
+                              scope: str = None) -> Optional[q.QueryWithInputs]:
+    installed_hashes = dict(_take_rows(rsp, "/:output/:hash/String/String"))
+    scopes = {}
+    for model_scope, name in _take_rows(rsp, "/:output/:scope/String/String"):
+        scopes.setdefault(model_scope, set()).add(name)
+    changed = {name: model for name, model in models.items() if installed_hashes.get(name) != q.model_hash(model)}
+    removed = []
+    scope_changed = False
+    if scope is not None:
+        scope_models = scopes.pop(scope, set())
+        scope_changed = scope_models != set(models)
+        declared_by_other_scopes = set().union(*scopes.values())
+        removed = sorted(scope_models - set(models) - declared_by_other_scopes)
+    if not changed and not scope_changed:
+        logger.info(f"All {len(models)} models are up to date")
+        return None
+    logger.info(f"Installing {len(changed)} added or changed models of {len(models)}, removing {len(removed)} models")
+    return q.install_model(changed, removed, scope if scope_changed else None, models.keys())
+
+
+def _take_rows(rsp: api.TransactionAsyncResponse, relation_id: str) -> List[tuple]:
+    for result in rsp.results or []:
+        if result['relationId'] == relation_id:
+            return list(zip(*result['table'].to_pydict().values()))
+    return []
+
+
+def _take_single(logger: logging.Logger, rsp: api.TransactionAsyncResponse, query: str) -> any:
+    if not rsp.results:
+        logger.debug(f"Query returned no results: {query}")
+        return None
+    return rsp.results[0]['table'].to_pydict()["v1"][0]
+
+
+def _take_tuples(logger: logging.Logger, rsp: api.TransactionAsyncResponse, query: str) -> Dict:
+    if not rsp.results:
+        logger.debug(f"Query returned no results: {query}")
+        return {}
+    return _parse_as_dict(rsp)
+
+
 def _parse_json_string(rsp: api.TransactionAsyncResponse) -> Dict:
     """
     Parse the output for a json_string query ie
@@ -376,18 +684,10 @@ def _parse_matching_pattern(rsp: api.TransactionAsyncResponse, pattern: str) ->
 def _check_running_write_txn(logger: logging.Logger, rai_config: RaiConfig) -> None:
     try:
         call_with_overhead(
-            f=lambda: not _is_running_write_txn(logger, rai_config),
+            f=lambda: not _write_txn_tracker.has_foreign_running_write(logger, rai_config),
             logger=logger,
             overhead_rate=0.5,
             timeout=30  # 30 sec
         )
     except RetryException:
         raise ConcurrentWriteAttemptException(rai_config.engine)
-
-
-def _is_running_write_txn(logger: logging.Logger, rai_config: RaiConfig) -> bool:
-    txns = list_transactions(logger, rai_config)
-    for txn in txns:
-        if txn["state"] == "RUNNING" and txn["read_only"] is False:
-            return True
-    return False
@@ -2,17 +2,19 @@ import logging
 
 import requests
 from workflow.exception import RestClientException
+from workflow.session import get_session
 
 
 class RestClient:
-    def __init__(self, logger: logging.Logger, base_url: str):
+    def __init__(self, logger: logging.Logger, base_url: str, session: requests.Session = None):
         self.logger = logger
         self.base_url = base_url
+        self.session = session or get_session()
 
     def _make_request(self, method, endpoint, data=None, headers=None, files=None):
         url = f"{self.base_url}/{endpoint}"
         try:
-            response = requests.request(method, url, data=data, headers=headers, files=files)
+            response = self.session.request(method, url, data=data, headers=headers, files=files)
             response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
             return response
         except requests.exceptions.HTTPError as http_err:
@@ -0,0 +1,92 @@
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from typing import List, Optional
+
+
+class RunStateStore:
+    """
+    Local SQLite store which mirrors workflow step states, timings and completed sub-units of steps. Recovery uses
+    the store to decide which steps to skip without loading workflow state from RAI.
+    """
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+        # steps can be executed in parallel, writes are serialized to avoid `database is locked` errors
+        self.__lock = threading.Lock()
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS workflow (batch_config_name TEXT PRIMARY KEY, config_hash TEXT, "
+                         "steps_json TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS step_state (idt TEXT PRIMARY KEY, state TEXT, "
+                         "execution_time REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS completed_unit (idt TEXT, unit TEXT, PRIMARY KEY (idt, unit))")
+
+    def reset(self, batch_config_name: str, config_hash: str, steps_json: List[dict]) -> None:
+        """
+        Replace the stored run state with workflow steps of a new run.
+        :param batch_config_name:   batch config name
+        :param config_hash:         hash of batch config content
+        :param steps_json:          workflow steps as they are loaded from RAI
+        :return:
+        """
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("DELETE FROM workflow")
+            conn.execute("DELETE FROM step_state")
+            conn.execute("DELETE FROM completed_unit")
+            conn.execute("INSERT INTO workflow VALUES (?, ?, ?)",
+                         (batch_config_name, config_hash, json.dumps(steps_json)))
+            conn.executemany("INSERT INTO step_state VALUES (?, ?, ?)",
+                             [(step["idt"], step.get("state"), step.get("executionTime")) for step in steps_json])
+
+    def load_steps(self, batch_config_name: str, config_hash: str) -> Optional[List[dict]]:
+        """
+        Load workflow steps with their latest states and timings.
+        :param batch_config_name:   batch config name
+        :param config_hash:         hash of batch config content
+        :return: workflow steps or `None` if the store doesn't have state for given batch config
+        """
+        with closing(self.__connect()) as conn:
+            row = conn.execute("SELECT steps_json FROM workflow WHERE batch_config_name = ? AND config_hash = ?",
+                               (batch_config_name, config_hash)).fetchone()
+            if row is None:
+                return None
+            states = {idt: (state, execution_time) for idt, state, execution_time in
+                      conn.execute("SELECT idt, state, execution_time FROM step_state")}
+        steps_json = json.loads(row[0])
+        for step in steps_json:
+            if step["idt"] in states:
+                state, execution_time = states[step["idt"]]
+                step["state"] = state
+                if execution_time is not None:
+                    step["executionTime"] = execution_time
+        return steps_json
+
+    def update_step(self, idt: str, state: str, execution_time: float = None) -> None:
+        """
+        Update step state and execution time if it's given.
+        :param idt:             step id
+        :param state:           step state
+        :param execution_time:  step execution time
+        :return:
+        """
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("INSERT INTO step_state VALUES (?, ?, ?) ON CONFLICT (idt) DO UPDATE SET "
+                         "state = excluded.state, execution_time = COALESCE(excluded.execution_time, execution_time)",
+                         (idt, state, execution_time))
+
+    def get_completed_units(self, idt: str) -> set[str]:
+        with closing(self.__connect()) as conn:
+            return {unit for unit, in conn.execute("SELECT unit FROM completed_unit WHERE idt = ?", (idt,))}
+
+    def add_completed_unit(self, idt: str, unit: str) -> None:
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("INSERT OR IGNORE INTO completed_unit VALUES (?, ?)", (idt, unit))
+
+    def clear_completed_units(self, idt: str) -> None:
+        with self.__lock, closing(self.__connect()) as conn, conn:
+            conn.execute("DELETE FROM completed_unit WHERE idt = ?", (idt,))
+
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
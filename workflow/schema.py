@@ -1,4 +1,4 @@
-from schema import Schema, Optional, And, Use
+from schema import Schema, Optional, And, Use, SchemaError
 from types import MappingProxyType
 from workflow.constants import CONFIGURE_SOURCES, INSTALL_MODELS, LOAD_DATA, MATERIALIZE, EXPORT, EXECUTE_COMMAND
 from workflow.common import FileType
@@ -12,6 +12,20 @@ class Validator:
 
     def validate(self, data):
         Schema({"workflow": [WorkflowStepSchema({}, self)]}).validate(data)
+        self._validate_dependencies(data["workflow"])
+
+    @staticmethod
+    def _validate_dependencies(steps: list):
+        """
+        Check that every `dependsOn` entry points to a step declared earlier in the workflow. This way the order of
+        steps in batch config is always a valid execution order and dependency cycles are impossible.
+        """
+        declared = set()
+        for step in steps:
+            for dependency in step.get("dependsOn", []):
+                if dependency not in declared:
+                    raise SchemaError(f"Step `{step['name']}` depends on `{dependency}` which isn't declared before it")
+            declared.add(step["name"])
 
 
 class WorkflowStepSchema(Schema):
@@ -29,7 +43,8 @@ class WorkflowStepSchema(Schema):
 step_schema = {
     "type": str,
     "name": str,
-    Optional("engineSize"): str
+    Optional("engineSize"): str,
+    Optional("dependsOn"): [str]
 }
 
 load_data_step_schema = Schema(step_schema)
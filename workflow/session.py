@@ -0,0 +1,96 @@
+import io
+import threading
+from urllib.error import HTTPError, URLError
+from urllib.request import Request
+
+import requests
+from railib import rest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from workflow.common import HttpConfig
+
+_lock = threading.Lock()
+_session: requests.Session = None
+
+
+def create_session(config: HttpConfig) -> requests.Session:
+    """
+    Create HTTP session with keep-alive connection pool per host and retry with backoff for connection errors and
+    retryable HTTP statuses.
+    :param config:  HTTP config
+    :return: HTTP session
+    """
+    retry = Retry(
+        total=config.retries,
+        backoff_factor=config.backoff_factor,
+        status_forcelist=[429, 502, 503, 504],
+        # let callers handle an error status of the last attempt
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=config.pool_size, pool_maxsize=config.pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(config: HttpConfig = None) -> requests.Session:
+    """
+    Get HTTP session shared by all threads. The session is created on the first call.
+    :param config:  HTTP config used to create the session
+    :return: HTTP session
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session(config or HttpConfig())
+        return _session
+
+
+def install_rai_sdk_adapter(config: HttpConfig = None) -> None:
+    """
+    Route all RAI SDK HTTP requests through the shared HTTP session instead of opening a new connection per request.
+    :param config:  HTTP config used to create the session
+    :return:
+    """
+    session = get_session(config)
+    rest.urlopen = lambda req: _urlopen(session, req)
+
+
+class _SdkResponse:
+    """
+    Response of `requests` adapted to the interface of `urllib` response used by RAI SDK.
+    """
+
+    def __init__(self, response: requests.Response):
+        self._response = response
+        self._method = response.request.method
+        self.status = response.status_code
+        self.headers = response.headers
+        self.url = response.url
+        self.version = response.raw.version if response.raw is not None else 11
+
+    def read(self) -> bytes:
+        return self._response.content
+
+    def close(self) -> None:
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _urlopen(session: requests.Session, req: Request) -> _SdkResponse:
+    try:
+        response = session.request(req.get_method(), req.full_url, headers=dict(req.header_items()), data=req.data)
+    except requests.exceptions.ConnectionError as e:
+        # RAI SDK retries requests failed due to `URLError`
+        raise URLError(e)
+    if response.status_code >= 400:
+        raise HTTPError(req.full_url, response.status_code, response.reason, response.headers,
+                        io.BytesIO(response.content))
+    return _SdkResponse(response)
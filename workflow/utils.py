@@ -1,4 +1,8 @@
 import asyncio
+import collections
+import concurrent.futures
+import gzip
+import itertools
 import logging
 import os
 import time
@@ -9,12 +13,14 @@ from types import MappingProxyType
 from workflow.schema import Validator
 
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Callable, TypeVar, Iterable, Iterator
 
 from workflow import constants
 from workflow.common import LocalConfig
 from workflow.exception import RetryException
 
+T = TypeVar("T")
+
 
 def range_days(start: datetime, end: datetime) -> List[datetime]:
     delta = end - start
@@ -31,10 +37,44 @@ def get_date_path(end_date: str, date_format: str, day_offset: int):
 
 
 def read(fname: str) -> str:
+    if is_gzip(fname):
+        # decompressed on the fly, without an intermediate file
+        with gzip.open(fname, "rt") as fp:
+            return fp.read()
     with open(fname) as fp:
         return fp.read()
 
 
+def is_gzip(fname: str) -> bool:
+    return fname.endswith(".gz")
+
+
+def get_data_size(fname: str) -> int:
+    """
+    Get size of file data, gzip files are sized by uncompressed size from gzip trailer.
+    :param fname:   file name
+    :return: size in bytes
+    """
+    if is_gzip(fname):
+        with open(fname, "rb") as fp:
+            fp.seek(-4, os.SEEK_END)
+            # the trailer keeps the size modulo 2^32, compressed size is the lower bound for larger files
+            return max(int.from_bytes(fp.read(4), "little"), os.path.getsize(fname))
+    return os.path.getsize(fname)
+
+
+def read_all(fnames: List[str], executor: concurrent.futures.Executor = None) -> List[str]:
+    """
+    Read files, in parallel if executor is given.
+    :param fnames:      file names
+    :param executor:    executor to read files on
+    :return: file contents in the order of file names
+    """
+    if executor is None:
+        return [read(fname) for fname in fnames]
+    return list(executor.map(read, fnames))
+
+
 def read_config(fname: str, schemas: dict[str, Schema] = MappingProxyType({})) -> str:
     _, file_extension = os.path.splitext(fname)
     if file_extension == ".json":
@@ -109,6 +149,24 @@ def format_duration(seconds: float) -> str:
         return f"[{seconds_int:d}s]"
 
 
+def get_common_models(batch_config_json: str, incremental_snapshots: bool = False) -> List[str]:
+    """
+    Get common models required by step types of the batch config.
+    :param batch_config_json:       batch config as json string
+    :param incremental_snapshots:   incremental snapshots are enabled
+    :return: common model file names in the order of `constants.COMMON_MODEL`
+    """
+    step_types = {step["type"] for step in json.loads(batch_config_json).get("workflow", [])}
+    if not step_types.issubset(constants.STEP_TYPE_COMMON_MODEL):
+        return list(constants.COMMON_MODEL)
+    models = set(constants.CORE_COMMON_MODEL)
+    for step_type in step_types:
+        models.update(constants.STEP_TYPE_COMMON_MODEL[step_type])
+    if incremental_snapshots and constants.LOAD_DATA in step_types:
+        models.update(constants.INCREMENTAL_SNAPSHOTS_COMMON_MODEL)
+    return [model for model in constants.COMMON_MODEL if model in models]
+
+
 def get_common_model_relative_path(file) -> str:
     """
     Get relative path to common model from folder of given file.
@@ -151,12 +209,14 @@ async def call_with_overhead_async(
         f,
         logger: logging.Logger,
         overhead_rate: float,
-        start_time: int = time.time(),
+        start_time: float = None,
         timeout: int = None,
         max_tries: int = None,
         first_delay: float = 0.5,
         max_delay: int = 120,  # 2 minutes
 ) -> None:
+    if start_time is None:
+        start_time = time.time()
     tries = 0
     max_time = time.time() + timeout if timeout else None
 
@@ -185,17 +245,63 @@ def call_with_overhead(
         f,
         logger: logging.Logger,
         overhead_rate: float,
-        start_time: int = time.time(),
+        start_time: float = None,
         timeout: int = None,
         max_tries: int = None,
         first_delay: float = 0.5,
         max_delay: int = 120,  # 2 minutes
 ):
-    loop = asyncio.get_event_loop()
+    loop = get_or_create_eventloop()
     loop.run_until_complete(
         call_with_overhead_async(f, logger, overhead_rate, start_time, timeout, max_tries, first_delay, max_delay))
 
 
+def pack_by_budget(items: List[T], size: Callable[[T], int], max_bytes: int = None, max_items: int = None) -> \
+        List[List[T]]:
+    """
+    Pack items in order into batches, a batch is closed when the next item would exceed the byte or item budget. An
+    item which alone exceeds the byte budget gets its own batch.
+    :param items:       items to pack
+    :param size:        function returning size of an item in bytes
+    :param max_bytes:   max total size of a batch, unlimited if not set
+    :param max_items:   max number of items in a batch, unlimited if not set
+    :return: batches of items
+    """
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for item in items:
+        item_bytes = size(item)
+        exceeds_bytes = max_bytes is not None and batch_bytes + item_bytes > max_bytes
+        exceeds_items = max_items is not None and len(batch) >= max_items
+        if batch and (exceeds_bytes or exceeds_items):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def prefetch(tasks: Iterable[Callable[[], T]], executor: concurrent.futures.Executor, depth: int = 1) -> Iterator[T]:
+    """
+    Run tasks in order on executor, keeping at most `depth` tasks ahead of the consumer.
+    :param tasks:       tasks to run
+    :param executor:    executor to run tasks on
+    :param depth:       number of tasks running ahead of the consumer
+    :return: results of tasks in order of tasks
+    """
+    tasks = iter(tasks)
+    futures = collections.deque(executor.submit(task) for task in itertools.islice(tasks, depth + 1))
+    while futures:
+        yield futures.popleft().result()
+        next_task = next(tasks, None)
+        if next_task is not None:
+            futures.append(executor.submit(next_task))
+
+
 def get_or_create_eventloop():
     """Get the current event loop or create a new one."""
     try: